@@ -0,0 +1,98 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+Measures throughput of the output patching done by the test runner, on a
+generated output resembling a compiler log with paths to the test directories.
+
+    $ python bench/test_runner_patches.py --size 64 --patches 24
+"""
+
+import argparse
+import random
+import string
+import time
+
+from proj_flow.ext.test_runner.driver.env import Env
+
+CWD = "/home/user/project/build/.testing/AbCdEfGhIjKlMnOp"
+TEMPDIR = "/tmp/test-runner/QwErTyUiOpAsDfGh"
+DATA_DIR = "/home/user/project/tests/data"
+VERSION = "1.2.3"
+
+
+def _make_env(patches: int):
+    builtin_patches = {
+        f"^warning W{index:04}: (.*)$": f"warning W{index:04}: [patched] \\1"
+        for index in range(patches)
+    }
+    return Env(
+        target="/home/user/project/build/debug/bin/tool",
+        target_name="tool",
+        build_dir="/home/user/project/build/debug",
+        data_dir=DATA_DIR,
+        inst_dir="/home/user/project/tests/copy/bin",
+        tempdir=TEMPDIR,
+        version=VERSION,
+        counter_digits=1,
+        counter_total=1,
+        handlers={},
+        builtin_patches=builtin_patches,
+    )
+
+
+def _make_output(size: int, patches: int):
+    rng = random.Random(0)
+    templates = [
+        "compiling {cwd}/src/{word}.cpp",
+        "reading {data}/{word}/{word}.json",
+        "writing {tmp}/{word}.o",
+        "tool version {version}",
+        "warning W{warning:04}: unused variable '{word}'",
+        "note: {word} {word} {word} {word} {word}",
+        "",
+    ]
+
+    lines: list[str] = []
+    length = 0
+    while length < size:
+        line = rng.choice(templates).format(
+            cwd=CWD,
+            data=DATA_DIR,
+            tmp=TEMPDIR,
+            version=VERSION,
+            warning=rng.randrange(patches * 4 or 1),
+            word="".join(rng.choices(string.ascii_lowercase, k=8)),
+        )
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=32, help="output size in MB")
+    parser.add_argument("--patches", type=int, default=24, help="number of patches")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    args = parser.parse_args()
+
+    env = _make_env(args.patches)
+    output = _make_output(args.size * 1000 * 1000, args.patches)
+    size = len(output.encode("UTF-8")) / 1000 / 1000
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        env.patch(output, CWD, {})
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    assert best is not None
+    print(
+        f"{size:.1f} MB, {args.patches} patches: "
+        f"{best:.3f} s, {size / best:.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
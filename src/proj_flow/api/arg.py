@@ -114,12 +114,14 @@ class _Command:
     entry: typing.Optional[_inspect.Function]
     doc: typing.Optional[str]
     subs: typing.Dict[str, "_Command"]
+    metadata_only: bool = False
 
     def add(
         self,
         names: typing.List[str],
         entry: _inspect.Function,
         doc: typing.Optional[str],
+        metadata_only: bool = False,
     ):
         name = names[0]
         rest = names[1:]
@@ -130,15 +132,24 @@ class _Command:
                 child = _Command(name, None, None, {})
                 self.subs[name] = child
 
-            child.add(rest, entry, doc)
+            child.add(rest, entry, doc, metadata_only)
             return
 
         try:
             child = self.subs[name]
             child.entry = entry
             child.doc = doc
+            child.metadata_only = metadata_only
         except KeyError:
-            self.subs[name] = _Command(name, entry, doc, {})
+            self.subs[name] = _Command(name, entry, doc, {}, metadata_only)
+
+    def find(self, names: typing.List[str]) -> typing.Optional["_Command"]:
+        if len(names) == 0:
+            return self
+        try:
+            return self.subs[names[0]].find(names[1:])
+        except KeyError:
+            return None
 
 
 _known_commands = _Command("", None, None, {})
@@ -149,12 +160,21 @@ _autodoc = {
 }
 
 
-def command(*name: str):
+def command(*name: str, metadata_only: bool = False):
+    """
+    Registers the decorated function as ``proj-flow`` command.
+
+    :param name: Path to the command, e.g. ``"github", "matrix"``.
+    :param metadata_only: The command only needs names and docs of the other
+        commands and steps, so any deferred extensions do not have to be
+        imported before it runs.
+    """
+
     def wrap(function: object):
         entry = typing.cast(_inspect.Function, function)
         global _known_commands
         orig_doc = inspect.getdoc(entry)
-        _known_commands.add(list(name), entry, orig_doc)
+        _known_commands.add(list(name), entry, orig_doc, metadata_only)
 
         doc = orig_doc or ""
         if doc:
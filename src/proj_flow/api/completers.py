@@ -7,9 +7,7 @@ The **proj_flow.api.completers** defines :py:mod:`argcomplete` functions for
 """
 
 import os
-from typing import Any, Dict, List, Union, cast
-
-import yaml
+from typing import List, Union, cast
 
 from proj_flow import api
 
@@ -56,12 +54,7 @@ def _str_arg(arg: Union[bool, str]):
 
 def matrix_completer(prefix: str, parser, **kwargs):
     flow_cfg = cast(api.env.FlowConfig, parser.flow)
-
-    matrix_yml = flow_cfg.root / ".flow" / "matrix.yml"
-    with open(matrix_yml, "r", encoding="UTF-8") as contents:
-        data: Dict[str, List[Any]] = yaml.load(contents, Loader=yaml.Loader).get(
-            "matrix", {}
-        )
+    data = flow_cfg.matrix_keys
 
     comma_sep = prefix.split(",")
     start = ",".join(comma_sep[:-1])
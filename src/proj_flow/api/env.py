@@ -23,7 +23,7 @@ import traceback
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union, cast
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union, cast
 
 from proj_flow.api import ctx
 from proj_flow.base import plugins, uname
@@ -97,25 +97,32 @@ class Printer:
         return f"{color}{arg}\033[m"
 
     @staticmethod
-    def print_cmd(*args: str, use_color: bool = True, secrets: List[str], raw: bool):
+    def print_cmd(
+        *args: str,
+        use_color: bool = True,
+        secrets: List[str],
+        raw: bool,
+        file: Optional[TextIO] = None,
+    ):
+        file = file or sys.stderr
         cmd = args[0] if raw else shlex.join([args[0]])
         if not use_color:
             if raw:
                 print(
                     cmd,
                     *(Printer.hide(arg, secrets) for arg in args[1:]),
-                    file=sys.stderr,
+                    file=file,
                 )
             else:
                 print(
                     cmd,
                     shlex.join(Printer.hide(arg, secrets) for arg in args[1:]),
-                    file=sys.stderr,
+                    file=file,
                 )
             return
 
         printed = " ".join([Printer.print_arg(arg, secrets, raw) for arg in args[1:]])
-        print(f"\033[33m{cmd}\033[m {printed}", file=sys.stderr)
+        print(f"\033[33m{cmd}\033[m {printed}", file=file)
 
 
 @dataclass
@@ -192,15 +199,23 @@ def _merge(cfg: dict, defaults: ctx.SettingsType, path: Path):
 
 
 def load_extensions(extensions: List[str]):
+    """
+    Imports all the extension modules, reporting any errors.
+
+    :returns: ``True``, if all modules were imported without errors.
+    """
+    success = True
     for extension in extensions:
         try:
             importlib.import_module(extension)
         except ImportError as ex:
+            success = False
             print(
                 f"-- error: loading module `{extension}` resulted in import error: {ex}",
                 file=sys.stderr,
             )
         except BaseException as ex:
+            success = False
             te = traceback.TracebackException(
                 type(ex), ex, ex.__traceback__, limit=None, compact=True
             )
@@ -211,6 +226,8 @@ def load_extensions(extensions: List[str]):
             )
             print("".join(te.stack.format()))
 
+    return success
+
 
 class FlowConfig:
     _cfg: dict
@@ -218,7 +235,12 @@ class FlowConfig:
     aliases: List[RunAlias] = []
     root: Path
 
-    def __init__(self, cfg: Optional["FlowConfig"] = None, root: Path = Path()):
+    def __init__(
+        self,
+        cfg: Optional["FlowConfig"] = None,
+        root: Path = Path(),
+        defer_extensions: bool = False,
+    ):
         if cfg is not None:
             self._cfg = cfg._cfg
             self.steps = cfg.steps
@@ -240,26 +262,49 @@ class FlowConfig:
             self._cfg["defaults"] = defaults
 
             self._propagate_compilers()
-            self._load_extensions()
+            if not defer_extensions:
+                self._load_extensions()
 
     def _propagate_compilers(self):
         global _flow_config_default_compiler
         _flow_config_default_compiler = self.compiler_os_default
 
     def _load_extensions(self):
+        load_extensions(self.prepare_extensions())
+
+    def prepare_extensions(self) -> List[str]:
+        """
+        Makes local extensions from ``.flow/extensions`` importable and lists
+        all modules, which need to be imported, starting with
+        ``proj_flow.minimal``.
+        """
         extensions = cast(List[str], self._cfg.get("extensions", []))
-        extensions.insert(0, "proj_flow.minimal")
+        if extensions[:1] != ["proj_flow.minimal"]:
+            extensions.insert(0, "proj_flow.minimal")
 
-        local_extensions = (self.root / ".flow" / "extensions").resolve()
-        if local_extensions.is_dir():
+        local_extensions = self.local_extensions
+        if local_extensions.is_dir() and local_extensions.as_posix() not in sys.path:
             sys.path.insert(0, local_extensions.as_posix())
 
-        load_extensions(extensions)
+        return extensions
+
+    @property
+    def local_extensions(self):
+        return (self.root / ".flow" / "extensions").resolve()
 
     @property
     def items(self):
         return self._cfg
 
+    @property
+    def matrix_keys(self) -> Dict[str, List[Any]]:
+        """
+        Lists possible values for each key of the ``matrix`` object in
+        ``.flow/matrix.yml``.
+        """
+        data = plugins.load_yaml(self.root / ".flow" / "matrix.yml")
+        return cast(Dict[str, List[Any]], data.get("matrix", {}))
+
     @property
     def entry(self) -> Dict[str, dict]:
         return self._cfg.get("entry", {})
@@ -350,6 +395,26 @@ MSG_GUARD: Dict[Msg, Callable[["Runtime"], bool]] = {
 }
 
 
+@dataclass
+class ChildUsage:
+    """
+    Collects resources used by the tools run through :meth:`Runtime.cmd`.
+    """
+
+    #: User and system time of the tools, in seconds.
+    cpu: float = 0.0
+    #: Largest peak resident set size of any of the tools, in bytes.
+    max_rss: int = 0
+    #: Number of tools run.
+    processes: int = 0
+
+    def add(self, usage: Any):
+        self.cpu += usage.ru_utime + usage.ru_stime
+        rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        self.max_rss = max(self.max_rss, rss)
+        self.processes += 1
+
+
 class Runtime(FlowConfig):
     dry_run: bool
     silent: bool
@@ -360,6 +425,15 @@ class Runtime(FlowConfig):
     only_host: bool
     platform: str
     secrets: List[str] = []
+    #: Process environment for the tools run through :meth:`cmd` and
+    #: :meth:`capture`; ``None`` means the environment of this process.
+    environ: Optional[Dict[str, str]] = None
+    #: Stream for messages and the output of the tools run through
+    #: :meth:`cmd`; ``None`` means standard error of this process.
+    log: Optional[TextIO] = None
+    #: Resources used by the tools run through :meth:`cmd`; ``None`` means
+    #: they are not measured.
+    usage: Optional[ChildUsage] = None
 
     def __init__(
         self, argsOrRuntime: Union[argparse.Namespace, "Runtime"], cfg: FlowConfig
@@ -394,21 +468,32 @@ class Runtime(FlowConfig):
             self.only_host = rt.only_host
             self.platform = rt.platform
             self.secrets = [*rt.secrets]
+            self.environ = rt.environ
+            self.log = rt.log
+            self.usage = rt.usage
+
+    @property
+    def stderr(self) -> TextIO:
+        return self.log or sys.stderr
 
     def message(self, *args: str, level=Msg.DEBUG, **kwargs):
         if not MSG_GUARD[level](self):
             return
 
-        print("--", *args, **kwargs, file=sys.stderr)
+        print("--", *args, **kwargs, file=self.stderr)
 
     def fatal(self, *args: str, **kwargs):
-        print("-- FATAL:", *args, **kwargs, file=sys.stderr)
+        print("-- FATAL:", *args, **kwargs, file=self.stderr)
         sys.exit(1)
 
     def print(self, *args: str, raw=False):
         if not self.silent:
             Printer.print_cmd(
-                *args, use_color=self.use_color, secrets=self.secrets, raw=raw
+                *args,
+                use_color=self.use_color,
+                secrets=self.secrets,
+                raw=raw,
+                file=self.stderr,
             )
 
     def cmd(self, *args: str):
@@ -416,19 +501,45 @@ class Runtime(FlowConfig):
         if self.dry_run:
             return 0
 
-        result = subprocess.run(args)
-        if result.returncode != 0:
+        if self.log is not None:
+            self.log.flush()
+        if self._wait(args) != 0:
             print(
                 f"proj-flow: error: {args[0]} ended in failure, exiting",
-                file=sys.stderr,
+                file=self.stderr,
             )
             raise SystemExit(1)
         return 0
 
+    def _wait(self, args: Tuple[str, ...]) -> int:
+        if self.usage is None or not hasattr(os, "wait4"):
+            return subprocess.run(
+                args, env=self.environ, stdout=self.log, stderr=self.log
+            ).returncode
+
+        proc = subprocess.Popen(
+            args, env=self.environ, stdout=self.log, stderr=self.log
+        )
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        self.usage.add(usage)
+        return proc.returncode
+
     def capture(self, *args: str, silent=False):
         if not silent:
             self.print(*args)
-        return subprocess.run(args, shell=False, encoding="UTF-8", capture_output=True)
+        return subprocess.run(
+            args,
+            shell=False,
+            encoding="UTF-8",
+            capture_output=True,
+            env=self.environ,
+        )
 
     def mkdirs(self, dirname: str):
         self.print("mkdir", "-p", dirname)
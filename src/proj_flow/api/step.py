@@ -7,15 +7,33 @@ The **proj_flow.api.step** exposes APIs used by run extensions.
 
 import os
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, cast
+from typing import Any, Dict, List, Optional, cast
 
 from proj_flow.api.env import Config, Runtime
 from proj_flow.base import inspect as _inspect
-from proj_flow.base import matrix
+from proj_flow.base import matrix, plugins
 from proj_flow.base.name_list import name_list
 
 
+@dataclass
+class StepInputs:
+    """
+    Describes everything a step depends on, so that ``run --incremental`` can
+    skip the step, if nothing changed since its last successful run.
+    """
+
+    #: Files, whose contents are used by the step.
+    files: List[Path] = field(default_factory=list)
+    #: Any other JSON-serializable values used by the step.
+    values: Dict[str, Any] = field(default_factory=dict)
+    #: Names of the executables, whose identity is used by the step.
+    tools: List[str] = field(default_factory=list)
+    #: Files or directories, which must still exist for the step to be skipped.
+    outputs: List[Path] = field(default_factory=list)
+
+
 class Step(ABC):
     @property
     @abstractmethod
@@ -38,6 +56,9 @@ class Step(ABC):
     def directories_to_remove(self, config: Config) -> List[Path]:
         return []
 
+    def inputs(self, config: Config, rt: Runtime) -> Optional[StepInputs]:
+        return None
+
     @abstractmethod
     def run(self, config: Config, rt: Runtime) -> int: ...
 
@@ -65,6 +86,20 @@ class SerialStep(Step):
             [child.directories_to_remove(config) for child in self.children]
         )
 
+    def inputs(self, config: Config, rt: Runtime) -> Optional[StepInputs]:
+        result = StepInputs()
+        for index, child in enumerate(self.children):
+            inputs = child.inputs(config, rt)
+            if inputs is None:
+                return None
+            result.files.extend(inputs.files)
+            result.values.update(
+                {f"{index}.{key}": value for key, value in inputs.values.items()}
+            )
+            result.tools.extend(inputs.tools)
+            result.outputs.extend(inputs.outputs)
+        return result
+
     def run(self, config: Config, rt: Runtime) -> int:
         for child in self.children:
             result = child.run(config, rt)
@@ -73,6 +108,59 @@ class SerialStep(Step):
         return 0
 
 
+class _DeferredStep(Step):
+    """
+    Stands in for a step from an extension, which was not imported yet. Name
+    and ordering are known up front; anything else imports all the deferred
+    extensions and asks the step, which replaced this one.
+    """
+
+    def __init__(
+        self, name: str, runs_after: List[str], runs_before: List[str], module: str
+    ):
+        super().__init__()
+        self._name = name
+        self._runs_after = runs_after
+        self._runs_before = runs_before
+        self._module = module
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def runs_after(self):
+        return self._runs_after
+
+    @property
+    def runs_before(self):
+        return self._runs_before
+
+    def _resolve(self) -> Step:
+        plugins.load_deferred()
+        step = get_registered(self._name)
+        if step is None or isinstance(step, _DeferredStep):
+            raise NameError(
+                f"Step {self._name} was expected in `{self._module}`, but it is not registered there"
+            )
+        return step
+
+    def platform_dependencies(self) -> List[str]:
+        return self._resolve().platform_dependencies()
+
+    def is_active(self, config: Config, rt: Runtime) -> bool:
+        return self._resolve().is_active(config, rt)
+
+    def directories_to_remove(self, config: Config) -> List[Path]:
+        return self._resolve().directories_to_remove(config)
+
+    def inputs(self, config: Config, rt: Runtime) -> Optional[StepInputs]:
+        return self._resolve().inputs(config, rt)
+
+    def run(self, config: Config, rt: Runtime) -> int:
+        return self._resolve().run(config, rt)
+
+
 __steps: List[Step] = []
 
 
@@ -81,6 +169,11 @@ def _register_step(step: Step, replace: bool):
 
     name = step.name
 
+    for index, prev in enumerate(__steps):
+        if prev.name == name and isinstance(prev, _DeferredStep):
+            __steps[index] = step
+            return
+
     if replace:
         for index, prev in enumerate(__steps):
             if prev.name == name:
@@ -182,6 +275,7 @@ def _extend_docstring(conv, step: Step):
     _make_private(conv.run)
     _make_private(conv.platform_dependencies)
     _make_private(conv.directories_to_remove)
+    _make_private(conv.inputs)
 
 
 def register(cls=None, replace=False):
@@ -199,6 +293,22 @@ def register(cls=None, replace=False):
     return impl(cls)
 
 
+def register_deferred(
+    name: str, runs_after: List[str], runs_before: List[str], module: str
+):
+    """
+    Registers a stand-in for a step, which will be registered by importing
+    ``module``. Registering the actual step replaces the stand-in.
+    """
+    deferred = _DeferredStep(name, runs_after, runs_before, module)
+    for index, prev in enumerate(__steps):
+        if prev.name == name:
+            __steps[index] = deferred
+            return deferred
+    __steps.append(deferred)
+    return deferred
+
+
 def verbose_info():
     for step in __steps:
         print(
@@ -0,0 +1,144 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.base.digest** calculates digests of large files, such as
+packages and installers: many digests of a file in a single pass, without
+holding the GIL for long, and each file only once, while it stays unchanged.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Sequence
+
+CACHE_VERSION = 1
+#: Size of a single read of a smaller file.
+BUFFER_SIZE = 1 << 20
+#: Files of this size, or larger, are mapped into memory instead of read.
+MMAP_SIZE = 64 << 20
+#: Size of the part of a mapped file handed to the hash objects at once;
+#: hashlib releases the GIL for each part, so other files can be hashed at
+#: the same time.
+MMAP_SLICE = 8 << 20
+# Files modified this close to hashing could be modified again without
+# changing their modification time; they are not cached.
+_RACY_NS = 2_000_000_000
+
+
+def hash_stream(
+    data: BinaryIO, algorithms: Sequence[str] = ("sha256",)
+) -> Dict[str, str]:
+    """
+    Calculates digests of a binary stream, e.g. a file or a member of an
+    archive, in a single pass over it. Large files are mapped into memory.
+    """
+
+    hashes = [hashlib.new(algorithm) for algorithm in algorithms]
+    try:
+        size = os.fstat(data.fileno()).st_size
+    except (OSError, ValueError):
+        size = 0
+
+    if size >= MMAP_SIZE:
+        with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, MMAP_SLICE):
+                    chunk = view[offset : offset + MMAP_SLICE]
+                    for sha in hashes:
+                        sha.update(chunk)
+                    chunk.release()
+            finally:
+                view.release()
+    else:
+        buffer = bytearray(BUFFER_SIZE)
+        view = memoryview(buffer)
+        while True:
+            length = data.readinto(buffer)
+            if not length:
+                break
+            for sha in hashes:
+                sha.update(view[:length])
+
+    return {algorithm: sha.hexdigest() for algorithm, sha in zip(algorithms, hashes)}
+
+
+class DigestCache:
+    """
+    Keeps the digests of the files, or of the members of archives, by their
+    names and states, e.g. sizes and modification times, in a file like
+    ``build/.proj-flow/digests.json``, so that an unchanged file is not
+    hashed again. Safe to use from many threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, dict] = {}
+        self.modified = False
+        self._lock = threading.Lock()
+
+        try:
+            with open(path, encoding="UTF-8") as cache_file:
+                data = json.load(cache_file)
+            if isinstance(data, dict) and data.get("cache") == CACHE_VERSION:
+                files = data.get("files", {})
+                if isinstance(files, dict):
+                    self.files = files
+        except (OSError, ValueError):
+            pass
+
+    def hash_entry(
+        self,
+        key: str,
+        state: list,
+        mtime_ns: int,
+        calculate: Callable[[], Dict[str, str]],
+        algorithms: Sequence[str] = ("sha256",),
+    ) -> Dict[str, str]:
+        """
+        Takes the digests of anything, which can be described by a key and
+        a state, from the cache, or calculates and remembers them.
+
+        :param key: Name of the entry, e.g. an absolute path.
+        :param state: JSON-compatible values, which change with the contents.
+        :param mtime_ns: Modification time of the contents.
+        :param calculate: Calculates the digests, if they are not known.
+        """
+
+        with self._lock:
+            entry = self.files.get(key)
+        if isinstance(entry, dict) and entry.get("state") == state:
+            known = entry.get("digests", {})
+            if all(algorithm in known for algorithm in algorithms):
+                return {algorithm: known[algorithm] for algorithm in algorithms}
+
+        started = time.time_ns()
+        digests = calculate()
+        if mtime_ns + _RACY_NS <= started:
+            with self._lock:
+                entry = self.files.get(key)
+                known = {}
+                if isinstance(entry, dict) and entry.get("state") == state:
+                    known = entry.get("digests", {})
+                self.files[key] = {"state": state, "digests": {**known, **digests}}
+                self.modified = True
+        return digests
+
+    def store(self):
+        with self._lock:
+            if not self.modified:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp = f"{self.path}.{os.getpid()}"
+                with open(temp, "w", encoding="UTF-8") as cache_file:
+                    json.dump({"cache": CACHE_VERSION, "files": self.files}, cache_file)
+                os.replace(temp, self.path)
+                self.modified = False
+            except OSError:
+                pass
@@ -7,7 +7,7 @@ The **proj_flow.base.plugins** provide the plugin enumeration helpers.
 
 import json
 from pathlib import Path
-from typing import cast
+from typing import Callable, List, cast
 
 import yaml
 
@@ -51,3 +51,25 @@ def load_data(filename: Path):
             pass
 
     return {}
+
+
+_deferred: List[Callable[[], None]] = []
+
+
+def defer(loader: Callable[[], None]):
+    """
+    Postpones loading of some plugins until they are actually needed.
+
+    :param loader: Function to call from :func:`load_deferred`.
+    """
+    _deferred.append(loader)
+
+
+def load_deferred():
+    """
+    Calls all the loaders postponed with :func:`defer`. Each loader is called
+    once, no matter how many times this function is called.
+    """
+    while len(_deferred) > 0:
+        loader = _deferred.pop(0)
+        loader()
@@ -10,12 +10,11 @@ The **proj_flow.cli** provides command-line entry for the *Project Flow*.
 import argparse
 import os
 import sys
+import time
 
-from proj_flow.api import env
-from proj_flow.cli import argument, finder
-from proj_flow.flow import steps
+from proj_flow.cli import completion, finder
 
-__all__ = ["argument", "finder", "main"]
+__all__ = ["argument", "completion", "finder", "manifest", "main"]
 
 
 def main():
@@ -42,12 +41,40 @@ def _change_dir():
 def __main():
     _change_dir()
 
-    flow_cfg = env.FlowConfig(root=finder.autocomplete.find_project())
-    steps.clean_aliases(flow_cfg)
+    root = finder.autocomplete.find_project()
+    if finder.autocomplete.active():
+        cached = completion.load_parser(root)
+        if cached is not None:
+            finder.autocomplete(cached)
 
-    parser = argument.build_argparser(flow_cfg)
+    # Only import the rest of Project Flow, when the completion could not be
+    # answered from the cached model.
+    start = time.monotonic()
+    cpu_start = time.process_time()
+    from proj_flow.api import env
+    from proj_flow.cli import argument, manifest
+    from proj_flow.flow import graph, profile, steps
+
+    profile.record_phase("import", start, cpu_start)
+
+    with profile.phase("load config"):
+        flow_cfg = env.FlowConfig(root=root, defer_extensions=True)
+    with profile.phase("load extensions"):
+        dependencies = manifest.load_extensions(flow_cfg)
+    with profile.phase("sort steps"):
+        try:
+            steps.clean_aliases(flow_cfg)
+        except graph.StepCycleError as error:
+            print(f"proj-flow: error: {error.message}", file=sys.stderr)
+            raise SystemExit(1)
+
+    with profile.phase("build parser"):
+        parser = argument.build_argparser(flow_cfg)
+    if finder.autocomplete.active():
+        completion.save_parser(parser, flow_cfg, dependencies)
     finder.autocomplete(parser)
-    args = parser.parse_args()
-    argument.expand_shortcuts(parser, args)
+    with profile.phase("parse arguments"):
+        args = parser.parse_args()
+        argument.expand_shortcuts(parser, args)
 
     raise SystemExit(parser.find_and_run_command(args))
@@ -14,8 +14,8 @@ from dataclasses import dataclass, field
 from proj_flow import __version__
 from proj_flow.api import arg, completers, env, step
 from proj_flow.base import inspect as _inspect
-from proj_flow.base import registry
-from proj_flow.flow import configs
+from proj_flow.base import plugins, registry
+from proj_flow.flow import configs, profile
 
 
 class Completer(typing.Protocol):
@@ -50,6 +50,7 @@ class Parser(argparse.ArgumentParser):
         rt = env.Runtime(args, self.flow)
 
         if rt.verbose:
+            plugins.load_deferred()
             verbose_info(self.menu)
             step.verbose_info()
             registry.verbose_info()
@@ -155,6 +156,7 @@ class Command:
     additional: typing.List[AdditionalArgument]
     parent: typing.Optional["Command"]
     children: typing.List["Command"] = field(default_factory=list)
+    metadata_only: bool = False
 
     def argparse_visit(
         self,
@@ -237,13 +239,18 @@ class Command:
 
             return subcommand.run(args, rt, level=level + 1)
 
+        if not self.metadata_only:
+            with profile.phase("load deferred extensions"):
+                plugins.load_deferred()
+
         kwargs = {}
         for arg in self.annotated:
             kwargs[arg.name] = getattr(args, arg.name, None)
 
-        for additional in self.additional:
-            arg = additional.create(rt, args, self)
-            kwargs[additional.name] = arg
+        with profile.phase("prepare arguments"):
+            for additional in self.additional:
+                arg = additional.create(rt, args, self)
+                kwargs[additional.name] = arg
 
         result = self.entry(**kwargs)
         return 0 if result is None else result
@@ -309,6 +316,7 @@ def _build_menu(cmd: arg._Command, parent: typing.Optional[Command]):
         annotated=annotated,
         additional=additional,
         parent=parent,
+        metadata_only=cmd.metadata_only,
     )
     for child in cmd.subs.values():
         current.children.append(_build_menu(child, current))
@@ -0,0 +1,125 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.cli.cache** reads and writes the JSON files kept by the
+command line in ``build/.proj-flow``. Each file has a header, which must match
+the current setup, and a list of files, which must not change since the cache
+was written.
+
+This module depends on the standard library only, so that using a cache does
+not need to import the rest of *Project Flow*.
+"""
+
+import importlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+FileStat = Tuple[str, Optional[int], Optional[int]]
+
+
+class NotSerializable(Exception):
+    pass
+
+
+def cache_dir(root: Path):
+    return root / "build" / ".proj-flow"
+
+
+def config_files(root: Path):
+    """
+    Lists all possible names of the flow config files, both of the user and
+    of the project, whether they exist or not.
+    """
+
+    for dirname, stem in [
+        (Path("~").expanduser() / ".config", "proj-flow"),
+        (root / ".flow", "config"),
+    ]:
+        for ext in [".json", ".yml", ".yaml"]:
+            yield str(dirname / f"{stem}{ext}")
+
+
+def stat(filename: str) -> FileStat:
+    try:
+        result = os.stat(filename)
+        return (filename, result.st_mtime_ns, result.st_size)
+    except OSError:
+        return (filename, None, None)
+
+
+def load(filename: Path, header: Dict[str, Any]) -> Optional[dict]:
+    """
+    Reads the cache file.
+
+    :returns: Contents of the cache, or ``None``, if the file is missing, has
+        different header or any of the files listed inside has changed.
+    """
+
+    try:
+        with filename.open(encoding="UTF-8") as cache_file:
+            data = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("header") != header:
+        return None
+
+    for recorded in data.get("files", []):
+        if tuple(recorded) != stat(recorded[0]):
+            return None
+
+    return data
+
+
+def store(filename: Path, data: dict, files: Iterable[str]):
+    """
+    Writes the cache file, together with the current stats of the listed
+    files. Errors are ignored, the cache will be rebuilt next time.
+    """
+
+    data["files"] = [stat(name) for name in sorted(set(files))]
+    try:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        temp = filename.with_name(f"{filename.name}.{os.getpid()}")
+        with temp.open("w", encoding="UTF-8") as cache_file:
+            json.dump(data, cache_file)
+        os.replace(temp, filename)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def ref(function: Any):
+    """
+    Creates a ``"module:qualname"`` reference to a module-level function.
+
+    :raises NotSerializable: if the function cannot be imported by its name.
+    """
+
+    module = getattr(function, "__module__", None)
+    qualname = getattr(function, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        raise NotSerializable()
+    return f"{module}:{qualname}"
+
+
+def resolve_ref(reference: str):
+    module_name, qualname = reference.split(":", 1)
+    result: Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        result = getattr(result, name)
+    return result
+
+
+def lazy_function(reference: str):
+    """
+    Creates a function, which imports the function referenced by
+    :func:`ref` on first call and forwards all keyword arguments to it.
+    """
+
+    def call(**kwargs):
+        return resolve_ref(reference)(**kwargs)
+
+    return call
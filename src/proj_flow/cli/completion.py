@@ -0,0 +1,239 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.cli.completion** keeps a serialized model of the command-line
+parser for :py:mod:`argcomplete`. With valid model, the shell completion is
+answered without loading the flow config, importing the extensions or reading
+``.flow/matrix.yml``.
+
+The model is stored in ``build/.proj-flow/completion.json`` and is rebuilt,
+whenever *Project Flow* version, any of the flow config files,
+``.flow/matrix.yml`` or any of the files the extensions were loaded from
+change.
+"""
+
+import argparse
+import inspect
+import json
+import sys
+import typing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from proj_flow import __version__
+from proj_flow.cli import cache
+
+if typing.TYPE_CHECKING:
+    from proj_flow.api.env import FlowConfig
+    from proj_flow.cli.argument import Parser
+
+MODEL_VERSION = 1
+
+
+@dataclass
+class CompletionStep:
+    name: str
+
+
+@dataclass
+class CompletionFlow:
+    """
+    Part of the :class:`api.env.FlowConfig` used by the completers, restored
+    from the completion model.
+    """
+
+    root: Path
+    steps: typing.List[CompletionStep] = field(default_factory=list)
+    matrix_keys: typing.Dict[str, typing.List[typing.Any]] = field(default_factory=dict)
+
+
+def model_path(root: Path):
+    return cache.cache_dir(root) / "completion.json"
+
+
+def load_parser(root: Path) -> typing.Optional[argparse.ArgumentParser]:
+    """
+    Recreates the parser from the completion model stored in the project
+    under ``root``.
+
+    :returns: Parser ready for :py:mod:`argcomplete`, or ``None``, if there
+        is no valid model.
+    """
+
+    root = root.absolute()
+    model = cache.load(model_path(root), _header())
+    if model is None:
+        return None
+
+    flow = CompletionFlow(
+        root=root,
+        steps=[CompletionStep(name) for name in model["steps"]],
+        matrix_keys=model["matrix"],
+    )
+    try:
+        return _load_parser(model["parser"], flow, None)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_parser(
+    parser: "Parser",
+    flow_cfg: "FlowConfig",
+    dependencies: typing.Optional[typing.List[str]],
+):
+    """
+    Stores the model of fully built parser, so that the next completions can
+    use :func:`load_parser`.
+
+    :param dependencies: Files the registered commands were loaded from, as
+        returned by :func:`manifest.load_extensions()
+        <proj_flow.cli.manifest.load_extensions>`. If ``None``, the model is
+        not stored.
+    """
+
+    if dependencies is None or not (flow_cfg.root / ".flow").is_dir():
+        return
+
+    try:
+        matrix_keys = flow_cfg.matrix_keys
+    except Exception:
+        matrix_keys = {}
+
+    model = {
+        "header": _header(),
+        "steps": [step.name for step in flow_cfg.steps],
+        "matrix": matrix_keys,
+    }
+
+    try:
+        model["parser"] = _dump_parser(parser, _action_kinds(parser))
+        json.dumps(model)
+    except (cache.NotSerializable, TypeError, ValueError):
+        return
+
+    files = [
+        *cache.config_files(flow_cfg.root),
+        str(flow_cfg.root / ".flow" / "matrix.yml"),
+        *dependencies,
+    ]
+    cache.store(model_path(flow_cfg.root), model, files)
+
+
+def _header():
+    return {
+        "completion": MODEL_VERSION,
+        "proj-flow": __version__,
+        "python": sys.executable,
+    }
+
+
+def _action_kinds(parser: argparse.ArgumentParser) -> typing.Dict[type, str]:
+    registry: typing.Dict[typing.Optional[str], type] = parser._registries["action"]  # type: ignore
+    return {ctor: kind for kind, ctor in registry.items() if kind is not None}
+
+
+def _dump_parser(parser: argparse.ArgumentParser, kinds: typing.Dict[type, str]):
+    actions: typing.List[dict] = []
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            actions.append(_dump_subparsers(action, kinds))
+        else:
+            actions.append(_dump_action(action, kinds))
+
+    groups = [
+        {
+            "required": group.required,
+            "actions": [
+                parser._actions.index(action) for action in group._group_actions
+            ],
+        }
+        for group in parser._mutually_exclusive_groups
+    ]
+
+    return {"description": parser.description, "actions": actions, "groups": groups}
+
+
+def _dump_action(action: argparse.Action, kinds: typing.Dict[type, str]):
+    kind = kinds.get(type(action))
+    if kind is None or action.type is not None:
+        raise cache.NotSerializable()
+
+    dumped: typing.Dict[str, typing.Any] = {"kind": kind}
+    for name in inspect.signature(type(action)).parameters:
+        if name != "type":
+            dumped[name] = getattr(action, name)
+
+    completer = getattr(action, "completer", None)
+    if completer is not None:
+        dumped["completer"] = cache.ref(completer)
+
+    return dumped
+
+
+def _dump_subparsers(action: argparse._SubParsersAction, kinds: typing.Dict[type, str]):
+    helps = {choice.dest: choice.help for choice in action._choices_actions}
+    parsers: typing.List[dict] = []
+    for name, parser in action.choices.items():
+        dumped = {"name": name, "parser": _dump_parser(parser, kinds)}
+        if name in helps:
+            dumped["help"] = helps[name]
+        parsers.append(dumped)
+
+    return {
+        "kind": "parsers",
+        "dest": action.dest,
+        "required": action.required,
+        "help": action.help,
+        "metavar": action.metavar,
+        "parsers": parsers,
+    }
+
+
+def _load_parser(
+    model: dict,
+    flow: CompletionFlow,
+    subparsers: typing.Optional[argparse._SubParsersAction],
+    **kwargs,
+):
+    if subparsers is None:
+        parser = argparse.ArgumentParser(
+            prog="proj-flow", description=model["description"], add_help=False
+        )
+    else:
+        parser = subparsers.add_parser(
+            description=model["description"], add_help=False, **kwargs
+        )
+    setattr(parser, "flow", flow)
+
+    containers: typing.Dict[int, typing.Any] = {}
+    for group in model["groups"]:
+        container = parser.add_mutually_exclusive_group(required=group["required"])
+        for index in group["actions"]:
+            containers[index] = container
+
+    registry: typing.Dict[typing.Optional[str], type] = parser._registries["action"]  # type: ignore
+    for index, dumped in enumerate(model["actions"]):
+        dumped = {**dumped}
+        kind = dumped.pop("kind")
+
+        if kind == "parsers":
+            children = dumped.pop("parsers")
+            action = parser.add_subparsers(**dumped)
+            for child in children:
+                child_kwargs = {"help": child["help"]} if "help" in child else {}
+                _load_parser(
+                    child["parser"], flow, action, name=child["name"], **child_kwargs
+                )
+            continue
+
+        completer = dumped.pop("completer", None)
+        if isinstance(dumped.get("metavar"), list):
+            dumped["metavar"] = tuple(dumped["metavar"])
+
+        action = registry[kind](**dumped)
+        if completer is not None:
+            setattr(action, "completer", cache.lazy_function(completer))
+        containers.get(index, parser)._add_action(action)
+
+    return parser
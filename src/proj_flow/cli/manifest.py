@@ -0,0 +1,279 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.cli.manifest** keeps a manifest of commands and steps
+registered by the extensions from flow config. With valid manifest, the
+extensions are not imported on startup; instead, their commands and steps are
+declared from the manifest and the actual modules are imported only, when any
+of them is about to be run.
+
+The manifest is stored in ``build/.proj-flow/manifest.json`` and is rebuilt,
+whenever *Project Flow* version, the flow config files or any of the Python
+files imported by the extensions change.
+"""
+
+import inspect
+import json
+import os
+import sys
+import typing
+
+from proj_flow import __version__
+from proj_flow.api import arg, env, step
+from proj_flow.base import inspect as _inspect
+from proj_flow.base import plugins
+from proj_flow.cli import argument, cache
+from proj_flow.flow import configs
+
+MANIFEST_VERSION = 1
+
+_ARGUMENT_FIELDS = [
+    "help",
+    "names",
+    "nargs",
+    "opt",
+    "meta",
+    "action",
+    "default",
+    "choices",
+]
+
+_ADDITIONAL_KINDS: typing.Dict[str, type] = {
+    "configs": configs.Configs,
+    "runtime": env.Runtime,
+    "command": argument.Command,
+}
+
+
+def manifest_path(cfg: env.FlowConfig):
+    return cache.cache_dir(cfg.root) / "manifest.json"
+
+
+def load_extensions(cfg: env.FlowConfig):
+    """
+    Loads ``proj_flow.minimal`` and declares all the other extensions from the
+    manifest, deferring their import. If there is no valid manifest, imports
+    the extensions and tries to write a new manifest.
+
+    :returns: Names of the files the registered commands and steps depend on,
+        or ``None``, if they could not be established.
+    """
+
+    extensions = cfg.prepare_extensions()
+    env.load_extensions(extensions[:1])
+    deferred = extensions[1:]
+
+    if len(deferred) == 0:
+        return []
+
+    if not (cfg.root / ".flow").is_dir():
+        env.load_extensions(deferred)
+        return None
+
+    filename = manifest_path(cfg)
+    header = _header(deferred)
+
+    manifest = cache.load(filename, header)
+    if manifest is not None:
+        _install(manifest)
+        plugins.defer(lambda: _load_deferred(deferred))
+        return [recorded[0] for recorded in manifest.get("files", [])]
+
+    known_commands = _command_entries()
+    known_steps = {id(plugin) for plugin in _registered_steps()}
+    known_modules = set(sys.modules.keys())
+
+    if not env.load_extensions(deferred):
+        return None
+
+    try:
+        manifest = _record(header, known_commands, known_steps)
+    except cache.NotSerializable:
+        return None
+
+    new_modules = [
+        module for name, module in sys.modules.items() if name not in known_modules
+    ]
+    files = sorted({*cache.config_files(cfg.root), *_module_files(new_modules)})
+    cache.store(filename, manifest, files)
+    return files
+
+
+def _load_deferred(extensions: typing.List[str]):
+    env.load_extensions(extensions)
+
+
+def _header(extensions: typing.List[str]):
+    return {
+        "manifest": MANIFEST_VERSION,
+        "proj-flow": __version__,
+        "python": sys.executable,
+        "extensions": extensions,
+    }
+
+
+def _module_files(modules: list):
+    for module in modules:
+        filename = getattr(module, "__file__", None)
+        if isinstance(filename, str):
+            yield os.path.abspath(filename)
+
+
+def _walk_commands(
+    command: arg._Command, path: typing.List[str]
+) -> typing.Generator[typing.Tuple[typing.List[str], arg._Command], None, None]:
+    for name, child in command.subs.items():
+        child_path = [*path, name]
+        if child.entry is not None:
+            yield child_path, child
+        yield from _walk_commands(child, child_path)
+
+
+def _command_entries():
+    return {
+        tuple(path): id(command.entry)
+        for path, command in _walk_commands(arg.get_commands(), [])
+    }
+
+
+def _registered_steps() -> typing.List[step.Step]:
+    return step.__steps
+
+
+def _record(
+    header: dict, known_commands: typing.Dict[tuple, int], known_steps: typing.Set[int]
+):
+    commands: typing.List[dict] = []
+    for path, command in _walk_commands(arg.get_commands(), []):
+        if known_commands.get(tuple(path)) == id(command.entry):
+            continue
+        commands.append(_dump_command(path, command))
+
+    steps: typing.List[dict] = []
+    for plugin in _registered_steps():
+        if id(plugin) in known_steps:
+            continue
+        steps.append(
+            {
+                "name": plugin.name,
+                "runs_after": [*plugin.runs_after],
+                "runs_before": [*plugin.runs_before],
+                "module": plugin.__module__,
+            }
+        )
+
+    manifest = {"header": header, "commands": commands, "steps": steps}
+    try:
+        json.dumps(manifest)
+    except (TypeError, ValueError):
+        raise cache.NotSerializable()
+    return manifest
+
+
+def _dump_command(path: typing.List[str], command: arg._Command):
+    entry = typing.cast(_inspect.Function, command.entry)
+    groups: typing.List[arg.ExclusiveArgumentGroup] = []
+    args: typing.List[dict] = []
+
+    for extracted in argument._extract_args(entry):
+        if isinstance(extracted, argument.AdditionalArgument):
+            kinds = [
+                kind
+                for kind, ctor in _ADDITIONAL_KINDS.items()
+                if ctor is extracted.ctor
+            ]
+            args.append({"name": extracted.name, "kind": kinds[0]})
+            continue
+
+        metadata = extracted.argument
+        dumped: typing.Dict[str, typing.Any] = {"pos": metadata.pos}
+        for field in _ARGUMENT_FIELDS:
+            dumped[field] = arg._eval(getattr(metadata, field))
+        if metadata.completer is not None:
+            dumped["completer"] = cache.ref(metadata.completer)
+        if metadata.group is not None:
+            if all(group is not metadata.group for group in groups):
+                groups.append(metadata.group)
+            dumped["group"] = [
+                index for index, group in enumerate(groups) if group is metadata.group
+            ][0]
+        args.append({"name": extracted.name, "argument": dumped})
+
+    return {
+        "path": path,
+        "module": entry.__module__,
+        "name": entry.__name__,
+        "doc": command.doc,
+        "metadata_only": command.metadata_only,
+        "groups": [{"opt": group.opt} for group in groups],
+        "args": args,
+    }
+
+
+def _load_argument(
+    dumped: dict, groups: typing.List[arg.ExclusiveArgumentGroup]
+) -> arg.Argument:
+    completer = dumped.get("completer")
+    group = dumped.get("group")
+    return arg.Argument(
+        pos=dumped["pos"],
+        completer=cache.lazy_function(completer) if completer else None,
+        group=groups[group] if group is not None else None,
+        **{field: dumped[field] for field in _ARGUMENT_FIELDS},
+    )
+
+
+def _command_proxy(command: dict):
+    path: typing.List[str] = command["path"]
+    module: str = command["module"]
+    groups = [
+        arg.ExclusiveArgumentGroup(opt=group["opt"]) for group in command["groups"]
+    ]
+
+    parameters: typing.List[inspect.Parameter] = []
+    for item in command["args"]:
+        if "kind" in item:
+            annotation: typing.Any = _ADDITIONAL_KINDS[item["kind"]]
+        else:
+            metadata = _load_argument(item["argument"], groups)
+            annotation = typing.Annotated[object, metadata]
+        parameters.append(
+            inspect.Parameter(
+                item["name"], inspect.Parameter.KEYWORD_ONLY, annotation=annotation
+            )
+        )
+
+    def entry(**kwargs):
+        plugins.load_deferred()
+        known = arg.get_commands().find(path)
+        actual = known.entry if known is not None else None
+        if actual is None or actual is entry:
+            raise NameError(
+                f"Command `{' '.join(path)}` was expected in `{module}`, but it is not registered there"
+            )
+        return actual(**kwargs)
+
+    entry.__module__ = module
+    entry.__name__ = command["name"]
+    entry.__qualname__ = command["name"]
+    setattr(entry, "__signature__", inspect.Signature(parameters))
+    return entry
+
+
+def _install(manifest: dict):
+    for command in manifest["commands"]:
+        arg.get_commands().add(
+            command["path"],
+            _command_proxy(command),
+            command["doc"],
+            command["metadata_only"],
+        )
+
+    for plugin in manifest["steps"]:
+        step.register_deferred(
+            plugin["name"],
+            plugin["runs_after"],
+            plugin["runs_before"],
+            plugin["module"],
+        )
@@ -2,5 +2,5 @@
 # This file is licensed under MIT license (see LICENSE for details)
 
 """
-The **proj_flow.ctrf** provides ctrf.io support for report creation.
+The **proj_flow.ctrf** provides ctrf.io support for report creation and merging, and keeps the history of the reported test runs.
 """
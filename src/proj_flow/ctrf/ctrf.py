@@ -7,19 +7,23 @@ The **proj_flow.ctrf.ctrf** provides ctrf.io classes.
 
 import hashlib
 import json
+import sys
 from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
+from typing import Any
 
 from proj_flow import __version__
 
+_STATUSES = frozenset(["passed", "failed", "skipped", "pending", "other"])
 
-@dataclass
+
+@dataclass(slots=True)
 class Tool:
     name: str = field(default="proj_flow-ctrf")
     version: str = field(default=__version__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Summary:
     tests: int = field(default=0)
     passed: int = field(default=0)
@@ -34,10 +38,9 @@ class Summary:
         self.update_start_stop(test)
 
         self.tests += 1
-        for status in ["passed", "failed", "skipped", "pending", "other"]:
-            if test.status == status:
-                setattr(self, status, getattr(self, status) + 1)
-                break
+        status = test.status
+        if status in _STATUSES:
+            setattr(self, status, getattr(self, status) + 1)
 
     def asdict(self):
         values = asdict(self)
@@ -61,6 +64,13 @@ class Summary:
                 self.stop = max(self.stop, test.stop)
 
 
+@dataclass(slots=True)
+class Attachment:
+    name: str
+    contentType: str
+    path: str
+
+
 def _less[T: (str, int)](lhs: T | None, rhs: T | None) -> bool:
     if lhs is None:
         return rhs is not None
@@ -69,7 +79,7 @@ def _less[T: (str, int)](lhs: T | None, rhs: T | None) -> bool:
     return lhs < rhs
 
 
-@dataclass
+@dataclass(slots=True)
 class Test:
     name: str
     filePath: str | None = field(default=None)
@@ -83,6 +93,7 @@ class Test:
     duration: int = field(default=0)
     stdout: list[str] | None = field(default=None)
     stderr: list[str] | None = field(default=None)
+    attachments: list[Attachment] | None = field(default=None)
     id: str | None = field(default=None)
 
     def recalc_name(self):
@@ -105,11 +116,16 @@ class Test:
     def asdict(self):
         if self.id is None:
             self.id = _test_uuid(self)
-        values = asdict(self)
-        for f in fields(self):
-            value = getattr(self, f.name)
+        values: dict[str, Any] = {}
+        for name in _TEST_FIELDS:
+            value = getattr(self, name)
             if value is None:
-                del values[f.name]
+                continue
+            if name == "attachments":
+                value = [asdict(attachment) for attachment in value]
+            elif isinstance(value, list):
+                value = list(value)
+            values[name] = value
         if "filePath" not in values and "line" in values:
             del values["line"]
         return values
@@ -130,12 +146,28 @@ class Test:
 
     @staticmethod
     def from_dict(**kwargs):
-        if "id" in kwargs:
-            del kwargs["id"]
+        # the id is kept, as it was calculated from the same name, suite and
+        # file path; the suite and the file path are shared by many tests
+        if not isinstance(kwargs.get("id"), str):
+            kwargs.pop("id", None)
+        if isinstance(kwargs.get("filePath"), str):
+            kwargs["filePath"] = sys.intern(kwargs["filePath"])
+        if isinstance(kwargs.get("suite"), list):
+            kwargs["suite"] = [
+                sys.intern(name) if isinstance(name, str) else name
+                for name in kwargs["suite"]
+            ]
+        if "attachments" in kwargs:
+            kwargs["attachments"] = [
+                Attachment(**attachment) for attachment in kwargs["attachments"]
+            ]
         return Test(**kwargs)
 
 
-@dataclass
+_TEST_FIELDS = tuple(f.name for f in fields(Test))
+
+
+@dataclass(slots=True)
 class Environment:
     reportName: str | None = field(default=None)
     appName: str | None = field(default=None)
@@ -0,0 +1,431 @@
+# Copyright (c) 2026 Marcin Zdun
+# This file is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.ctrf.history** keeps the results of the test runs in a SQLite
+database and answers questions about them: which tests are the slowest, which
+tests pass and fail without any change, and how the duration of a test
+changed over time.
+"""
+
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast
+
+from proj_flow.ctrf import ctrf
+
+SCHEMA_VERSION = 1
+#: Number of runs kept in the history; older runs are removed, when a new run
+#: is recorded.
+MAX_RUNS = 500
+#: Number of tests inserted at once.
+BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    recorded INTEGER NOT NULL,
+    start INTEGER,
+    stop INTEGER,
+    report TEXT,
+    app TEXT,
+    version TEXT,
+    branch TEXT,
+    revision TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    file TEXT NOT NULL,
+    UNIQUE (name, file)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    test INTEGER NOT NULL REFERENCES tests (id),
+    status TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    PRIMARY KEY (run, test)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_test ON results (test, run);
+"""
+
+
+def history_path(root: Path):
+    """
+    :returns: Location of the history database of the project.
+    """
+    return root / "build" / ".proj-flow" / "test-history.db"
+
+
+@dataclass
+class TestStats:
+    name: str
+    file: str
+    #: Durations in milliseconds, oldest first.
+    durations: list[int] = field(default_factory=list)
+    #: Statuses, oldest first.
+    statuses: list[str] = field(default_factory=list)
+
+    @property
+    def runs(self):
+        return len(self.statuses)
+
+    @property
+    def passed(self):
+        return self.statuses.count("passed")
+
+    @property
+    def failed(self):
+        return self.statuses.count("failed")
+
+    @property
+    def pass_rate(self):
+        decided = self.passed + self.failed
+        return self.passed / decided if decided else 1.0
+
+    @property
+    def flips(self):
+        """
+        Number of times a test changed from passing to failing or back.
+        """
+        decided = [status for status in self.statuses if status in ["passed", "failed"]]
+        return sum(1 for prev, next in zip(decided, decided[1:]) if prev != next)
+
+    @property
+    def total(self):
+        return sum(self.durations)
+
+    @property
+    def mean(self):
+        return statistics.fmean(self.durations) if self.durations else 0.0
+
+    @property
+    def median(self):
+        return statistics.median(self.durations) if self.durations else 0.0
+
+
+@dataclass
+class RunResult:
+    run: int
+    recorded: int
+    branch: str | None
+    status: str
+    duration: int
+
+
+class HistoryError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class History:
+    """
+    Results of the test runs, stored in ``build/.proj-flow/test-history.db``.
+    The runs are kept in the order they were recorded, and only the last
+    :data:`MAX_RUNS` of them are kept.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = self._open()
+        return self._db
+
+    def _open(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10)
+        except (OSError, sqlite3.Error) as ex:
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+
+        try:
+            db.execute("PRAGMA foreign_keys = ON")
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version not in [0, SCHEMA_VERSION]:
+                raise HistoryError(
+                    f"{self.path.as_posix()}: unknown history version {version}"
+                )
+            if version == 0:
+                with db:
+                    db.executescript(_SCHEMA)
+                    db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except sqlite3.Error as ex:
+            db.close()
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+        except HistoryError:
+            db.close()
+            raise
+
+        return db
+
+    def append(self, results: ctrf.Results, source: str):
+        """
+        Records all the tests of a single run.
+
+        :param results: Results of the run.
+        :param source: Name of the tool, which produced the results.
+        :returns: Identifier of the new run.
+        """
+
+        recorder = RunRecorder(self, source)
+        for test in results.tests:
+            recorder.add(test)
+        return recorder.finish(results.summary, results.environment)
+
+    def _execute(self, *args):
+        try:
+            return self.db.execute(*args)
+        except sqlite3.Error as ex:
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+
+    def _executemany(self, *args):
+        try:
+            return self.db.executemany(*args)
+        except sqlite3.Error as ex:
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+
+    def _rollback(self):
+        try:
+            self.db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def stats(self, runs: int, source: str | None = None, name: str | None = None):
+        """
+        Gathers the results of each test from the last runs.
+
+        :param runs: Number of the last runs to look at.
+        :param source: Look only at the runs recorded by this tool.
+        :param name: Look only at the tests with this text in their names.
+        """
+
+        query = (
+            "SELECT tests.name, tests.file, results.status, results.duration "
+            "FROM results JOIN tests ON tests.id = results.test "
+            "WHERE results.run IN (SELECT id FROM runs{where} "
+            "ORDER BY id DESC LIMIT ?){name} "
+            "ORDER BY results.run"
+        )
+        params: list[str | int] = []
+        where = ""
+        if source is not None:
+            where = " WHERE source = ?"
+            params.append(source)
+        params.append(runs)
+        name_filter = ""
+        if name is not None:
+            name_filter = " AND instr(tests.name, ?) > 0"
+            params.append(name)
+
+        stats: dict[tuple[str, str], TestStats] = {}
+        try:
+            for test_name, file, status, duration in self.db.execute(
+                query.format(where=where, name=name_filter), params
+            ):
+                key = (test_name, file)
+                entry = stats.get(key)
+                if entry is None:
+                    entry = stats[key] = TestStats(test_name, file)
+                entry.statuses.append(status)
+                entry.durations.append(duration)
+        except sqlite3.Error as ex:
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+
+        return list(stats.values())
+
+    def results(self, name: str, file: str, runs: int, source: str | None = None):
+        """
+        Lists the results of a single test from the last runs, oldest first.
+        """
+
+        where = "" if source is None else " AND runs.source = ?"
+        params: list[str | int] = [name, file]
+        if source is not None:
+            params.append(source)
+        params.append(runs)
+
+        try:
+            rows = self.db.execute(
+                "SELECT runs.id, runs.recorded, runs.branch, results.status, "
+                "results.duration FROM results "
+                "JOIN runs ON runs.id = results.run "
+                "JOIN tests ON tests.id = results.test "
+                f"WHERE tests.name = ? AND tests.file = ?{where} "
+                "ORDER BY runs.id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        except sqlite3.Error as ex:
+            raise HistoryError(f"{self.path.as_posix()}: {ex}")
+
+        return [RunResult(*row) for row in reversed(rows)]
+
+
+class RunRecorder:
+    """
+    Records the tests of a single run as they come, in batches of
+    :data:`BATCH_SIZE` tests, within one transaction.
+    """
+
+    def __init__(self, history: History, source: str):
+        self.history = history
+        self.batch: list[ctrf.Test] = []
+        cursor = history._execute(
+            "INSERT INTO runs (source, recorded) VALUES (?, ?)",
+            (source, int(time.time() * 1000)),
+        )
+        self.run = cast(int, cursor.lastrowid)
+
+    def add(self, test: ctrf.Test):
+        self.batch.append(test)
+        if len(self.batch) >= BATCH_SIZE:
+            self._flush()
+
+    def finish(self, summary: ctrf.Summary, environment: ctrf.Environment):
+        history = self.history
+        try:
+            self._flush()
+            history._execute(
+                "UPDATE runs SET start = ?, stop = ?, report = ?, app = ?, "
+                "version = ?, branch = ?, revision = ? WHERE id = ?",
+                (
+                    summary.start,
+                    summary.stop,
+                    environment.reportName,
+                    environment.appName,
+                    environment.appVersion,
+                    environment.branchName,
+                    environment.commit,
+                    self.run,
+                ),
+            )
+
+            removed = history._execute(
+                "DELETE FROM runs WHERE id NOT IN "
+                "(SELECT id FROM runs ORDER BY id DESC LIMIT ?)",
+                (MAX_RUNS,),
+            ).rowcount
+            if removed > 0:
+                history._execute(
+                    "DELETE FROM tests WHERE id NOT IN "
+                    "(SELECT DISTINCT test FROM results)"
+                )
+            history.db.commit()
+        except (HistoryError, sqlite3.Error) as ex:
+            self.abort()
+            if isinstance(ex, HistoryError):
+                raise
+            raise HistoryError(f"{history.path.as_posix()}: {ex}")
+
+        return self.run
+
+    def abort(self):
+        self.batch = []
+        self.history._rollback()
+
+    def _flush(self):
+        if not self.batch:
+            return
+
+        keys = [(test.name, test.filePath or "") for test in self.batch]
+        self.history._executemany(
+            "INSERT OR IGNORE INTO tests (name, file) VALUES (?, ?)", keys
+        )
+        self.history._executemany(
+            "INSERT OR REPLACE INTO results (run, test, status, duration) "
+            "SELECT ?, id, ?, ? FROM tests WHERE name = ? AND file = ?",
+            (
+                (self.run, test.status, _duration(test), *key)
+                for test, key in zip(self.batch, keys)
+            ),
+        )
+        self.batch = []
+
+
+def _duration(test: ctrf.Test):
+    if test.duration:
+        return test.duration
+    if test.start is not None and test.stop is not None:
+        return max(0, test.stop - test.start)
+    return 0
+
+
+class Recording:
+    """
+    Appends the tests to the history of the project, while they are read.
+    The history is not essential, so the first error stops the recording and
+    is reported by :meth:`finish`, instead of being raised.
+    """
+
+    def __init__(self, root: Path, source: str):
+        self.error: str | None = None
+        self.history = History(history_path(root))
+        self.recorder: RunRecorder | None = None
+        try:
+            self.recorder = RunRecorder(self.history, source)
+        except HistoryError as ex:
+            self._stop(ex)
+
+    def add(self, test: ctrf.Test):
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.add(test)
+        except HistoryError as ex:
+            self._stop(ex)
+
+    def finish(self, summary: ctrf.Summary, environment: ctrf.Environment):
+        """
+        :returns: Error message, or None, if the results were recorded.
+        """
+
+        if self.recorder is not None:
+            try:
+                self.recorder.finish(summary, environment)
+            except HistoryError as ex:
+                self.error = ex.message
+        self.recorder = None
+        self.history.close()
+        return self.error
+
+    def _stop(self, ex: HistoryError):
+        self.error = ex.message
+        if self.recorder is not None:
+            self.recorder.abort()
+        self.recorder = None
+        self.history.close()
+
+
+def record(root: Path, results: ctrf.Results, source: str):
+    """
+    Appends the results to the history of the project. The history is not
+    essential for the run, so any error is returned instead of raised.
+
+    :returns: Error message, or None, if the results were recorded.
+    """
+
+    try:
+        with History(history_path(root)) as history:
+            history.append(results, source)
+    except HistoryError as ex:
+        return ex.message
+    return None
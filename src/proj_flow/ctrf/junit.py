@@ -3,16 +3,24 @@
 
 """
 The **proj_flow.ctrf.googletest** allows conversion from XML JUnit files
-to JSON ctrf.io files.
+to JSON ctrf.io files. The XML files are read incrementally, test case by
+test case.
 """
 
+import hashlib
+import json
+import os
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, cast
 
 from dateutil import tz
 
-from proj_flow.ctrf import ctrf
+from proj_flow import __version__
+from proj_flow.ctrf import ctrf, stream
+
+CACHE_VERSION = 1
 
 
 def read_junit_testcase(
@@ -104,33 +112,136 @@ def read_junit_testcase(
     return test
 
 
-def read_junit_testsuite(
-    ctrf: ctrf.Results,
-    testsuite_group: str,
-    source_dir: Path,
-    testsuite: ET.Element,
-):
-    testsuite_name = testsuite.attrib.get("name")
-    if not testsuite_name:
-        return
-
-    suite = [testsuite_group, testsuite_name]
-    for testcase in testsuite:
-        if testcase.tag != "testcase":
+def iter_junit_testsuites(testsuite_group: str, filename: Path, source_dir: Path):
+    """
+    Reads the test cases of a JUnit XML file one by one. Each test case is
+    removed from the tree, once it is read, so that files with hundreds of
+    thousands of test cases take as much memory as files with a couple of
+    them.
+    """
+
+    stack: list[ET.Element] = []
+    suite_depth = 0
+    suite: list[str] | None = None
+    for event, element in ET.iterparse(filename, events=("start", "end")):
+        if event == "start":
+            if not stack and element.tag != "testsuite":
+                suite_depth = 1
+            if len(stack) == suite_depth:
+                name = element.attrib.get("name")
+                suite = [testsuite_group, name] if name else None
+            stack.append(element)
             continue
-        test = read_junit_testcase(suite, testcase, source_dir)
-        if test:
-            ctrf.update(test)
+
+        stack.pop()
+        depth = len(stack)
+        if depth == suite_depth + 1:
+            if suite is not None and element.tag == "testcase":
+                test = read_junit_testcase(suite, element, source_dir)
+                if test:
+                    yield test
+            # the parent has only this child left, everything before it was
+            # already removed
+            element.clear()
+            del stack[-1][:]
+        elif depth == suite_depth and depth > 0:
+            element.clear()
+            del stack[-1][:]
 
 
 def read_junit_testsuites(
     ctrf: ctrf.Results, testsuite_group: str, filename: Path, source_dir: Path
 ):
-    tree = ET.parse(filename)
-    root = tree.getroot()
-    if root.tag == "testsuite":
-        read_junit_testsuite(ctrf, testsuite_group, source_dir, root)
-        return
-
-    for testsuite in root:
-        read_junit_testsuite(ctrf, testsuite_group, source_dir, testsuite)
+    for test in iter_junit_testsuites(testsuite_group, filename, source_dir):
+        ctrf.update(test)
+
+
+def convert_junit_file(
+    testsuite_group: str, filename: Path, source_dir: Path, output: Path
+):
+    """
+    Converts a JUnit XML file to a CTRF file, without keeping all the tests
+    in memory. Used by the process pool of the ``"JUnitToCtrf"`` step.
+    """
+
+    tool = ctrf.Tool(name="gtest-to-ctrf")
+    with stream.ReportWriter(output, tool) as writer:
+        for test in iter_junit_testsuites(testsuite_group, filename, source_dir):
+            writer.add(test)
+        writer.close()
+
+
+class ConversionCache:
+    """
+    Remembers the JUnit XML files already converted to CTRF files, by the
+    hash of their contents, in ``build/.proj-flow/junit-ctrf.json``. A file
+    is converted again, if its contents changed, or if the CTRF file is
+    missing or modified.
+    """
+
+    def __init__(self, path: Path, source_dir: Path):
+        self.path = path
+        self.source_dir = source_dir
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.modified = False
+
+        try:
+            with path.open(encoding="UTF-8") as cache_file:
+                data = json.load(cache_file)
+            if isinstance(data, dict) and data.get("header") == _header():
+                self.entries = cast(dict, data.get("files", {}))
+        except (OSError, ValueError):
+            pass
+
+    def key(self, testsuite_group: str, filename: Path):
+        """
+        :returns: Hash of the XML file and everything else, which the
+            conversion depends on, or None, if the file cannot be read.
+        """
+
+        try:
+            with filename.open("rb") as xml_file:
+                digest = hashlib.file_digest(xml_file, "sha256").hexdigest()
+        except OSError:
+            return None
+        return f"{digest}:{testsuite_group}:{self.source_dir.as_posix()}"
+
+    def is_current(self, output: Path, key: str | None):
+        entry = self.entries.get(output.as_posix())
+        if key is None or not isinstance(entry, dict) or entry.get("key") != key:
+            return False
+        try:
+            stat = output.stat()
+        except OSError:
+            return False
+        return entry.get("output") == [stat.st_size, stat.st_mtime_ns]
+
+    def update(self, output: Path, key: str | None):
+        if key is None:
+            return
+        try:
+            stat = output.stat()
+        except OSError:
+            return
+        self.entries[output.as_posix()] = {
+            "key": key,
+            "output": [stat.st_size, stat.st_mtime_ns],
+        }
+        self.modified = True
+
+    def store(self):
+        if not self.modified:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with temp.open("w", encoding="UTF-8") as cache_file:
+                json.dump({"header": _header(), "files": self.entries}, cache_file)
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+
+def _header():
+    return {"cache": CACHE_VERSION, "proj-flow": __version__}
@@ -0,0 +1,201 @@
+# Copyright (c) 2026 Marcin Zdun
+# This file is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.ctrf.stream** reads and writes CTRF reports one test at a
+time, so that merging the reports takes the same memory for ten tests and
+for hundreds of thousands of them.
+"""
+
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator, TextIO, cast
+
+from proj_flow.ctrf.ctrf import Environment, Results, Summary, Test, Tool
+
+READ_SIZE = 1 << 16
+# Bytes of the written tests kept in memory, before the rest is spilled to
+# a file.
+SPOOL_SIZE = 1 << 20
+
+_WS = re.compile(r"[ \t\n\r]*")
+_TESTS_MARKER = "\0tests\0"
+_NUMBER_TAIL = ".eE+-"
+
+
+class _Scanner:
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        # reading more, the longer the value waiting for its end, keeps the
+        # repeated decoding attempts linear
+        chunk = self.file.read(max(READ_SIZE, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = cast(re.Match, _WS.match(self.buffer, self.pos)).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected `{char}', found `{found}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number could continue in the next chunk, either right at
+            # the end of this one, or after its dot or exponent
+            if (
+                end == len(self.buffer)
+                or (
+                    isinstance(value, (int, float)) and self.buffer[end] in _NUMBER_TAIL
+                )
+            ) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _items(self, open: str, close: str) -> Iterator[None]:
+        self.expect(open)
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == close:
+                return
+            if separator != ",":
+                raise ValueError(f"expected `,' or `{close}', found `{separator}'")
+
+    def keys(self) -> Iterator[str]:
+        """
+        Lists the keys of an object; the caller reads the value of each key.
+        """
+        for _ in self._items("{", "}"):
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("expected a key")
+            self.expect(":")
+            yield key
+
+    def elements(self) -> Iterator[None]:
+        """
+        Lists the elements of an array; the caller reads each element.
+        """
+        return self._items("[", "]")
+
+
+class ReportReader:
+    """
+    Reads the tests of a CTRF report one by one. The environment of the
+    report is known, once all the tests are read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.environment = Environment()
+
+    def tests(self) -> Iterator[Test]:
+        with self.path.open(encoding="UTF-8") as report:
+            scanner = _Scanner(report)
+            for key in scanner.keys():
+                if key != "results":
+                    scanner.value()
+                    continue
+
+                for results_key in scanner.keys():
+                    if results_key == "tests":
+                        for _ in scanner.elements():
+                            yield Test.from_dict(**scanner.value())
+                    elif results_key == "environment":
+                        self.environment = Environment.from_dict(**scanner.value())
+                    else:
+                        scanner.value()
+
+
+class ReportWriter:
+    """
+    Writes a CTRF report, taking the tests one by one. The tests are kept in
+    a temporary file, until the summary is known, and the report is
+    written the same way :meth:`Results.store_root_element` writes it.
+    """
+
+    def __init__(self, path: Path, tool: Tool | None = None, compact: bool = False):
+        self.path = path
+        self.tool = tool or Tool()
+        self.compact = compact
+        self.summary = Summary()
+        self.environment = Environment()
+        self._count = 0
+        self._spool = tempfile.SpooledTemporaryFile(
+            SPOOL_SIZE, mode="w+", encoding="UTF-8", newline=""
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self._spool.close()
+
+    def add(self, test: Test):
+        self.summary.update(test)
+        if self.compact:
+            text = json.dumps(test.asdict(), ensure_ascii=False, separators=(",", ":"))
+            self._spool.write(f",{text}" if self._count else text)
+        else:
+            text = json.dumps(test.asdict(), ensure_ascii=False, indent=2)
+            self._spool.write(",\n      " if self._count else "\n      ")
+            self._spool.write(text.replace("\n", "\n      "))
+        self._count += 1
+
+    def close(self):
+        results = Results(tool=self.tool, summary=self.summary)
+        results.environment = self.environment
+        root = results.root_element()
+        root["results"]["tests"] = _TESTS_MARKER
+        if self.compact:
+            text = json.dumps(root, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(root, ensure_ascii=False, indent=2)
+        head, tail = text.split(json.dumps(_TESTS_MARKER), 1)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w", encoding="UTF-8", newline="") as output:
+            output.write(head)
+            output.write("[")
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, output)
+            if self._count and not self.compact:
+                output.write("\n    ")
+            output.write("]")
+            output.write(tail)
+        self._spool.close()
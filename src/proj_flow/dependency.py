@@ -5,12 +5,15 @@
 The **proj_flow.dependency** verifies availabilty of Step's external tools.
 """
 
+import json
+import os
 import re
 import sys
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from enum import Enum
-from importlib.metadata import version as package_version
-from typing import Callable, List, Set, Tuple, cast
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, cast
 
 from proj_flow.base import cmd
 
@@ -115,7 +118,113 @@ def gather(steps: list):
     return result
 
 
-def verify(deps: List[Dependency]):
+@dataclass
+class ToolVersion:
+    """
+    Version reported by a tool for ``--version``, together with the identity
+    of the executable, which reported it.
+    """
+
+    path: str
+    inode: int
+    mtime_ns: int
+    size: int
+    version: Optional[str]
+
+    @staticmethod
+    def identity(path: str):
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def matches(self, path: str):
+        try:
+            return self.path == path and (
+                self.inode,
+                self.mtime_ns,
+                self.size,
+            ) == ToolVersion.identity(path)
+        except OSError:
+            return False
+
+
+def load_tool_versions(filename: Path) -> Dict[str, ToolVersion]:
+    try:
+        with open(filename, encoding="UTF-8") as cache_file:
+            data = json.load(cache_file)
+        return {name: ToolVersion(**entry) for name, entry in data.items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def store_tool_versions(filename: Path, tools: Dict[str, ToolVersion]):
+    try:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        temp = filename.with_name(f"{filename.name}.{os.getpid()}")
+        with open(temp, "w", encoding="UTF-8") as cache_file:
+            json.dump({name: asdict(tool) for name, tool in tools.items()}, cache_file)
+        os.replace(temp, filename)
+    except OSError:
+        pass
+
+
+def _probe_version(path: str) -> Tuple[bool, Optional[str], str]:
+    proc = cmd.run(path, "--version", capture_output=True)
+    if not proc:
+        return (False, None, "")
+    if proc.returncode:
+        return (False, None, proc.stderr or "")
+    m = VER_REGEX.search(proc.stdout)
+    return (True, m.group(0) if m is not None else None, "")
+
+
+def _probe_all(paths: Dict[str, str], cache: Dict[str, ToolVersion]):
+    """
+    Runs ``--version`` for all the tools, which are not in the cache or
+    changed since they were cached. Successful answers are added to the cache.
+
+    :returns: Map from tool name to the version and the error output, and
+        a flag telling, if the cache was updated.
+    """
+
+    result: Dict[str, Tuple[Optional[str], str]] = {}
+    to_probe: List[str] = []
+    for name, path in paths.items():
+        cached = cache.get(name)
+        if cached is not None and cached.matches(path):
+            result[name] = (cached.version, "")
+        else:
+            to_probe.append(name)
+
+    if len(to_probe) == 0:
+        return result, False
+
+    with ThreadPoolExecutor(max_workers=min(len(to_probe), 8)) as executor:
+        probes = executor.map(_probe_version, (paths[name] for name in to_probe))
+        for name, (success, version, stderr) in zip(to_probe, probes):
+            result[name] = (version, stderr)
+            cache.pop(name, None)
+            if not success:
+                continue
+            try:
+                inode, mtime_ns, size = ToolVersion.identity(paths[name])
+            except OSError:
+                continue
+            cache[name] = ToolVersion(paths[name], inode, mtime_ns, size, version)
+
+    return result, True
+
+
+def verify(deps: List[Dependency], cache_file: Optional[Path] = None):
+    """
+    Checks, if all the dependencies are present in required versions.
+
+    :param deps: Dependencies gathered from the steps.
+    :param cache_file: Optional file, where versions of the tools are kept
+        between the runs. Version of a tool is asked for again, if the tool
+        resolves to another file or the file has changed.
+    :returns: Sorted list of error messages.
+    """
+
     uniq: List[Dependency] = []
     errors: Set[str] = set()
     for dep in sorted(deps):
@@ -123,6 +232,8 @@ def verify(deps: List[Dependency]):
             uniq.append(dep)
 
     for pkg in (dep for dep in uniq if dep.kind == DepKind.PYTHON_PKG):
+        from importlib.metadata import version as package_version
+
         try:
             version = package_version(pkg.name)
         except Exception as ex:
@@ -132,20 +243,25 @@ def verify(deps: List[Dependency]):
         if msg is not None:
             errors.add(msg)
 
+    apps: List[Dependency] = []
+    paths: Dict[str, str] = {}
     for app in (dep for dep in uniq if dep.kind == DepKind.APP):
-        if not cmd.is_tool(app.name):
+        path = cmd.which(app.name)
+        if path is None:
             errors.add(f"{app.name}: tool is missing")
             continue
-        proc = cmd.run(app.name, "--version", capture_output=True)
-        if not proc:
-            version = None
-        elif proc.returncode:
-            if proc.stderr:
-                print(proc.stderr.rstrip(), file=sys.stderr)
-            version = None
-        else:
-            m = VER_REGEX.search(proc.stdout)
-            version = m.group(0) if m is not None else None
+        apps.append(app)
+        paths[app.name] = path
+
+    cache = load_tool_versions(cache_file) if cache_file is not None else {}
+    versions, updated = _probe_all(paths, cache)
+    if cache_file is not None and updated:
+        store_tool_versions(cache_file, cache)
+
+    for app in apps:
+        version, stderr = versions[app.name]
+        if stderr:
+            print(stderr.rstrip(), file=sys.stderr)
 
         if version is None and app.version_expression != "":
             errors.add(
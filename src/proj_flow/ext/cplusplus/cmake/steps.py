@@ -67,7 +67,27 @@ class CMakeConfig(CMakeBase):
     def directories_to_remove(self, config: env.Config) -> List[Path]:
         return [config.build_dir]
 
+    def inputs(self, config: env.Config, rt: env.Runtime):
+        return step.StepInputs(
+            files=[Path("CMakeLists.txt"), Path("CMakePresets.json")],
+            values={
+                "preset": f"{config.preset}-{config.build_generator}",
+                "defines": self._defines(config, rt),
+                "compiler": config.compiler,
+            },
+            tools=["cmake", *config.compiler],
+            outputs=[config.build_dir / "CMakeCache.txt"],
+        )
+
     def run(self, config: env.Config, rt: env.Runtime) -> int:
+        return rt.cmd(
+            "cmake",
+            "--preset",
+            f"{config.preset}-{config.build_generator}",
+            *self._defines(config, rt),
+        )
+
+    def _defines(self, config: env.Config, rt: env.Runtime):
         cmake_vars = cast(Dict[str, str], rt._cfg.get("cmake", {}).get("vars", {}))
         defines: List[str] = []
         for var in cmake_vars:
@@ -89,12 +109,7 @@ class CMakeConfig(CMakeBase):
 
             defines.append(f"-D{var}={value}")
 
-        return rt.cmd(
-            "cmake",
-            "--preset",
-            f"{config.preset}-{config.build_generator}",
-            *defines,
-        )
+        return defines
 
 
 @step.register()
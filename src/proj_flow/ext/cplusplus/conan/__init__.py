@@ -38,6 +38,19 @@ class ConanConfig:
     def directories_to_remove(self, _: env.Config) -> List[Path]:
         return [CONAN_DIR]
 
+    def inputs(self, config: env.Config, rt: env.Runtime):
+        return step.StepInputs(
+            files=[Path("conanfile.txt"), Path("conanfile.py")],
+            values={
+                "conan_settings": config.items.get("conan_settings", []),
+                "conan2_settings": config.items.get("conan2_settings", []),
+                "build_type": config.build_type,
+                "compiler": config.compiler,
+            },
+            tools=["conan", *config.compiler],
+            outputs=[CONAN_DIR / f"{CONAN_PROFILE_GEN}-{config.preset}"],
+        )
+
     def run(self, config: env.Config, rt: env.Runtime) -> int:
         api = conan_api()
 
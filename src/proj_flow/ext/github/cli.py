@@ -16,7 +16,7 @@ import typing
 
 from proj_flow import log
 from proj_flow.api import arg, env, release
-from proj_flow.base import cmd
+from proj_flow.base import cmd, digest
 from proj_flow.base.name_list import name_list
 from proj_flow.ext.github import publishing
 from proj_flow.flow.configs import Configs
@@ -204,15 +204,43 @@ def publish(
 
     if upload is not None:
         matcher = publishing.build_regex(project)
-        directory, names = publishing.gather_artifacts(upload, matcher)
+        source, names = publishing.open_artifacts(upload, matcher)
+        directory = source.directory
         if not len(names):
             rt.fatal(f"No artifact matches {matcher.pattern}")
 
-        publishing.checksums(rt, directory, names, "sha256sum.txt")
-
+        cache = digest.DigestCache(
+            str(rt.root / "build" / ".proj-flow" / "digests.json")
+        )
+        digests = publishing.Digests(source, cache)
         if release_info is not None:
-            gh_links.upload_to_release(release_info, directory, names)
+            # the checksum file needs the digests, which are calculated
+            # during the uploads of the artifacts
+            failed = (
+                gh_links.upload_to_release(
+                    release_info, directory, names, digest=digests.get, source=source
+                )
+                or []
+            )
+            publishing.checksums(rt, directory, names, "sha256sum.txt", digests)
+            failed.extend(
+                gh_links.upload_to_release(
+                    release_info,
+                    directory,
+                    names[-1:],
+                    digest=digests.get,
+                    source=source,
+                )
+                or []
+            )
+            cache.store()
+            source.close()
+            if failed:
+                rt.fatal(f"Cannot upload {', '.join(failed)}")
         else:
+            publishing.checksums(rt, directory, names, "sha256sum.txt", digests)
+            cache.store()
+            source.close()
             rt.message(f"Would upload:", level=env.Msg.STATUS)
             for name in names:
                 rt.message(f"  * {name}", level=env.Msg.STATUS)
@@ -7,14 +7,17 @@ publish`` command.
 """
 
 
-import hashlib
-import io
 import os
 import re
+import threading
 import typing
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 from proj_flow.api import env, release
+from proj_flow.base import digest
+from proj_flow.log import commit
 
 
 def _safe_regex(value: str) -> str:
@@ -30,37 +33,144 @@ def build_regex(project: release.Project):
     return re.compile(regex)
 
 
-def gather_artifacts(directory: str, matcher: re.Pattern):
-    names: list[str] = []
+class ZipArtifacts(commit.ArtifactSource):
+    """
+    Reads the artifacts straight from a zip archive, e.g. a downloaded CI
+    artifact, without extracting them. Only the members matching the
+    artifact names are read from the archive; other files, like the checksum
+    file, are kept in the directory next to the archive, even if the archive
+    has a stale copy of them. If an artifact is needed on the disk, it is
+    extracted only for as long as it is needed.
+    """
+
+    def __init__(self, archive: str, directory: str, matcher: re.Pattern):
+        super().__init__(directory)
+        self.archive = archive
+        self.zip = zipfile.ZipFile(archive)
+        self.names = [name for name in self.zip.namelist() if matcher.match(name)]
+        self.members = set(self.names)
+
+    def close(self):
+        self.zip.close()
+
+    def open(self, name: str) -> typing.BinaryIO:
+        if name not in self.members:
+            return super().open(name)
+        return typing.cast(typing.BinaryIO, self.zip.open(name))
+
+    def size(self, name: str) -> int:
+        if name not in self.members:
+            return super().size(name)
+        return self.zip.getinfo(name).file_size
+
+    def state(self, name: str) -> typing.Tuple[str, list, int]:
+        if name not in self.members:
+            return super().state(name)
+        info = self.zip.getinfo(name)
+        stat = os.stat(self.archive)
+        return (
+            f"{os.path.abspath(self.archive)}/{name}",
+            [stat.st_size, stat.st_mtime_ns, info.CRC, info.file_size],
+            stat.st_mtime_ns,
+        )
+
+    @contextmanager
+    def local_file(self, name: str) -> typing.Iterator[str]:
+        if name not in self.members:
+            with super().local_file(name) as path:
+                yield path
+            return
+
+        path = self.zip.extract(name, path=self.directory)
+        try:
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def open_artifacts(directory: str, matcher: re.Pattern):
+    """
+    Lists the artifacts matching the package name, either in the directory,
+    or in the zip archive, e.g. a downloaded CI artifact. The artifacts are
+    left in the archive, to be read from there; the files written next to
+    them, like the checksum file, go to the ``<archive>-dir`` directory.
+
+    :returns: Source of the artifacts and their names.
+    """
+
+    source: commit.ArtifactSource
     if os.path.isdir(directory):
+        names: typing.List[str] = []
         for _, dirnames, filenames in os.walk(directory):
             dirnames[:] = []
             names = [name for name in filenames if matcher.match(name)]
+        source = commit.ArtifactSource(directory)
     else:
         next_directory = f"{directory}-dir"
         os.makedirs(next_directory, exist_ok=True)
-        with zipfile.ZipFile(directory) as zip:
-            names = [name for name in zip.namelist() if matcher.match(name)]
-            for name in names:
-                zip.extract(name, path=next_directory)
-        directory = next_directory
+        source = ZipArtifacts(directory, next_directory, matcher)
+        names = [*source.names]
+
+    return source, names
+
+
+class Digests:
+    """
+    Keeps the SHA-256 of each artifact, so that the uploads and the checksum
+    file calculate it only once. Safe to use from many threads.
+    """
+
+    def __init__(
+        self,
+        source: commit.ArtifactSource,
+        cache: typing.Optional[digest.DigestCache] = None,
+    ):
+        self.source = source
+        self.cache = cache
+        self._digests: typing.Dict[str, str] = {}
+        self._lock = threading.Lock()
 
-    return directory, names
+    def get(self, name: str) -> str:
+        with self._lock:
+            sha = self._digests.get(name)
+        if sha is None:
+            if self.cache is not None:
+                sha = self.cache.hash_entry(
+                    *self.source.state(name), lambda: self._calculate(name)
+                )["sha256"]
+            else:
+                sha = self._calculate(name)["sha256"]
+            with self._lock:
+                self._digests[name] = sha
+        return sha
 
+    def get_all(self, names: typing.List[str]) -> typing.List[str]:
+        if len(names) < 2:
+            return [self.get(name) for name in names]
+        jobs = min(len(names), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(self.get, names))
 
-def _hash(filename: str) -> str:
-    sha = hashlib.sha256()
-    with open(filename, "rb") as data:
-        for block in iter(lambda: data.read(io.DEFAULT_BUFFER_SIZE), b""):
-            sha.update(block)
-    return sha.hexdigest()
+    def _calculate(self, name: str):
+        with self.source.open(name) as data:
+            return digest.hash_stream(data)
 
 
-def checksums(rt: env.Runtime, directory: str, names: typing.List[str], outname: str):
+def checksums(
+    rt: env.Runtime,
+    directory: str,
+    names: typing.List[str],
+    outname: str,
+    digests: typing.Optional[Digests] = None,
+):
     rt.print("sha256sum", "-b")
     if not rt.dry_run:
+        digests = digests or Digests(commit.ArtifactSource(directory))
+        shas = digests.get_all(names)
         with open(os.path.join(directory, outname), "w") as output:
-            for name in names:
-                digest = _hash(os.path.join(directory, name))
-                print(f"{digest} *{name}", file=output)
+            for name, sha in zip(names, shas):
+                print(f"{sha} *{name}", file=output)
     names.append(outname)
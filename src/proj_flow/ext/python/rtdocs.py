@@ -15,7 +15,6 @@ from contextlib import contextmanager
 from typing import Any, Callable, Dict, List, Optional, cast
 
 from proj_flow.api import env, step
-from proj_flow.base import cmd
 
 
 @step.register
@@ -65,31 +64,34 @@ class RTDocs:
             if builder is not None
             else os.path.join(rt.root, "docs/build")
         )
-        os.environ["READTHEDOCS_OUTPUT"] = READTHEDOCS_OUTPUT
-        os.environ["READTHEDOCS"] = "True"
+        # the jobs get their own environment, leaving the one of this
+        # process alone for the steps of other configs run at the same time
+        python = Python(dict(rt.environ if rt.environ is not None else os.environ))
+        python.environ["READTHEDOCS_OUTPUT"] = READTHEDOCS_OUTPUT
+        python.environ["READTHEDOCS"] = "True"
 
         jobs: Dict[str, Callable[[], int]] = {
-            "create_environment": lambda: _activate_virtual_env(
+            "create_environment": lambda: python.activate_virtual_env(
                 venv, os.path.dirname(READTHEDOCS_OUTPUT)
             ),
         }
         if len(python_install):
-            jobs["install"] = lambda: _install(python_install)
+            jobs["install"] = lambda: python.install(python_install)
 
         if builder:
             for format in formats:
-                jobs[f"build/{format}"] = builder.wrap(format)
+                jobs[f"build/{format}"] = builder.wrap(format, python)
 
         for name in build_jobs:
             if name != "build":
-                jobs[name] = lambda: _script(build_jobs[name])
+                jobs[name] = lambda: python.script(build_jobs[name])
                 continue
 
             build_jobs_build = cast(Dict[str, List[str]], build_jobs["build"])
             for format in formats:
                 if format not in build_jobs_build:
                     continue
-                jobs[f"build/{format}"] = lambda: _script(build_jobs_build[name])
+                jobs[f"build/{format}"] = lambda: python.script(build_jobs_build[name])
 
         for job in _job_listing:
             try:
@@ -111,10 +113,10 @@ class Builder(ABC):
     def READTHEDOCS_OUTPUT(self) -> str: ...
 
     @abstractmethod
-    def build(self, target: str) -> int: ...
+    def build(self, target: str, python: "Python") -> int: ...
 
-    def wrap(self, target: str) -> Callable[[], int]:
-        return lambda: self.build(target)
+    def wrap(self, target: str, python: "Python") -> Callable[[], int]:
+        return lambda: self.build(target, python)
 
 
 class Sphinx(Builder):
@@ -133,50 +135,91 @@ class Sphinx(Builder):
         self.source = os.path.dirname(config)
         self.output = os.path.join(os.path.dirname(self.source), "build")
 
-    def build(self, target: str) -> int:
+    def build(self, target: str, python: "Python") -> int:
         """Uses ``spinx-build`` to create the documentation.
 
         :param target: name of the docs format from YAML config
+        :param python: interpreter and environment of the jobs
         :returns: exit code forwarded from the build tool
         """
         builder = "latex" if target == "pdf" else target
-        print(shutil.which("sphinx-build"))
-
-        return subprocess.run(
-            [
-                PYTHON_EXECUTABLE,
-                "-m",
-                "sphinx.cmd.build",
-                "-M",
-                builder,
-                self.source,
-                self.READTHEDOCS_OUTPUT,
-            ],
-            shell=False,
+        print(shutil.which("sphinx-build", path=python.environ.get("PATH")))
+
+        return python.run(
+            "sphinx.cmd.build",
+            "-M",
+            builder,
+            self.source,
+            self.READTHEDOCS_OUTPUT,
+            module=True,
+            capture_output=False,
         ).returncode
 
 
-PYTHON_EXECUTABLE = sys.executable
+class Python:
+    """Interpreter and environment used by the jobs of a single RTD step.
 
+    :param environ: environment of the jobs, changed by activating the virtual
+        environment
+    """
 
-def _python(
-    *args: str,
-    module: Optional[str] = None,
-    capture_output: bool = True,
-) -> subprocess.CompletedProcess:
-    if module is not None:
+    def __init__(self, environ: Dict[str, str]):
+        self.environ = environ
+        self.executable = sys.executable
+
+    def run(
+        self,
+        *args: str,
+        module: bool = False,
+        capture_output: bool = True,
+    ) -> subprocess.CompletedProcess:
+        call = [self.executable, "-m", *args] if module else [self.executable, *args]
         return subprocess.run(
-            [PYTHON_EXECUTABLE, "-m", module, *args],
-            shell=False,
-            capture_output=capture_output,
+            call, shell=False, capture_output=capture_output, env=self.environ
+        )
+
+    def pip(self, *args: str, capture_output: bool = False):
+        return self.run("pip", *args, module=True, capture_output=capture_output)
+
+    def activate_virtual_env(self, venv, root: str):
+        exec_ext = ".exe" if sys.platform == "win32" else ""
+        python_exec = f"python{exec_ext}"
+        bindir = _get_venv_path(root)
+        has_venv = bindir is not None and os.path.isfile(
+            os.path.join(root, bindir, python_exec)
         )
-    return subprocess.run(
-        [PYTHON_EXECUTABLE, *args], shell=False, capture_output=capture_output
-    )
 
+        if not has_venv:
+            venv.create(os.path.join(root, ".venv"), with_pip=True, upgrade_deps=True)
+            bindir = _get_venv_path(root)
+
+        if bindir:
+            bindir = os.path.abspath(os.path.join(root, bindir))
+            PATH = self.environ.get("PATH")
+            self.environ["PATH"] = f"{bindir}{os.pathsep}{PATH}" if PATH else bindir
+        self.executable = (
+            shutil.which("python", path=self.environ.get("PATH")) or sys.executable
+        )
+        return 0
+
+    def install(self, deps: List[Dict[str, Any]]):
+        for dep in deps:
+            try:
+                requirements = dep["requirements"]
+            except KeyError:
+                continue
+
+            result = self.pip("install", "-q", "-r", requirements).returncode
+            if result:
+                return result
+        return 0
 
-def _pip(*args: str, capture_output: bool = False):
-    return _python(*args, module="pip", capture_output=capture_output)
+    def script(self, calls: List[str]):
+        for call in calls:
+            result = subprocess.run(call, shell=True, env=self.environ).returncode
+            if result:
+                return result
+        return 0
 
 
 _build_targets = [
@@ -213,46 +256,3 @@ def _get_venv_path(root: str):
         return scripts
 
     return None
-
-
-def _activate_virtual_env(venv, root: str):
-    global PYTHON_EXECUTABLE
-
-    with cmd.cd(root):
-        exec_ext = ".exe" if sys.platform == "win32" else ""
-        python_exec = f"python{exec_ext}"
-        bindir = _get_venv_path(root)
-        has_venv = bindir is not None and os.path.isfile(
-            os.path.join(bindir, python_exec)
-        )
-
-        if not has_venv:
-            venv.create(".venv", with_pip=True, upgrade_deps=True)
-            bindir = _get_venv_path(root)
-
-        if bindir:
-            PATH = f"{os.path.abspath(bindir)}{os.pathsep}{os.environ['PATH']}"
-            os.environ["PATH"] = PATH
-        PYTHON_EXECUTABLE = shutil.which("python") or sys.executable
-    return 0
-
-
-def _install(deps: List[Dict[str, Any]]):
-    for dep in deps:
-        try:
-            requirements = dep["requirements"]
-        except KeyError:
-            continue
-
-        result = _pip("install", "-q", "-r", requirements).returncode
-        if result:
-            return result
-    return 0
-
-
-def _script(calls: List[str]):
-    for call in calls:
-        result = subprocess.run(call, shell=True).returncode
-        if result:
-            return result
-    return 0
@@ -13,6 +13,7 @@ import platform
 import struct
 import subprocess
 import sys
+import tempfile
 from typing import Iterable, List, Optional, Tuple
 
 from proj_flow.api.env import Config, Msg, Runtime
@@ -126,14 +127,17 @@ if sys.platform == "win32":
             rt.message("proj-flow: sign: signtool.exe not found", level=Msg.ALWAYS)
             return 0
 
-        with open("temp.pfx", "wb") as pfx:
+        # each call gets its own key file, as other configs could be signed
+        # at the same time
+        handle, pfx_path = tempfile.mkstemp(suffix=".pfx")
+        with os.fdopen(handle, "wb") as pfx:
             pfx.write(key.secret)
 
         args = [
             sign_tool,
             "sign",
             "/f",
-            "temp.pfx",
+            pfx_path,
             "/p",
             key.token,
             "/tr",
@@ -147,8 +151,8 @@ if sys.platform == "win32":
 
         result = 1
         try:
-            result = subprocess.run(args, shell=False).returncode
+            result = subprocess.run(args, shell=False, env=rt.environ).returncode
         finally:
-            os.remove("temp.pfx")
+            os.remove(pfx_path)
 
         return result
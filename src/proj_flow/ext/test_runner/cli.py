@@ -3,7 +3,6 @@
 
 import os
 import platform
-import shutil
 import subprocess
 import sys
 import tempfile
@@ -26,8 +25,16 @@ from proj_flow import __version__
 from proj_flow.api import arg, env, release
 from proj_flow.base.cmake_presets import Presets
 from proj_flow.ext.test_runner.driver.commands import HANDLERS
+from proj_flow.ext.test_runner.driver.index import TestIndex
+from proj_flow.ext.test_runner.driver.install import Installation
+from proj_flow.ext.test_runner.driver.shards import (
+    load_durations,
+    parse_shard,
+    select_shard,
+)
 from proj_flow.ext.test_runner.driver.test import Env, Test
 from proj_flow.ext.test_runner.driver.testbed import run_and_report_tests
+from proj_flow.ext.test_runner.utils.fixtures import FixtureCache
 
 RUN_LINEAR = os.environ.get("RUN_LINEAR", 0) != 0
 
@@ -87,6 +94,41 @@ def binary_runner(
             names=["--ctrf-report-name"],
         ),
     ],
+    timeout: Annotated[
+        str | None,
+        arg.Argument(
+            help="Stop tests running longer than SECONDS and report them as failed; "
+            "the test cases may override it with their `timeout' property",
+            meta="SECONDS",
+            opt=True,
+        ),
+    ],
+    fail_fast: Annotated[
+        bool,
+        arg.FlagArgument(
+            help="Stop running tests after the first failure and skip the rest",
+        ),
+    ],
+    shard: Annotated[
+        str | None,
+        arg.Argument(
+            help="Run only the K-th of N parts of the tests, e.g. on one of N "
+            "machines; use `tests merge' to join their CTRF reports",
+            meta="K/N",
+            opt=True,
+        ),
+    ],
+    shard_durations: Annotated[
+        str | None,
+        arg.Argument(
+            help="Balance the --shard parts using test durations from a CTRF "
+            "report of a previous run; the parts get equal numbers of tests "
+            "otherwise",
+            meta="FILE",
+            opt=True,
+            names=["--shard-durations"],
+        ),
+    ],
     rt: env.Runtime,
 ) -> int:
     """Run specified tests checking stdout and stderr against expected values"""
@@ -94,6 +136,37 @@ def binary_runner(
     if os.name == "nt":
         sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
 
+    timeout_value: float | None = None
+    if timeout is not None:
+        try:
+            timeout_value = float(timeout)
+        except ValueError:
+            timeout_value = 0
+        if not timeout_value > 0:
+            print(
+                f"error: --timeout: expected a positive number, got `{timeout}`",
+                file=sys.stderr,
+            )
+            return 1
+
+    shard_value: tuple[int, int] | None = None
+    if shard is not None:
+        shard_value = parse_shard(shard)
+        if shard_value is None:
+            print(
+                f"error: --shard: expected K/N, where 1 <= K <= N, got `{shard}`",
+                file=sys.stderr,
+            )
+            return 1
+
+    durations: dict[str, int] = {}
+    if shard_value is not None and shard_durations is not None:
+        try:
+            durations = load_durations(Path(shard_durations))
+        except (OSError, ValueError, AttributeError) as ex:
+            print(f"error: --shard-durations: {ex}", file=sys.stderr)
+            return 1
+
     if not version:
         proj = release.get_project(rt)
         version = str(proj.version)
@@ -179,12 +252,21 @@ def binary_runner(
 
     test_set_dir = test_root_path / tests
 
-    test_files = _enum_tests(test_set_dir, data_dir)
-    tests_to_run = [int(x) for s in (run or []) for x in s.split(",")]
+    index = TestIndex(rt.root / "build" / ".proj-flow" / "test-index.json")
+    test_files = index.enum_tests(test_set_dir, data_dir)
+    tests_to_run = {int(x) for s in (run or []) for x in s.split(",")}
     if not tests_to_run:
-        tests_to_run = list(range(1, len(test_files) + 1))
+        tests_to_run = set(range(1, len(test_files) + 1))
 
-    independent_tests, linear_tests = _load_tests(test_files, tests_to_run)
+    independent_tests, linear_tests = _load_tests(test_files, tests_to_run, index)
+    index.store()
+
+    if shard_value is not None:
+        selected = select_shard(
+            [*independent_tests, *linear_tests], shard_value, durations
+        )
+        independent_tests = [test for test in independent_tests if test[1] in selected]
+        linear_tests = [test for test in linear_tests if test[1] in selected]
 
     if nullify:
         for sequence in (independent_tests, linear_tests):
@@ -223,12 +305,16 @@ def binary_runner(
     else:
         info_block.append(("data", f"{env.data_dir} {env.data_dir_alt}"))
     info_block.append(("tests", tests))
+    if shard_value is not None:
+        info_block.append(("shard", "{}/{}".format(*shard_value)))
     if env.tempdir_alt is None:
         info_block.append(("$TEMP", env.tempdir))
     else:
         info_block.append(("$TEMP", f"{env.tempdir} {env.tempdir_alt}"))
     if independent_tests:
-        info_block.append(("threads", str(thread_count)))
+        info_block.append(("jobs", str(thread_count)))
+    if timeout_value is not None:
+        info_block.append(("timeout", f"{timeout_value:g} s"))
     if sys.prefix != sys.base_prefix:
         info_block.append(
             (
@@ -253,36 +339,24 @@ def binary_runner(
         build_type,
         install_components,
         env,
+        rt.root / "build" / ".proj-flow" / "test-install.json",
     ):
         return 1
 
     return run_and_report_tests(
         independent_tests=independent_tests,
         linear_tests=linear_tests,
-        install_dir=install_dir,
         env=env,
         thread_count=thread_count,
         rt=rt,
         ctrf=ctrf,
         report_name=report_name,
+        timeout=timeout_value,
+        fail_fast=fail_fast,
     )
 
 
-def _enum_tests(test_root: Path, data_dir: Path | None):
-    test_files: list[Path] = []
-    for root, _, files in test_root.walk():
-        for filename in files:
-            if not Path(filename).suffix in [".json", ".yaml", ".yml"]:
-                continue
-            test_path = root / filename
-            if data_dir and test_path.is_relative_to(data_dir):
-                continue
-            test_files.append(test_path)
-
-    return test_files
-
-
-def _load_tests(testsuite: list[Path], run: list[int]):
+def _load_tests(testsuite: list[Path], run: set[int], index: TestIndex):
     counter: int = 0
     independent_tests: list[tuple[Test, int]] = []
     linear_tests: list[tuple[Test, int]] = []
@@ -293,7 +367,7 @@ def _load_tests(testsuite: list[Path], run: list[int]):
             continue
 
         try:
-            test = Test.load(filename, counter)
+            test = index.load(filename, counter)
             if not test.ok:
                 continue
         except Exception:
@@ -373,6 +447,8 @@ def _make_env(
         tempdir_alt=tempdir_alt,
         builtin_patches=patches,
         reportable_env_prefix=env_prefix,
+        fixtures=FixtureCache(Path("build").resolve() / ".testing" / ".fixtures"),
+        artifacts_dir=str(Path("build").resolve() / "test-artifacts"),
     )
 
 
@@ -382,33 +458,15 @@ def _install(
     build_type: str,
     components: list[str],
     env: Env,
+    stamp: Path,
 ):
     dst = Path(dst)
-    shutil.rmtree(dst, ignore_errors=True)
-    dst.mkdir(parents=True, exist_ok=True)
-
-    args = [
-        _cmake_executable(binary_dir),
-        "--install",
-        str(binary_dir),
-        "--config",
-        build_type,
-        "--prefix",
-        str(dst),
-    ]
+    installation = Installation(dst, Path(binary_dir), build_type, components, stamp)
+    if not installation.install(_cmake_executable(binary_dir)):
+        return False
 
     if not components:
-        proc = subprocess.run(args, capture_output=True)
-        return proc.returncode == 0
-
-    args.append("--component")
-    args.append("")
-
-    for component in components:
-        args[-1] = component
-        proc = subprocess.run(args, capture_output=True)
-        if proc.returncode != 0:
-            return False
+        return True
 
     env.target = str(dst / "bin" / os.path.basename(env.target))
     target_name = os.path.split(env.target)[1]
@@ -17,9 +17,23 @@ _ro_mask = 0o777 ^ _w_mask
 _wo_mask = 0o777 ^ _r_mask
 
 
+def _fixtures(test: test.Test):
+    env = test.current_env
+    return env.fixtures if env is not None else None
+
+
+def _copy_up(test: test.Test, filename: str):
+    fixtures = _fixtures(test)
+    if fixtures is not None:
+        fixtures.copy_up(filename)
+
+
 def _touch(test: test.Test, args: list[str]):
     filename = test.path(args[0])
     os.makedirs(os.path.dirname(filename), exist_ok=True)
+    fixtures = _fixtures(test)
+    if fixtures is not None:
+        fixtures.detach(filename)
     with open(filename, "wb") as f:
         if len(args) > 1:
             f.write(args[1].encode("UTF-8"))
@@ -27,6 +41,7 @@ def _touch(test: test.Test, args: list[str]):
 
 def _make_RO(test: test.Test, args: list[str]):
     filename = test.path(args[0])
+    _copy_up(test, filename)
     mode = os.stat(filename).st_mode
     _file_cache[filename] = mode
     os.chmod(filename, mode & _ro_mask)
@@ -34,6 +49,7 @@ def _make_RO(test: test.Test, args: list[str]):
 
 def _make_WO(test: test.Test, args: list[str]):
     filename = test.path(args[0])
+    _copy_up(test, filename)
     mode = os.stat(filename).st_mode
     _file_cache[filename] = mode
     os.chmod(filename, mode & _wo_mask)
@@ -41,6 +57,7 @@ def _make_WO(test: test.Test, args: list[str]):
 
 def _make_RW(test: test.Test, args: list[str]):
     filename = test.path(args[0])
+    _copy_up(test, filename)
     try:
         mode = _file_cache[filename]
     except KeyError:
@@ -51,6 +68,10 @@ def _make_RW(test: test.Test, args: list[str]):
 def _unpack(test: test.Test, args: list[str]):
     archive = args[0]
     dst = args[1]
+    fixtures = _fixtures(test)
+    if fixtures is not None:
+        fixtures.unpack(archive, test.path(dst), link=test.link_fixtures)
+        return
     unpack = locate_unpack(archive)[0]
     unpack(archive, test.path(dst))
 
@@ -3,28 +3,14 @@
 
 import os
 import random
-import re
 import string
 from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Callable
 
+from proj_flow.ext.test_runner.utils.fixtures import FixtureCache
 from proj_flow.ext.test_runner.utils.io import ProcessIO
-
-
-def _alt_sep(input: str, value: str, var: str):
-    split = input.split(value)
-    first = split[0]
-    split = split[1:]
-    for index in range(len(split)):
-        m = re.match(r"^(\S+)((\n|.)*)$", split[index])
-        if m is None:
-            continue
-        g2 = m.group(2)
-        if g2 is None:
-            g2 = ""
-        split[index] = "{}{}".format(m.group(1).replace(os.sep, "/"), g2)
-    return var.join([first, *split])
+from proj_flow.ext.test_runner.utils.patches import get_patcher
 
 
 @dataclass
@@ -44,6 +30,8 @@ class Env:
     # TODO: installable patches
     builtin_patches: dict[str, str] | None = None
     reportable_env_prefix: str | None = None
+    fixtures: FixtureCache | None = None
+    artifacts_dir: str | None = None
 
     def with_random_temp_subdir(self):
         temp_instance = "".join(random.choice(string.ascii_letters) for _ in range(16))
@@ -69,45 +57,28 @@ class Env:
         return input
 
     def patch_io(self, io: ProcessIO, cwd: str, patches: dict[str, str]):
-        stdout = io.stdout
-        stderr = io.stderr
-        if os.name == "nt":
-            stdout = stdout.replace("\r\n", "\n")
-            stderr = stderr.replace("\r\n", "\n")
         return ProcessIO(
             returncode=io.returncode,
-            stdout=self.patch(stdout, cwd, patches),
-            stderr=self.patch(stderr, cwd, patches),
+            stdout=self.patch_output(io.stdout, cwd, patches),
+            stderr=self.patch_output(io.stderr, cwd, patches),
         )
 
+    def patch_output(self, output: str, cwd: str, patches: dict[str, str]):
+        if os.name == "nt":
+            output = output.replace("\r\n", "\n")
+        return self.patch(output, cwd, patches)
+
     def patch(self, input: str, cwd: str, patches: dict[str, str]):
-        input = _alt_sep(input, cwd, "$CWD")
-        input = _alt_sep(input, self.tempdir, "$TMP")
-        input = _alt_sep(input, self.data_dir, "$DATA")
-        input = input.replace(self.version, "$VERSION")
+        return self.patcher(cwd, patches).patch(input)
 
+    def patcher(self, cwd: str, patches: dict[str, str]):
+        dirs = ((cwd, "$CWD"), (self.tempdir, "$TMP"), (self.data_dir, "$DATA"))
+        alt_dirs: tuple[tuple[str, str], ...] = ()
         if self.tempdir_alt is not None:
-            input = _alt_sep(input, self.tempdir_alt, "$TMP")
-            if self.data_dir_alt:
-                input = _alt_sep(input, self.data_dir_alt, "$DATA")
-
-        builtins = self.builtin_patches or {}
-
-        lines = input.split("\n")
-        for patch, replacement in builtins.items():
-            pattern = re.compile(patch)
-            for lineno in range(len(lines)):
-                m = pattern.match(lines[lineno])
-                if m:
-                    lines[lineno] = m.expand(replacement)
+            alt_dirs = ((self.tempdir_alt, "$TMP"), (self.data_dir_alt or "", "$DATA"))
 
-        for patch, replacement in patches.items():
-            pattern = re.compile(patch)
-            for lineno in range(len(lines)):
-                m = pattern.match(lines[lineno])
-                if m:
-                    lines[lineno] = m.expand(replacement)
-        return "\n".join(lines)
+        line_patches = (*(self.builtin_patches or {}).items(), *patches.items())
+        return get_patcher(dirs, self.version, alt_dirs, line_patches)
 
     def source_dir(self):
         key = "CMAKE_HOME_DIRECTORY"
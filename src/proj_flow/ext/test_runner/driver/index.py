@@ -0,0 +1,180 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, cast
+
+import yaml
+
+from proj_flow import __version__
+from proj_flow.ext.test_runner.driver.test import Loader, Test
+
+INDEX_VERSION = 1
+TEST_EXTENSIONS = [".json", ".yaml", ".yml"]
+# Entries modified this close to the scan could be modified again without
+# changing their modification time; they are not cached.
+_RACY_NS = 2_000_000_000
+
+
+def _header():
+    return {"index": INDEX_VERSION, "proj-flow": __version__}
+
+
+class TestIndex:
+    """
+    Keeps the listings of the test directories and the parsed test cases in
+    ``build/.proj-flow/test-index.json``. A directory is listed again only,
+    if its modification time changed, and a test case is parsed again only,
+    if its modification time or size changed.
+    """
+
+    path: Path
+    dirs: dict[str, dict[str, Any]]
+    files: dict[str, dict[str, Any]]
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.dirs = {}
+        self.files = {}
+        self.modified = False
+        self.started = time.time_ns()
+
+        try:
+            with path.open(encoding="UTF-8") as index_file:
+                data = json.load(index_file)
+            if isinstance(data, dict) and data.get("header") == _header():
+                self.dirs = cast(dict, data.get("dirs", {}))
+                self.files = cast(dict, data.get("files", {}))
+        except (OSError, ValueError):
+            pass
+
+    def enum_tests(self, test_root: Path, data_dir: Path | None):
+        """
+        Lists all the test cases under the ``test_root``, skipping the
+        ``data_dir``.
+        """
+
+        test_files: list[Path] = []
+        visited: set[str] = set()
+        stack = [test_root]
+        while stack:
+            root = stack.pop()
+            if data_dir and root.is_relative_to(data_dir):
+                continue
+
+            visited.add(str(root))
+            listing = self._list_dir(root)
+            if listing is None:
+                continue
+
+            subdirs, files = listing
+            stack.extend(root / name for name in reversed(subdirs))
+            test_files.extend(
+                root / filename
+                for filename in files
+                if Path(filename).suffix in TEST_EXTENSIONS
+            )
+
+        # forget the directories and test cases removed since the last run
+        listed = {str(filename) for filename in test_files}
+        prefix = os.path.join(str(test_root), "")
+        for entries, known in [(self.dirs, visited), (self.files, listed)]:
+            for key in [key for key in entries if key.startswith(prefix)]:
+                if key not in known:
+                    self._forget(entries, key)
+
+        return test_files
+
+    def load(self, filename: Path, count: int):
+        key = str(filename)
+        try:
+            stat = filename.stat()
+        except OSError:
+            self._forget(self.files, key)
+            return Test.load(filename, count)
+
+        entry = self.files.get(key)
+        if (
+            entry is not None
+            and entry.get("mtime") == stat.st_mtime_ns
+            and entry.get("size") == stat.st_size
+        ):
+            return Test(json.loads(entry["data"]), filename, count)
+
+        contents = filename.read_text(encoding="UTF-8")
+        tree = cast(dict, yaml.load(contents, Loader=Loader))
+
+        self._forget(self.files, key)
+        if not self._racy(stat.st_mtime_ns):
+            try:
+                data = json.dumps(tree)
+                if json.loads(data) == tree:
+                    self.files[key] = {
+                        "mtime": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                        "data": data,
+                    }
+                    self.modified = True
+            except (TypeError, ValueError):
+                pass
+
+        return Test(tree, filename, count)
+
+    def store(self):
+        if not self.modified:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with temp.open("w", encoding="UTF-8") as index_file:
+                json.dump(
+                    {"header": _header(), "dirs": self.dirs, "files": self.files},
+                    index_file,
+                )
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+    def _racy(self, mtime_ns: int):
+        return mtime_ns + _RACY_NS > self.started
+
+    def _forget(self, entries: dict[str, dict[str, Any]], key: str):
+        if entries.pop(key, None) is not None:
+            self.modified = True
+
+    def _list_dir(self, root: Path) -> tuple[list[str], list[str]] | None:
+        key = str(root)
+        try:
+            mtime = root.stat().st_mtime_ns
+        except OSError:
+            self._forget(self.dirs, key)
+            return None
+
+        entry = self.dirs.get(key)
+        if entry is not None and entry.get("mtime") == mtime:
+            return entry["dirs"], entry["files"]
+
+        subdirs: list[str] = []
+        files: list[str] = []
+        try:
+            with os.scandir(root) as it:
+                for dir_entry in it:
+                    if dir_entry.is_dir(follow_symlinks=False):
+                        subdirs.append(dir_entry.name)
+                    else:
+                        files.append(dir_entry.name)
+        except OSError:
+            self._forget(self.dirs, key)
+            return None
+
+        subdirs.sort()
+        files.sort()
+        self._forget(self.dirs, key)
+        if not self._racy(mtime):
+            self.dirs[key] = {"mtime": mtime, "dirs": subdirs, "files": files}
+            self.modified = True
+        return subdirs, files
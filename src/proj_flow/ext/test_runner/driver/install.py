@@ -0,0 +1,219 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, cast
+
+from proj_flow import __version__
+
+STAMP_VERSION = 1
+# Files modified this close to the installation could be modified again
+# without changing their modification time; the installation is not stamped.
+_RACY_NS = 2_000_000_000
+_INCLUDE = re.compile(r'^\s*include\("([^"$]+/cmake_install\.cmake)"', re.MULTILINE)
+_FILE_INSTALL = re.compile(r"^\s*file\(INSTALL\b.*$", re.MULTILINE)
+_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+FileState = tuple[int, int] | None
+
+
+def _state(path: str) -> FileState:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _is_absolute(path: str):
+    return path.startswith("/") or re.match(r"^[A-Za-z]:/", path) is not None
+
+
+def _install_inputs(binary_dir: Path):
+    """
+    Follows the ``cmake_install.cmake`` scripts of the build tree and lists
+    them, together with all the files and directories they install.
+    """
+
+    inputs: dict[str, FileState] = {}
+    scripts = [binary_dir / "cmake_install.cmake"]
+    while scripts:
+        script = scripts.pop()
+        key = script.as_posix()
+        if key in inputs:
+            continue
+        inputs[key] = _state(key)
+        try:
+            text = script.read_text(encoding="UTF-8")
+        except OSError:
+            continue
+
+        scripts.extend(Path(path) for path in _INCLUDE.findall(text))
+        for line in _FILE_INSTALL.findall(text):
+            for path in _QUOTED.findall(line):
+                if "$" in path or not _is_absolute(path):
+                    continue
+                if os.path.isdir(path):
+                    for root, _, files in os.walk(path):
+                        for filename in files:
+                            full = Path(root, filename).as_posix()
+                            inputs[full] = _state(full)
+                else:
+                    inputs[path] = _state(path)
+
+    return inputs
+
+
+def _manifests(binary_dir: Path, components: list[str]):
+    names = (
+        [f"install_manifest_{component}.txt" for component in components]
+        if components
+        else ["install_manifest.txt"]
+    )
+    installed: set[str] = set()
+    for name in names:
+        try:
+            text = (binary_dir / name).read_text(encoding="UTF-8")
+        except OSError:
+            return None
+        installed.update(line for line in text.split("\n") if line)
+    return installed
+
+
+class Installation:
+    """
+    Keeps the test installation in ``build/.test-runner`` between the runs,
+    with a stamp in ``build/.proj-flow/test-install.json``. The ``cmake
+    --install`` is skipped, if neither the install scripts, nor the files
+    they install, nor the installed files changed since the last run.
+    Otherwise, the components are installed in parallel and the files
+    not listed in the new install manifests are removed.
+    """
+
+    def __init__(
+        self,
+        dst: Path,
+        binary_dir: Path,
+        build_type: str,
+        components: list[str],
+        stamp: Path,
+    ):
+        self.dst = dst
+        self.binary_dir = binary_dir
+        self.build_type = build_type
+        self.components = components
+        self.stamp = stamp
+
+    def install(self, cmake: str) -> bool:
+        started = time.time_ns()
+        key = {
+            "stamp": STAMP_VERSION,
+            "proj-flow": __version__,
+            "cmake": cmake,
+            "binary-dir": self.binary_dir.as_posix(),
+            "config": self.build_type,
+            "components": self.components,
+            "prefix": self.dst.as_posix(),
+        }
+        inputs = _install_inputs(self.binary_dir)
+        if self._up_to_date(key, inputs):
+            return True
+
+        self.stamp.unlink(missing_ok=True)
+        self.dst.mkdir(parents=True, exist_ok=True)
+
+        args = [
+            cmake,
+            "--install",
+            str(self.binary_dir),
+            "--config",
+            self.build_type,
+            "--prefix",
+            str(self.dst),
+        ]
+        runs = (
+            [[*args, "--component", component] for component in self.components]
+            if self.components
+            else [args]
+        )
+        with ThreadPoolExecutor(max_workers=min(len(runs), os.cpu_count() or 1)) as ex:
+            results = list(
+                ex.map(lambda args: subprocess.run(args, capture_output=True), runs)
+            )
+        if any(proc.returncode != 0 for proc in results):
+            return False
+
+        installed = _manifests(self.binary_dir, self.components)
+        if installed is None:
+            return True
+
+        self._prune(installed)
+        state = {path: _state(path) for path in sorted(installed)}
+        if self._racy(started, inputs):
+            return True
+
+        try:
+            self.stamp.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.stamp.with_name(f"{self.stamp.name}.{os.getpid()}")
+            with temp.open("w", encoding="UTF-8") as stamp_file:
+                json.dump(
+                    {"key": key, "inputs": inputs, "installed": state}, stamp_file
+                )
+            os.replace(temp, self.stamp)
+        except OSError:
+            pass
+
+        return True
+
+    def _up_to_date(self, key: dict[str, Any], inputs: dict[str, FileState]):
+        try:
+            with self.stamp.open(encoding="UTF-8") as stamp_file:
+                data = cast(dict, json.load(stamp_file))
+        except (OSError, ValueError):
+            return False
+
+        if not isinstance(data, dict) or data.get("key") != key:
+            return False
+
+        # JSON keeps the tuples as lists
+        stored = _stored(data.get("inputs"))
+        if stored is None or stored != inputs:
+            return False
+
+        installed = _stored(data.get("installed"))
+        if installed is None:
+            return False
+        return all(_state(path) == state for path, state in installed.items())
+
+    def _prune(self, installed: set[str]):
+        known = {os.path.normpath(path) for path in installed}
+        for root, _, files in os.walk(self.dst):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if os.path.normpath(path) not in known:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+    @staticmethod
+    def _racy(started: int, inputs: dict[str, FileState]):
+        return any(
+            entry is not None and entry[0] + _RACY_NS > started
+            for entry in inputs.values()
+        )
+
+
+def _stored(entries: Any) -> dict[str, FileState] | None:
+    if not isinstance(entries, dict):
+        return None
+    return {
+        path: tuple(entry) if isinstance(entry, list) else None
+        for path, entry in entries.items()
+    }
@@ -0,0 +1,98 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+import json
+import re
+import statistics
+from pathlib import Path
+from typing import cast
+
+from proj_flow.ext.test_runner.driver.test import Test
+
+_SHARD = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def parse_shard(value: str) -> tuple[int, int] | None:
+    """
+    Parses the ``K/N`` value of ``--shard``.
+
+    :returns: One-based index of the shard and number of the shards, or None,
+        if the value is not valid.
+    """
+
+    m = _SHARD.match(value)
+    if m is None:
+        return None
+    index, count = int(m.group(1)), int(m.group(2))
+    if not 1 <= index <= count:
+        return None
+    return index, count
+
+
+def load_durations(path: Path) -> dict[str, int]:
+    """
+    Reads the durations of the tests from a CTRF report, by the paths of
+    their test cases.
+    """
+
+    data = json.loads(path.read_bytes())
+    tests = cast(list[dict], data.get("results", {}).get("tests", []))
+    durations: dict[str, int] = {}
+    for test in tests:
+        file_path = test.get("filePath")
+        if not isinstance(file_path, str):
+            continue
+        duration = test.get("duration")
+        if not isinstance(duration, int) or not duration:
+            start, stop = test.get("start"), test.get("stop")
+            if not isinstance(start, int) or not isinstance(stop, int):
+                continue
+            duration = max(0, stop - start)
+        durations[file_path] = duration
+    return durations
+
+
+def _find_duration(test: Test, durations: dict[str, int]):
+    # the report keeps paths relative to the source directory, which could be
+    # in a different place on each machine
+    parts = test.filename.as_posix().split("/")
+    for index in range(len(parts)):
+        duration = durations.get("/".join(parts[index:]))
+        if duration is not None:
+            return duration
+    return None
+
+
+def select_shard(
+    tests: list[tuple[Test, int]],
+    shard: tuple[int, int],
+    durations: dict[str, int],
+) -> set[int]:
+    """
+    Splits the tests into shards of similar total duration and lists the
+    counters of the tests in the selected shard. Tests without known
+    durations count as a typical test; with no durations at all, the shards
+    get the same number of tests. Given the same tests and durations, each
+    machine splits them the same way.
+    """
+
+    index, count = shard
+    known = {
+        counter: _find_duration(test, durations) if durations else None
+        for test, counter in tests
+    }
+    found = [duration for duration in known.values() if duration is not None]
+    typical = max(1, round(statistics.median(found))) if found else 1
+    weights = {
+        counter: max(1, duration) if duration is not None else typical
+        for counter, duration in known.items()
+    }
+
+    loads = [0] * count
+    selected: set[int] = set()
+    for counter in sorted(weights, key=lambda counter: (-weights[counter], counter)):
+        target = min(range(count), key=lambda shard_index: loads[shard_index])
+        loads[target] += weights[counter]
+        if target == index - 1:
+            selected.add(counter)
+    return selected
@@ -1,6 +1,7 @@
 # Copyright (c) 2026 Marcin Zdun
 # This code is licensed under MIT license (see LICENSE for details)
 
+import asyncio
 import os
 import random
 import shlex
@@ -8,7 +9,6 @@ import shutil
 import string
 import subprocess
 import sys
-from difflib import unified_diff
 from pathlib import Path
 from typing import cast
 
@@ -16,7 +16,8 @@ import yaml
 
 from proj_flow.ext.test_runner.driver.env import Env
 from proj_flow.ext.test_runner.driver.file_writes import FileWrite
-from proj_flow.ext.test_runner.utils.io import ProcessIO
+from proj_flow.ext.test_runner.utils.diffs import bounded_diff, clip_repr
+from proj_flow.ext.test_runner.utils.io import ProcessIO, StreamCapture, run_captured
 
 try:
     from yaml import CDumper as Dumper
@@ -37,7 +38,7 @@ def _last_enter(value: str):
 def _diff(expected, actual):
     expected = _last_enter(expected).splitlines(keepends=False)
     actual = _last_enter(actual).splitlines(keepends=False)
-    return "\n".join(list(unified_diff(expected, actual, lineterm=""))[2:])
+    return bounded_diff(expected, actual)
 
 
 def str_presenter(dumper: Dumper, data: str):
@@ -50,6 +51,21 @@ def str_presenter(dumper: Dumper, data: str):
 yaml.add_representer(str, str_presenter, Dumper=Dumper)
 
 
+def _store_artifact(path: Path, content: str | bytes):
+    # the output captured in full is already there
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content.encode("UTF-8") if isinstance(content, str) else content)
+
+
+class TestTimeout(Exception):
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.message = f"Timed out after {timeout:g} s"
+        super().__init__(self.message)
+
+
 def _test_name(filename: Path) -> str:
     dirname = filename.parent.name
     basename = filename.stem
@@ -100,6 +116,8 @@ class Test:
     env: dict[str, str | None]
     prepare: list[list[str]]
     cleanup: list[list[str]]
+    timeout: float | None
+    link_fixtures: bool
 
     def __init__(self, data: dict, filename: Path, count: int):
         self.cwd = os.getcwd()
@@ -112,6 +130,7 @@ class Test:
         self.additional_env = {}
 
         self.linear = cast(bool, data.get("linear", False))
+        self.link_fixtures = data.get("fixtures") == "link"
         self.disabled = cast(bool | str, data.get("disabled", False))
         self.lang = cast(str, data.get("lang", "en"))
         self.args = []
@@ -124,6 +143,7 @@ class Test:
         self.env = {}
         self.prepare = []
         self.cleanup = []
+        self.timeout = None
 
         if isinstance(self.disabled, bool):
             self.ok = not self.disabled
@@ -174,6 +194,10 @@ class Test:
                 returncode=returncode, stdout=stdout, stderr=stderr
             )
 
+        _timeout = data.get("timeout")
+        if isinstance(_timeout, (int, float)) and not isinstance(_timeout, bool):
+            self.timeout = float(_timeout)
+
         _check = cast(dict[str, str], data.get("check", {}))
         for index in range(len(_streams)):
             self.check[index] = _check.get(_streams[index], self.check[index])
@@ -241,7 +265,15 @@ class Test:
             self.current_env = saved
         return True
 
-    def run(self, environment: Env) -> tuple[ProcessIO, list[FileWrite]] | None:
+    async def run(
+        self,
+        environment: Env,
+        timeout: float | None = None,
+        artifacts: Path | None = None,
+    ) -> tuple[ProcessIO, list[FileWrite]] | None:
+        if self.timeout is not None:
+            timeout = self.timeout
+
         root = os.path.join(
             "build",
             ".testing",
@@ -250,7 +282,9 @@ class Test:
         root = self.cwd = os.path.join(self.cwd, root)
         os.makedirs(root, exist_ok=True)
 
-        prep = self.run_cmds(environment, self.prepare, environment.tempdir)
+        prep = await asyncio.to_thread(
+            self.run_cmds, environment, self.prepare, environment.tempdir
+        )
         if prep is None:
             return None
 
@@ -278,29 +312,55 @@ class Test:
                 del _env[key]
 
         cwd = None if self.linear else self.cwd
-        io = ProcessIO()
-        kwargs = {}
-        if self.input is not None:
-            kwargs["input"] = self.input.encode()
-        proc = subprocess.run(
-            [environment.target, *expanded],
-            capture_output=True,
-            env=_env,
-            cwd=self.cwd,
-            **kwargs,
-        )
-        io.append(proc)
-
-        for sub_expanded in post_expanded:
-            if io.returncode != 0:
-                break
-            proc: subprocess.CompletedProcess = subprocess.run(
-                [environment.target, *sub_expanded],
-                capture_output=True,
+        patch_cwd = self.cwd
+        expected = self.expected or ProcessIO()
+        stdout, stderr = [
+            StreamCapture(
+                expected_stream if self.expected else None,
+                check,
+                lambda output: environment.patch_output(
+                    output, patch_cwd, self.patches
+                ),
+                artifact=artifacts / f"{stream}.actual" if artifacts else None,
+            )
+            for expected_stream, check, stream in zip(
+                [expected.stdout, expected.stderr], self.check, _streams
+            )
+        ]
+
+        async def run_all():
+            returncode = await run_captured(
+                [environment.target, *expanded],
+                stdout,
+                stderr,
+                input=self.input.encode() if self.input is not None else None,
                 env=_env,
-                cwd=cwd,
+                cwd=self.cwd,
             )
-            io.append(proc)
+
+            for sub_expanded in post_expanded:
+                if returncode != 0:
+                    break
+                returncode = await run_captured(
+                    [environment.target, *sub_expanded],
+                    stdout,
+                    stderr,
+                    env=_env,
+                    cwd=cwd,
+                )
+
+            return returncode
+
+        try:
+            returncode = await asyncio.wait_for(run_all(), timeout)
+            io = ProcessIO(
+                returncode=returncode, stdout=stdout.result(), stderr=stderr.result()
+            )
+        except asyncio.TimeoutError:
+            raise TestTimeout(cast(float, timeout)) from None
+        finally:
+            stdout.close()
+            stderr.close()
 
         expected_files: list[FileWrite] = []
         for key, value in self.writes.items():
@@ -318,14 +378,13 @@ class Test:
                     FileWrite.load(key, path, environment, cwd=self.cwd, save=save)
                 )
 
-        clean = self.run_cmds(environment, self.cleanup, environment.tempdir)
+        clean = await asyncio.to_thread(
+            self.run_cmds, environment, self.cleanup, environment.tempdir
+        )
         if clean is None:
             return None
 
-        return (
-            environment.patch_io(io, self.cwd, self.patches),
-            expected_files,
-        )
+        return (io, expected_files)
 
     def clip(self, actual: ProcessIO) -> str | ProcessIO:
         if not self.expected:
@@ -354,15 +413,15 @@ class Test:
     ):
         return f"""{header}
   Expected:
-    {pre_mark}{repr(expected)}{post_mark}
+    {pre_mark}{clip_repr(expected)}{post_mark}
   Actual:
-    {pre_mark}{repr(actual)}{post_mark}
+    {pre_mark}{clip_repr(actual)}{post_mark}
 
 Diff:
 {_diff(expected, actual)}
 """
 
-    def report_io(self, actual: ProcessIO):
+    def report_io(self, actual: ProcessIO, artifacts: Path | None = None):
         result = ""
         if not self.expected:
             return result
@@ -378,10 +437,16 @@ Diff:
             (_flds[1], self.check[0], actual.stdout, self.expected.stdout),
             (_flds[2], self.check[1], actual.stderr, self.expected.stderr),
         ]
-        for header, check, actual_stream, expected_stream in streams:
+        for (header, check, actual_stream, expected_stream), stream in zip(
+            streams, _streams
+        ):
             if actual_stream == expected_stream:
                 continue
 
+            if artifacts is not None:
+                _store_artifact(artifacts / f"{stream}.expected", expected_stream)
+                _store_artifact(artifacts / f"{stream}.actual", actual_stream)
+
             if result:
                 result += "\n"
 
@@ -397,10 +462,7 @@ Diff:
 
         return result
 
-    def report_file(
-        self,
-        file: FileWrite,
-    ):
+    def report_file(self, file: FileWrite, artifacts: Path | None = None):
         header = (
             f"{file.generated.filename} [{'BIN' if file.generated.binary else 'TXT'}]"
         )
@@ -415,6 +477,11 @@ Diff:
         if not file.generated.content or not file.template.content:
             return header
 
+        if artifacts is not None:
+            name = Path(file.generated.filename).name
+            _store_artifact(artifacts / f"{name}.expected", file.template.content)
+            _store_artifact(artifacts / f"{name}.actual", file.generated.content)
+
         if file.binary:
             return header + "\n  Binary files differ"
 
@@ -424,7 +491,7 @@ Diff:
             actual=cast(str, file.generated.content),
         )
 
-    def test_footer(self, env: Env, tempdir: str):
+    def test_footer(self, env: Env, tempdir: str, artifacts: Path | None = None):
         _env = {}
         _env["LANGUAGE"] = self.lang
         for key in self.env:
@@ -447,7 +514,10 @@ Diff:
                 *expanded,
             ]
         )
-        return f"{call}\ncwd: {self.cwd}\ntest: {self.filename}"
+        footer = f"{call}\ncwd: {self.cwd}\ntest: {self.filename}"
+        if artifacts is not None and artifacts.is_dir():
+            footer += f"\nartifacts: {artifacts}"
+        return footer
 
     def nullify(self, lang: str | None):
         if lang is not None:
@@ -495,6 +565,9 @@ Diff:
         shutil.rmtree(self.path(sub))
 
     def cp(self, src: str, dst: str):
+        fixtures = self.current_env.fixtures if self.current_env else None
+        if fixtures is not None:
+            fixtures.detach(self.path(dst))
         shutil.copy2(self.path(src), self.path(dst))
 
     def makedirs(self, sub):
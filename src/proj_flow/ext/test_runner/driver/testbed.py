@@ -1,18 +1,22 @@
 # Copyright (c) 2026 Marcin Zdun
 # This code is licensed under MIT license (see LICENSE for details)
 
-import concurrent.futures
+import asyncio
 import json
+import math
 import os
 import shutil
+import sys
 import time
+import traceback
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Generator, Iterator
+from typing import Any, Generator
 
 from proj_flow import __version__
 from proj_flow.api import env
-from proj_flow.ext.test_runner.driver.test import Env, Test
+from proj_flow.ctrf import history
+from proj_flow.ext.test_runner.driver.test import Env, Test, TestTimeout
 from proj_flow.ext.test_runner.utils.counters import (
     Counters,
     ReportTestInfo,
@@ -20,23 +24,44 @@ from proj_flow.ext.test_runner.utils.counters import (
     color,
 )
 
+# Name of the tool the results are recorded for in the test history.
+HISTORY_SOURCE = "test-runner"
+# Runs of the history looked at for the durations of the tests.
+DURATION_RUNS = 10
 
-def _task(
-    runtime: Env, tested: Test, current_counter: int
-) -> tuple[ReportTestInfo, str]:
-    env = runtime.with_random_temp_subdir()
 
+def _test_id(env: Env, tested: Test, current_counter: int):
     test_counter = f"{color.counter}[{current_counter:>{env.counter_digits}}/{env.counter_total}]{color.reset}"
     test_name = f"{color.name}{tested.name}{color.reset}"
-    test_id = f"{test_counter} {test_name}"
+    return f"{test_counter} {test_name}"
+
+
+def _artifacts_dir(env: Env, tested: Test):
+    if env.artifacts_dir is None:
+        return None
+    name = f"{tested.filename.parent.name}-{tested.filename.stem}"
+    return Path(env.artifacts_dir) / name
+
+
+async def _task(
+    runtime: Env, tested: Test, current_counter: int, timeout: float | None
+) -> tuple[ReportTestInfo, str]:
+    env = runtime.with_random_temp_subdir()
+    test_id = _test_id(env, tested, current_counter)
 
     print(test_id)
     os.makedirs(env.tempdir, exist_ok=True)
 
     info = ReportTestInfo(tested, test_id)
+    artifacts = _artifacts_dir(env, tested)
 
     info.start = int(time.time() * 1000 + 0.5)
-    result = tested.run(env)
+    try:
+        result = await tested.run(env, timeout, artifacts)
+    except TestTimeout as ex:
+        info.stop = int(time.time() * 1000 + 0.5)
+        message = f"{ex.message}\n{tested.test_footer(env, env.tempdir)}"
+        return (info.with_outcome(TaskResult.FAILED, message), env.tempdir)
     info.stop = int(time.time() * 1000 + 0.5)
 
     if result is None:
@@ -59,7 +84,7 @@ def _task(
             saved = saved or copied
 
         elif fixed.generated.content != fixed.template.content:
-            reports.append(tested.report_file(fixed))
+            reports.append(tested.report_file(fixed, artifacts))
 
     if saved:
         return (info.with_outcome(TaskResult.SAVED), env.tempdir)
@@ -70,10 +95,11 @@ def _task(
         return (info.with_outcome(TaskResult.CLIP_FAILED, clipped), env.tempdir)
 
     if actual != tested.expected and clipped != tested.expected:
-        reports.append(tested.report_io(actual))
+        reports.append(tested.report_io(actual, artifacts))
 
     if reports:
-        reports.append(tested.test_footer(env, env.tempdir))
+        reports.append(tested.test_footer(env, env.tempdir, artifacts))
+        info.artifacts = artifacts
         return (info.with_outcome(TaskResult.FAILED, "\n".join(reports)), env.tempdir)
 
     return (info.with_outcome(TaskResult.OK), env.tempdir)
@@ -82,59 +108,171 @@ def _task(
 def run_and_report_tests(
     independent_tests: list[tuple[Test, int]],
     linear_tests: list[tuple[Test, int]],
-    install_dir: Path,
     env: Env,
     thread_count: int,
     rt: env.Runtime,
     ctrf: str | None,
     report_name: str | None,
+    timeout: float | None = None,
+    fail_fast: bool = False,
 ):
-    counters = Counters(env.target_name, env.source_dir())
+    if env.artifacts_dir is not None:
+        shutil.rmtree(env.artifacts_dir, ignore_errors=True)
 
-    if independent_tests:
-        _report_tests(counters, _run_async_tests(independent_tests, env, thread_count))
+    counters = Counters(env.target_name, env.source_dir())
+    durations = Durations.from_history(rt.root, counters.src_dir)
 
-    _report_tests(counters, _run_sync_tests(linear_tests, env))
+    engine = _Engine(counters, env, timeout, fail_fast, durations)
+    asyncio.run(engine.run_all(independent_tests, linear_tests, thread_count))
 
-    shutil.rmtree(install_dir, ignore_errors=True)
     shutil.rmtree("build/.testing", ignore_errors=True)
 
-    if ctrf:
-        head = rt.capture("git", "rev-parse", "--abbrev-ref", "HEAD", silent=True)
-        environment = counters.results.environment
-        environment.reportName = report_name
-        environment.appName = env.target_name
-        environment.appVersion = env.version
-        if head.returncode == 0:
-            environment.branchName = head.stdout.strip()
+    head = rt.capture("git", "rev-parse", "--abbrev-ref", "HEAD", silent=True)
+    environment = counters.results.environment
+    environment.reportName = report_name
+    environment.appName = env.target_name
+    environment.appVersion = env.version
+    if head.returncode == 0:
+        environment.branchName = head.stdout.strip()
 
+    if ctrf:
         counters.results.store_root_element(Path(ctrf))
 
+    error = history.record(rt.root, counters.results, HISTORY_SOURCE)
+    if error is not None:
+        print(f"warning: cannot record the test history: {error}", file=sys.stderr)
+
     if not counters.summary(len(independent_tests) + len(linear_tests)):
         return 1
 
     return 0
 
 
-def _run_async_tests(tests: list[tuple[Test, int]], env: Env, thread_count: int):
-    with concurrent.futures.ThreadPoolExecutor(thread_count) as executor:
-        futures: list[concurrent.futures.Future[tuple[ReportTestInfo, str]]] = []
-        for test, counter in tests:
-            futures.append(executor.submit(_task, env, test, counter))
-
-        for future in concurrent.futures.as_completed(futures):
-            yield future.result()
-
-
-def _run_sync_tests(tests: list[tuple[Test, int]], env: Env):
-    for test, counter in tests:
-        yield _task(env, test, counter)
-
-
-def _report_tests(
-    counters: Counters,
-    results: Iterator[tuple[ReportTestInfo, str]],
-):
-    for info, tempdir in results:
-        counters.report(info)
-        shutil.rmtree(tempdir, ignore_errors=True)
+class Durations:
+    """
+    Durations of the tests from the previous runs, taken from the test
+    history, used to start the longest tests first.
+    """
+
+    def __init__(self, src_dir: Path, durations: dict[str, int] | None = None):
+        self.src_dir = src_dir
+        self.durations = durations or {}
+
+    @staticmethod
+    def from_history(root: Path, src_dir: Path):
+        """
+        Reads the last known duration of each test from the last
+        :data:`DURATION_RUNS` runs in the history; a history, which cannot
+        be read, gives no durations.
+        """
+
+        durations: dict[str, int] = {}
+        try:
+            with history.History(history.history_path(root)) as db:
+                for stats in db.stats(DURATION_RUNS, source=HISTORY_SOURCE):
+                    if stats.durations:
+                        durations[stats.file] = stats.durations[-1]
+        except history.HistoryError:
+            pass
+        return Durations(src_dir, durations)
+
+    def get(self, test: Test):
+        # the same path the test is recorded with in the history
+        file = test.filename.relative_to(self.src_dir, walk_up=True).as_posix()
+        return self.durations.get(file)
+
+    def longest_first(self, tests: list[tuple[Test, int]]):
+        """
+        Orders the tests by their last duration, longest first; tests, which
+        were not run before, go first, in their original order.
+        """
+
+        def key(item: tuple[Test, int]):
+            duration = self.get(item[0])
+            return -duration if duration is not None else -math.inf
+
+        return sorted(tests, key=key)
+
+
+class _Engine:
+    def __init__(
+        self,
+        counters: Counters,
+        env: Env,
+        timeout: float | None,
+        fail_fast: bool,
+        durations: Durations,
+    ):
+        self.counters = counters
+        self.env = env
+        self.timeout = timeout
+        self.fail_fast = fail_fast
+        self.durations = durations
+        self.failed = False
+        self.running: set[asyncio.Task] = set()
+
+    async def run_all(
+        self,
+        independent_tests: list[tuple[Test, int]],
+        linear_tests: list[tuple[Test, int]],
+        job_count: int,
+    ):
+        if independent_tests:
+            await self.run(self.durations.longest_first(independent_tests), job_count)
+        await self.run(linear_tests, 1)
+
+    async def run(self, tests: list[tuple[Test, int]], job_count: int):
+        queue = list(reversed(tests))
+        workers = [
+            asyncio.create_task(self._worker(queue))
+            for _ in range(min(job_count, len(queue)))
+        ]
+        self.running.update(workers)
+        results = await asyncio.gather(*workers, return_exceptions=True)
+        self.running.difference_update(workers)
+
+        while queue:
+            self._skip(*queue.pop())
+
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(
+                result, asyncio.CancelledError
+            ):
+                raise result
+
+    async def _worker(self, queue: list[tuple[Test, int]]):
+        while queue and not self.failed:
+            test, counter = queue.pop()
+            try:
+                info, tempdir = await _task(self.env, test, counter, self.timeout)
+            except asyncio.CancelledError:
+                self._skip(test, counter)
+                raise
+            except Exception:
+                # one broken test must not take the rest of the queue with it
+                info = ReportTestInfo(test, _test_id(self.env, test, counter))
+                info.with_outcome(TaskResult.FAILED, traceback.format_exc())
+                self._report(info, None)
+                continue
+
+            self._report(info, tempdir)
+
+    def _report(self, info: ReportTestInfo, tempdir: str | None):
+        self.counters.report(info)
+        if tempdir is not None:
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+        if not self.fail_fast:
+            return
+        if info.outcome not in [TaskResult.FAILED, TaskResult.CLIP_FAILED]:
+            return
+
+        self.failed = True
+        current = asyncio.current_task()
+        for task in self.running:
+            if task is not current:
+                task.cancel()
+
+    def _skip(self, test: Test, counter: int):
+        info = ReportTestInfo(test, _test_id(self.env, test, counter))
+        self.counters.report(info.with_outcome(TaskResult.SKIPPED))
@@ -33,6 +33,7 @@ class ReportTestInfo:
     message: str | None = field(default=None)
     start: int = field(default=0)
     stop: int = field(default=0)
+    artifacts: Path | None = field(default=None)
 
     def with_outcome(self, outcome: int, message: str | None = None):
         self.outcome = outcome
@@ -52,8 +53,21 @@ class ReportTestInfo:
             message=self.message,
             start=self.start,
             stop=self.stop,
+            attachments=self.attachments(src_dir),
         ).recalc_name()
 
+    def attachments(self, src_dir: Path):
+        if self.artifacts is None or not self.artifacts.is_dir():
+            return None
+        return [
+            ctrf.Attachment(
+                name=path.name,
+                contentType="text/plain",
+                path=path.relative_to(src_dir, walk_up=True).as_posix(),
+            )
+            for path in sorted(self.artifacts.iterdir())
+        ] or None
+
 
 @dataclass
 class Counters:
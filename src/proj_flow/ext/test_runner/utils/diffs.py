@@ -0,0 +1,107 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+from difflib import SequenceMatcher
+
+# Characters of each value quoted in a report.
+QUOTE_SIZE = 4096
+# Context lines around each change.
+CONTEXT = 3
+# Hunks shown in a report.
+MAX_HUNKS = 8
+# Characters of the diff shown in a report.
+MAX_DIFF_SIZE = 16384
+# Lines of the differing part of the values, which are compared; the rest of
+# the values is only reported as differing.
+MAX_DIFF_LINES = 5000
+
+
+def clip_repr(value: str, limit: int = QUOTE_SIZE):
+    """
+    Quotes the value like :func:`repr` would, cutting it in the middle, if it
+    is longer than the limit.
+    """
+
+    if len(value) <= limit:
+        return repr(value)
+    half = limit // 2
+    skipped = len(value) - 2 * half
+    return f"{value[:half]!r} [... {skipped} more characters] {value[-half:]!r}"
+
+
+def _range(start: int, length: int):
+    if length == 1:
+        return f"{start + 1}"
+    if length == 0:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def bounded_diff(expected: list[str], actual: list[str]):
+    """
+    Builds a unified diff of the lines, like :func:`difflib.unified_diff`
+    without the file headers, but only for the first :data:`MAX_HUNKS` hunks
+    and :data:`MAX_DIFF_SIZE` characters. The common beginning and end of the
+    values are skipped before the rest is compared, and only the first
+    :data:`MAX_DIFF_LINES` of the rest are compared.
+    """
+
+    prefix = 0
+    limit = min(len(expected), len(actual))
+    while prefix < limit and expected[prefix] == actual[prefix]:
+        prefix += 1
+
+    suffix = 0
+    limit -= prefix
+    while (
+        suffix < limit
+        and expected[len(expected) - suffix - 1] == actual[len(actual) - suffix - 1]
+    ):
+        suffix += 1
+
+    start = max(0, prefix - CONTEXT)
+    expected_stop = len(expected) - max(0, suffix - CONTEXT)
+    actual_stop = len(actual) - max(0, suffix - CONTEXT)
+
+    truncated = False
+    if expected_stop - start > MAX_DIFF_LINES or actual_stop - start > MAX_DIFF_LINES:
+        truncated = True
+        expected_stop = min(expected_stop, start + MAX_DIFF_LINES)
+        actual_stop = min(actual_stop, start + MAX_DIFF_LINES)
+
+    lines: list[str] = []
+    size = 0
+    matcher = SequenceMatcher(
+        None, expected[start:expected_stop], actual[start:actual_stop], autojunk=False
+    )
+    for index, group in enumerate(matcher.get_grouped_opcodes(CONTEXT)):
+        if index == MAX_HUNKS:
+            truncated = True
+            break
+
+        first, last = group[0], group[-1]
+        hunk = [
+            f"@@ -{_range(start + first[1], last[2] - first[1])} "
+            f"+{_range(start + first[3], last[4] - first[3])} @@"
+        ]
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                hunk.extend(f" {line}" for line in expected[start + i1 : start + i2])
+                continue
+            if tag in ["replace", "delete"]:
+                hunk.extend(f"-{line}" for line in expected[start + i1 : start + i2])
+            if tag in ["replace", "insert"]:
+                hunk.extend(f"+{line}" for line in actual[start + j1 : start + j2])
+
+        for line in hunk:
+            size += len(line) + 1
+            if size > MAX_DIFF_SIZE:
+                truncated = True
+                break
+            lines.append(line)
+        if truncated:
+            break
+
+    if truncated:
+        lines.append("[... diff truncated]")
+    return "\n".join(lines)
@@ -0,0 +1,199 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import threading
+from pathlib import Path
+
+from proj_flow.ext.test_runner.utils.archives import locate_unpack
+
+_w_mask = stat.S_IWRITE | stat.S_IWGRP | stat.S_IWOTH
+# ioctl(2) request cloning a file on Btrfs, XFS and other CoW file systems
+_FICLONE = 0x40049409
+_NO_CLONE = [
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EBADF,
+]
+
+
+class FixtureCache:
+    """
+    Unpacks each archive used by the ``unpack`` command once per run, into
+    a template, and then fills the directories of the tests with the files of
+    that template.
+
+    The files are cloned, where the file system supports it; otherwise, each
+    test gets its own, writable copy of them. Tests with ``fixtures: link``
+    get, outside of Windows, hard links to the template files made read-only
+    instead of copies. This is only safe for fixtures, which the programs
+    under test never write to: a write fails, or, for root, changes the
+    template for the other tests. The commands, which modify the file in
+    place (``touch``, ``cp``, ``ro``, ``wo`` and ``rw``), replace the link
+    with a private copy first.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.link = os.name != "nt"
+        self.clone = sys.platform == "linux"
+        self._lock = threading.Lock()
+        self._templates: dict[str, tuple[threading.Lock, Path | None]] = {}
+        # identities of template files and their modes before made read-only
+        self._inodes: dict[tuple[int, int], int] = {}
+
+    def unpack(self, archive: str, dst: str, link: bool = False):
+        """
+        Fills the directory with the files of the archive.
+
+        :param link: Hard-link the files to the template, if they cannot be
+            cloned, instead of copying them.
+        """
+
+        template = self.template(archive)
+        if template is None:
+            unpack = locate_unpack(archive)[0]
+            unpack(archive, dst)
+            return
+        self._materialise(template, Path(dst), link)
+
+    def template(self, archive: str) -> Path | None:
+        try:
+            st = os.stat(archive)
+        except OSError:
+            return None
+
+        key = f"{os.path.abspath(archive)}|{st.st_mtime_ns}|{st.st_size}"
+        with self._lock:
+            entry = self._templates.get(key)
+            if entry is None:
+                entry = self._templates[key] = (threading.Lock(), None)
+        lock, _ = entry
+
+        with lock:
+            _, template = self._templates[key]
+            if template is not None:
+                return template
+
+            name = hashlib.sha1(key.encode("UTF-8")).hexdigest()[:16]
+            template = self.root / name
+            partial = self.root / f"{name}.partial"
+            shutil.rmtree(partial, ignore_errors=True)
+            shutil.rmtree(template, ignore_errors=True)
+            partial.mkdir(parents=True, exist_ok=True)
+
+            unpack = locate_unpack(archive)[0]
+            unpack(archive, str(partial))
+            if self.link:
+                self._protect(partial)
+            os.replace(partial, template)
+
+            self._templates[key] = (lock, template)
+            return template
+
+    def copy_up(self, filename: str):
+        """
+        Replaces a file linked to a template with its private, writable copy.
+        """
+
+        mode = self._linked_mode(filename)
+        if mode is None:
+            return
+
+        temp = f"{filename}.copy-up"
+        shutil.copyfile(filename, temp)
+        os.chmod(temp, mode)
+        os.replace(temp, filename)
+
+    def detach(self, filename: str):
+        """
+        Removes a file linked to a template, before it is written from scratch.
+        """
+
+        if self._linked_mode(filename) is not None:
+            os.unlink(filename)
+
+    def _linked_mode(self, filename: str):
+        if not self._inodes:
+            return None
+        try:
+            st = os.stat(filename, follow_symlinks=False)
+        except OSError:
+            return None
+        if st.st_nlink < 2:
+            return None
+        return self._inodes.get((st.st_dev, st.st_ino))
+
+    def _protect(self, template: Path):
+        for root, _, files in template.walk():
+            for filename in files:
+                path = root / filename
+                st = path.lstat()
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                os.chmod(path, st.st_mode & ~_w_mask)
+                with self._lock:
+                    self._inodes[(st.st_dev, st.st_ino)] = stat.S_IMODE(st.st_mode)
+
+    def _materialise(self, template: Path, dst: Path, link: bool):
+        for root, dirs, files in template.walk():
+            target_dir = dst / root.relative_to(template)
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+            for name in [*dirs]:
+                if (root / name).is_symlink():
+                    dirs.remove(name)
+                    files.append(name)
+
+            for name in files:
+                src = root / name
+                target = target_dir / name
+                if target.is_symlink() or target.exists():
+                    target.unlink()
+
+                if src.is_symlink():
+                    os.symlink(os.readlink(src), target)
+                    continue
+
+                self._place(src, target, link)
+
+    def _place(self, src: Path, dst: Path, link: bool):
+        st = src.stat()
+        mode = self._inodes.get((st.st_dev, st.st_ino), stat.S_IMODE(st.st_mode))
+
+        if self.clone:
+            try:
+                _clone(src, dst)
+                os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+                os.chmod(dst, mode)
+                return
+            except OSError as ex:
+                dst.unlink(missing_ok=True)
+                if ex.errno not in _NO_CLONE:
+                    raise
+                self.clone = False
+
+        if link and self.link:
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                self.link = False
+
+        shutil.copy2(src, dst)
+        os.chmod(dst, mode)
+
+
+def _clone(src: Path, dst: Path):
+    import fcntl
+
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
@@ -1,8 +1,26 @@
 # Copyright (c) 2026 Marcin Zdun
 # This code is licensed under MIT license (see LICENSE for details)
 
+import asyncio
+import codecs
+import os
+import shutil
+import signal
 import subprocess
+import tempfile
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, cast
+
+# Bytes of output kept in memory, before the rest is spilled to a file.
+SPOOL_SIZE = 1 << 20
+# Characters of unexpected output read back from the spill file for a report.
+REPORT_SIZE = 1 << 20
+# Characters kept around the clipped part of the output for a report.
+CLIP_CONTEXT = 4096
+# Longest part of a line waiting for its end, before it is patched anyway.
+MAX_PENDING = 1 << 20
+READ_SIZE = 1 << 16
 
 
 @dataclass
@@ -26,3 +44,268 @@ class ProcessIO:
             self.stderr += "\n"
         self.stdout += proc.stdout.decode()
         self.stderr += proc.stderr.decode()
+
+
+class StreamCapture:
+    """
+    Collects one output stream of a test, patching it line by line while it is
+    read. Only the part needed to compare it with the expected output is kept:
+    with ``check: begin`` the first characters, with ``check: end`` the last
+    characters and with ``check: all`` nothing, as long as the output matches.
+    The output, which does not match, or which is going to be stored in the
+    test case, is kept in a file above :data:`SPOOL_SIZE`.
+
+    Outputs of consecutive processes are joined with a new line, just like
+    :meth:`ProcessIO.append` does.
+
+    If the output does not match and the ``artifact`` is given, the whole
+    output is stored there, since the report gets only a part of it.
+    """
+
+    def __init__(
+        self,
+        expected: str | None,
+        check: str,
+        patch: Callable[[str], str],
+        artifact: Path | None = None,
+    ) -> None:
+        self.expected = expected
+        self.check = check
+        self.patch = patch
+        self.artifact = artifact
+
+        self._decoder: codecs.IncrementalDecoder | None = None
+        self._empty = True
+        self._join = False
+        self._pending = ""
+        self._continued = False
+
+        self._window = ""
+        self._clip = len(expected) if expected is not None else 0
+        self._matching = expected is not None
+        self._offset = 0
+        self._spool: IO[bytes] | None = None
+
+        if expected is None or check not in ["begin", "end"]:
+            self.check = "all"
+        elif check == "end" and self._clip == 0:
+            # ``stream[-0:]`` is the whole stream
+            self.check = "all"
+
+    def start(self):
+        self._decoder = codecs.getincrementaldecoder("UTF-8")()
+        self._join = not self._empty
+
+    def feed(self, data: bytes):
+        if self._decoder is not None:
+            self._push(self._decoder.decode(data))
+
+    def stop(self):
+        if self._decoder is not None:
+            self._push(self._decoder.decode(b"", final=True))
+        self._decoder = None
+
+    def result(self) -> str:
+        """
+        Patches the last line and returns the output kept for the comparison.
+        With ``check: all``, if the output matched, the expected string is
+        returned.
+        """
+
+        self.stop()
+        if self._continued:
+            self._consume(self._pending)
+        else:
+            self._consume(self.patch(self._pending))
+        self._pending = ""
+
+        try:
+            if self.check == "begin":
+                return self._window
+            if self.check == "end":
+                return self._window[-(self._clip + CLIP_CONTEXT) :]
+            if self._matching and self._offset == len(self.expected or ""):
+                return self.expected or ""
+            if self._matching and self.expected is not None:
+                # the output stopped short of the expected one; only its
+                # matching beginning was read, and not written yet
+                self._matching = False
+                self._write(self.expected[: self._offset])
+            self._store_artifact()
+            return self._read_spool()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def _push(self, text: str):
+        if not text:
+            return
+
+        if self._join:
+            text = "\n" + text
+            self._join = False
+        self._empty = False
+
+        if self.check == "begin" and len(self._window) >= self._clip + CLIP_CONTEXT:
+            self._pending = ""
+            return
+
+        self._pending += text
+        if self._continued:
+            # rest of a line, which was too long to wait for its end
+            end = self._pending.find("\n") + 1
+            if end == 0:
+                self._consume(self._pending)
+                self._pending = ""
+                return
+            self._consume(self._pending[:end])
+            self._pending = self._pending[end:]
+            self._continued = False
+
+        cut = self._pending.rfind("\n")
+        if cut < 0:
+            if len(self._pending) >= MAX_PENDING:
+                self._consume(self.patch(self._pending))
+                self._pending = ""
+                self._continued = True
+            return
+
+        # the block keeps its last new line, so that a CRLF is patched whole
+        block, self._pending = self._pending[: cut + 1], self._pending[cut + 1 :]
+        self._consume(self.patch(block))
+
+    def _consume(self, text: str):
+        if self.check == "begin":
+            needed = self._clip + CLIP_CONTEXT - len(self._window)
+            if needed > 0:
+                self._window += text[:needed]
+            return
+
+        if self.check == "end":
+            self._window += text
+            if len(self._window) > 2 * (self._clip + CLIP_CONTEXT):
+                self._window = self._window[-(self._clip + CLIP_CONTEXT) :]
+            return
+
+        if self._matching and self.expected is not None:
+            end = self._offset + len(text)
+            if self.expected[self._offset : end] == text:
+                self._offset = end
+                return
+            self._matching = False
+            self._write(self.expected[: self._offset])
+
+        self._write(text)
+
+    def _write(self, text: str):
+        if not text:
+            return
+        if self._spool is None:
+            self._spool = tempfile.SpooledTemporaryFile(SPOOL_SIZE, mode="w+b")
+        self._spool.write(text.encode("UTF-8"))
+
+    def _store_artifact(self):
+        if self.artifact is None or self.expected is None or self._spool is None:
+            return
+        position = self._spool.tell()
+        self._spool.seek(0)
+        self.artifact.parent.mkdir(parents=True, exist_ok=True)
+        with self.artifact.open("wb") as artifact:
+            shutil.copyfileobj(self._spool, artifact)
+        self._spool.seek(position)
+
+    def _read_spool(self):
+        if self._spool is None:
+            return ""
+
+        size = self._spool.tell()
+        self._spool.seek(0)
+        if self.expected is None:
+            return self._spool.read().decode("UTF-8")
+
+        text = self._spool.read(REPORT_SIZE).decode("UTF-8", errors="ignore")
+        if size > REPORT_SIZE:
+            text += f"\n[... {size - REPORT_SIZE} more bytes]"
+        return text
+
+
+def _kill(proc: asyncio.subprocess.Process):
+    # the output pipes stay open, until all the children of the process exit
+    if proc.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def _read_stream(stream: asyncio.StreamReader, capture: StreamCapture):
+    while True:
+        data = await stream.read(READ_SIZE)
+        if not data:
+            break
+        capture.feed(data)
+
+
+async def _write_stream(stream: asyncio.StreamWriter, data: bytes):
+    try:
+        stream.write(data)
+        await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    finally:
+        stream.close()
+
+
+async def run_captured(
+    args: list[str],
+    stdout: StreamCapture,
+    stderr: StreamCapture,
+    input: bytes | None = None,
+    **kwargs,
+) -> int:
+    """
+    Runs the process, streaming its output into the captures. If the run is
+    cancelled, the process is killed.
+
+    :returns: Return code of the process.
+    """
+
+    stdout.start()
+    stderr.start()
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=os.name != "nt",
+        **kwargs,
+    )
+
+    async def communicate():
+        streams = [
+            _read_stream(cast(asyncio.StreamReader, proc.stdout), stdout),
+            _read_stream(cast(asyncio.StreamReader, proc.stderr), stderr),
+        ]
+        if input is not None:
+            streams.append(_write_stream(cast(asyncio.StreamWriter, proc.stdin), input))
+        await asyncio.gather(*streams)
+        return await proc.wait()
+
+    try:
+        returncode = await communicate()
+    except BaseException:
+        _kill(proc)
+        await proc.wait()
+        raise
+
+    stdout.stop()
+    stderr.stop()
+    return returncode
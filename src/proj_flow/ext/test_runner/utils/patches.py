@@ -0,0 +1,149 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+import bisect
+import functools
+import itertools
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+# Characters matching themselves at the start of a pattern.
+_LITERAL = re.compile(r"\^?([\w ,:;=<>@%&!~'\"/-]*)")
+_PATH = re.compile(r"\S+")
+# Pattern parts, which could behave differently on a line taken out of the
+# output and on the same line inside the output.
+_LINE_SENSITIVE = re.compile(r"\\[AZn]|\(\?<[=!]|\(\?[aiLmsux]*s")
+
+
+@dataclass(frozen=True)
+class LinePatch:
+    pattern: re.Pattern[str]
+    replacement: str
+    # Finds the new lines followed by a line, which could match the pattern,
+    # in the whole output at once, or None, if every line needs to be checked.
+    scanner: re.Pattern[str] | None
+
+
+def _literal_prefix(pattern: str):
+    if "|" in pattern:
+        return ""
+    m = _LITERAL.match(pattern)
+    prefix = m.group(1) if m else ""
+    if prefix and pattern[m.end() : m.end() + 1] in ["*", "?", "+", "{"]:
+        prefix = prefix[:-1]
+    return prefix
+
+
+def _line_patch(pattern: str, replacement: str):
+    compiled = re.compile(pattern)
+    prefix = _literal_prefix(pattern)
+    if prefix:
+        return LinePatch(compiled, replacement, re.compile(re.escape(f"\n{prefix}")))
+
+    scanner = None
+    if _LINE_SENSITIVE.search(pattern) is None:
+        try:
+            scanner = re.compile(f"\n(?=(?:{pattern}))", re.MULTILINE)
+        except re.error:
+            pass
+    return LinePatch(compiled, replacement, scanner)
+
+
+@functools.lru_cache(maxsize=64)
+def compile_line_patches(patches: tuple[tuple[str, str], ...]):
+    return tuple(_line_patch(pattern, replacement) for pattern, replacement in patches)
+
+
+class Patcher:
+    """
+    Replaces directories and version in test output with their variable names
+    and applies line patches to the result, with all the regular expressions
+    compiled once.
+
+    The directories are replaced one after another, in the order given, just
+    like the line patches are applied one after another, each to the result of
+    the previous ones. However, instead of trying to match every line, a line
+    patch first looks up the lines it could match in the whole output at once.
+    """
+
+    def __init__(
+        self,
+        dirs: tuple[tuple[str, str], ...],
+        version: str,
+        alt_dirs: tuple[tuple[str, str], ...],
+        patches: tuple[LinePatch, ...],
+    ):
+        self.dirs = tuple((value, name) for value, name in dirs if value)
+        self.version = version
+        self.alt_dirs = tuple((value, name) for value, name in alt_dirs if value)
+        self.patches = patches
+
+    def patch(self, input: str):
+        return self.patch_lines(self.replace_values(input))
+
+    def replace_values(self, input: str):
+        for value, name in self.dirs:
+            input = _replace_dir(input, value, name)
+        if self.version:
+            input = input.replace(self.version, "$VERSION")
+        for value, name in self.alt_dirs:
+            input = _replace_dir(input, value, name)
+        return input
+
+    def patch_lines(self, input: str):
+        if not self.patches:
+            return input
+
+        lines = input.split("\n")
+        # offsets of all the lines, but the first
+        next_lines = list(itertools.accumulate(len(line) + 1 for line in lines))
+        changed: set[int] = set()
+        for patch in self.patches:
+            if patch.scanner is None:
+                candidates: Iterable[int] = range(len(lines))
+            else:
+                # the first line is not preceded by a new line, check it always
+                found = (m.start() + 1 for m in patch.scanner.finditer(input))
+                candidates = sorted(
+                    changed.union(
+                        [0],
+                        (bisect.bisect_left(next_lines, pos) + 1 for pos in found),
+                    )
+                )
+
+            for lineno in candidates:
+                line = lines[lineno]
+                m = patch.pattern.match(line)
+                if m:
+                    patched = m.expand(patch.replacement)
+                    if patched != line:
+                        lines[lineno] = patched
+                        changed.add(lineno)
+
+        return "\n".join(lines)
+
+
+def _replace_dir(input: str, value: str, name: str):
+    if os.sep == "/":
+        return input.replace(value, name)
+
+    # paths following the directory use forward slashes
+    chunks = input.split(value)
+    for index in range(1, len(chunks)):
+        chunk = chunks[index]
+        m = _PATH.match(chunk)
+        if m is not None:
+            chunks[index] = m.group().replace(os.sep, "/") + chunk[m.end() :]
+    return name.join(chunks)
+
+
+@functools.lru_cache(maxsize=256)
+def get_patcher(
+    dirs: tuple[tuple[str, str], ...],
+    version: str,
+    alt_dirs: tuple[tuple[str, str], ...],
+    patches: tuple[tuple[str, str], ...],
+):
+    return Patcher(dirs, version, alt_dirs, compile_line_patches(patches))
@@ -2,9 +2,9 @@
 # This file is licensed under MIT license (see LICENSE for details)
 
 from proj_flow.api import arg
-from proj_flow.ext.tests import steps
+from proj_flow.ext.tests import history, merge, steps
 
-__all__ = ["tests", "steps"]
+__all__ = ["tests", "history", "merge", "steps"]
 
 
 @arg.command("tests")
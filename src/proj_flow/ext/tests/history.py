@@ -0,0 +1,231 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.ext.tests.history** provides the ``tests history`` commands,
+which look into the results recorded by the test runner and the
+``"MergeCtrfFiles"`` step.
+"""
+
+import sys
+import time
+from typing import Annotated, Callable
+
+from proj_flow.api import arg, env
+from proj_flow.ctrf.history import History, HistoryError, TestStats, history_path
+
+DEFAULT_RUNS = 20
+DEFAULT_LIMIT = 10
+
+_RunsArg = Annotated[
+    str | None,
+    arg.Argument(
+        help=f"Look at the last N recorded runs; defaults to {DEFAULT_RUNS}",
+        meta="N",
+        opt=True,
+    ),
+]
+_LimitArg = Annotated[
+    str | None,
+    arg.Argument(
+        help=f"Show at most N tests; defaults to {DEFAULT_LIMIT}",
+        meta="N",
+        opt=True,
+    ),
+]
+_SourceArg = Annotated[
+    str | None,
+    arg.Argument(
+        help='Look only at the runs recorded by given tool, e.g. "test-runner"',
+        meta="TOOL",
+        opt=True,
+    ),
+]
+
+
+@arg.command("tests", "history")
+def history():
+    """Show the slowest, the flaky and the changing tests from the past runs"""
+
+
+@arg.command("tests", "history", "slowest")
+def slowest(runs: _RunsArg, limit: _LimitArg, source: _SourceArg, rt: env.Runtime):
+    """List the tests taking the most time across the last runs"""
+
+    def select(stats: list[TestStats], limit: int):
+        return sorted(stats, key=lambda entry: entry.total, reverse=True)[:limit]
+
+    def show(stats: list[TestStats], total: int):
+        rows = [["mean", "median", "max", "share", "runs", "test"]]
+        for entry in stats:
+            share = entry.total / total if total else 0.0
+            rows.append(
+                [
+                    _ms(entry.mean),
+                    _ms(entry.median),
+                    _ms(max(entry.durations)),
+                    f"{share:.1%}",
+                    str(entry.runs),
+                    _test_name(entry),
+                ]
+            )
+        _print_table(rows)
+
+    return _query(rt, runs, limit, source, None, select, show)
+
+
+@arg.command("tests", "history", "flaky")
+def flaky(runs: _RunsArg, limit: _LimitArg, source: _SourceArg, rt: env.Runtime):
+    """List the tests, which both passed and failed in the last runs"""
+
+    def select(stats: list[TestStats], limit: int):
+        unstable = [entry for entry in stats if entry.passed and entry.failed]
+        return sorted(unstable, key=lambda entry: (-entry.flips, entry.pass_rate))[
+            :limit
+        ]
+
+    def show(stats: list[TestStats], _: int):
+        if not stats:
+            print("No flaky tests.")
+            return
+
+        rows = [["pass rate", "flips", "runs", "recent", "test"]]
+        for entry in stats:
+            rows.append(
+                [
+                    f"{entry.pass_rate:.0%}",
+                    str(entry.flips),
+                    str(entry.runs),
+                    _recent(entry.statuses),
+                    _test_name(entry),
+                ]
+            )
+        _print_table(rows)
+
+    return _query(rt, runs, limit, source, None, select, show)
+
+
+@arg.command("tests", "history", "trend")
+def trend(
+    test: Annotated[
+        list[str],
+        arg.Argument(
+            help="Show tests with this text in their names", meta="NAME", pos=True
+        ),
+    ],
+    runs: _RunsArg,
+    limit: _LimitArg,
+    source: _SourceArg,
+    rt: env.Runtime,
+):
+    """Show the durations of matching tests in each of the last runs"""
+
+    name = test[0]
+
+    def select(stats: list[TestStats], limit: int):
+        return stats[:limit]
+
+    def show(stats: list[TestStats], _: int):
+        if not stats:
+            print(f"No tests matching `{name}`.")
+            return
+
+        for index, entry in enumerate(stats):
+            if index:
+                print()
+            print(_test_name(entry))
+            rows = [["run", "date", "branch", "status", "duration", "vs median"]]
+            median = entry.median
+            with History(history_path(rt.root)) as database:
+                results = database.results(
+                    entry.name, entry.file, len(entry.statuses), source
+                )
+            for result in results:
+                change = f"{result.duration / median - 1:+.0%}" if median else ""
+                rows.append(
+                    [
+                        str(result.run),
+                        time.strftime(
+                            "%Y-%m-%d %H:%M", time.localtime(result.recorded / 1000)
+                        ),
+                        result.branch or "",
+                        result.status,
+                        _ms(result.duration),
+                        change,
+                    ]
+                )
+            _print_table(rows, indent="  ")
+
+    return _query(rt, runs, limit, source, name, select, show)
+
+
+def _query(
+    rt: env.Runtime,
+    runs: str | None,
+    limit: str | None,
+    source: str | None,
+    name: str | None,
+    select: Callable[[list[TestStats], int], list[TestStats]],
+    show: Callable[[list[TestStats], int], None],
+):
+    run_count = _positive("--runs", runs, DEFAULT_RUNS)
+    limit_count = _positive("--limit", limit, DEFAULT_LIMIT)
+    if run_count is None or limit_count is None:
+        return 1
+
+    path = history_path(rt.root)
+    if not path.is_file():
+        print("No test runs recorded yet.")
+        return 0
+
+    try:
+        with History(path) as database:
+            stats = database.stats(run_count, source, name)
+        total = sum(entry.total for entry in stats)
+        show(select(stats, limit_count), total)
+    except HistoryError as ex:
+        print(f"proj-flow: error: {ex.message}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def _positive(name: str, value: str | None, default: int):
+    if value is None:
+        return default
+    try:
+        result = int(value)
+        if result > 0:
+            return result
+    except ValueError:
+        pass
+    print(
+        f"proj-flow: error: {name}: expected a positive number, got `{value}`",
+        file=sys.stderr,
+    )
+    return None
+
+
+def _ms(value: float):
+    if value >= 1000:
+        return f"{value / 1000:.2f} s"
+    return f"{value:.0f} ms"
+
+
+def _test_name(entry: TestStats):
+    if entry.file:
+        return f"{entry.name} ({entry.file})"
+    return entry.name
+
+
+def _recent(statuses: list[str]):
+    marks = {"passed": ".", "failed": "F", "skipped": "s"}
+    return "".join(marks.get(status, "?") for status in statuses[-10:])
+
+
+def _print_table(rows: list[list[str]], indent: str = ""):
+    widths = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    for row in rows:
+        cells = [cell.rjust(width) for cell, width in zip(row[:-1], widths)]
+        cells.append(row[-1])
+        print(indent + "  ".join(cells).rstrip())
@@ -0,0 +1,81 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.ext.tests.merge** provides the ``tests merge`` command, which
+joins CTRF reports of the shards of a test run into one report.
+"""
+
+import sys
+from pathlib import Path
+from typing import Annotated
+
+from proj_flow.api import arg, env
+from proj_flow.ctrf import ctrf, stream
+from proj_flow.ext.tests.steps import print_summary
+
+
+@arg.command("tests", "merge")
+def merge(
+    output: Annotated[
+        str,
+        arg.Argument(help="Write the merged CTRF report to FILE", meta="FILE"),
+    ],
+    input: Annotated[
+        list[str],
+        arg.Argument(
+            help="Read CTRF reports from given files and directories",
+            meta="REPORT",
+            action="extend",
+            nargs="+",
+        ),
+    ],
+    report_name: Annotated[
+        str | None,
+        arg.Argument(
+            help="Provide the name for the merged report",
+            opt=True,
+            names=["--ctrf-report-name"],
+        ),
+    ],
+    compact: Annotated[
+        bool,
+        arg.FlagArgument(help="Write the merged report without indentation"),
+    ],
+    rt: env.Runtime,
+):
+    """Merge CTRF reports, e.g. from test runner shards, into one report"""
+
+    paths: list[Path] = []
+    for name in input:
+        path = Path(name)
+        if path.is_dir():
+            for cwd, _, files in path.walk():
+                paths.extend(cwd / file for file in files if file.endswith(".json"))
+        elif path.is_file():
+            paths.append(path)
+        else:
+            print(f"proj-flow: error: cannot find {name}", file=sys.stderr)
+            return 1
+
+    tool = ctrf.Tool(name="proj_flow-ctrf-merge")
+    with stream.ReportWriter(Path(output), tool, compact=compact) as writer:
+        for path in sorted(set(paths)):
+            rt.message("Found", path.as_posix())
+            reader = stream.ReportReader(path)
+            try:
+                for test in reader.tests():
+                    test.fold_output()
+                    writer.add(test)
+            except (ValueError, TypeError) as ex:
+                print(f"proj-flow: error: {path.as_posix()}: {ex}", file=sys.stderr)
+                return 1
+            writer.environment.update(reader.environment)
+
+        if report_name is not None:
+            writer.environment.reportName = report_name
+        writer.close()
+    print(output)
+
+    print_summary(writer.summary, rt)
+    return 0
@@ -2,16 +2,20 @@
 # This code is licensed under MIT license (see LICENSE for details)
 
 """
-The **proj_flow.ext.tests.steps** provides the ``"JUnitToCtrf"`` step.
+The **proj_flow.ext.tests.steps** provides the ``"JUnitToCtrf"`` and
+``"MergeCtrfFiles"`` steps. The reports are merged one test at a time and the
+merged results are also appended to the test history. Setting
+``test.ctrf-compact`` in the config writes the merged report without
+indentation.
 """
 
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, List, cast
+from typing import List, cast
 
 from proj_flow.api import env, step
-from proj_flow.ctrf import ctrf
-from proj_flow.ctrf.junit import read_junit_testsuites
+from proj_flow.ctrf import ctrf, history, junit, stream
 
 
 @step.register
@@ -49,8 +53,8 @@ class JUnitToCtrf(step.Step):
                     rt.message("Cannot find", str(xmls_dir))
                     continue
                 for cwd, _, files in xmls_dir.walk():
-                    path_set = path_set.union(
-                        set(cwd / file for file in files if file.endswith(".xml"))
+                    path_set.update(
+                        cwd / file for file in files if file.endswith(".xml")
                     )
         paths = list(sorted(path_set))
         for path in paths:
@@ -59,13 +63,39 @@ class JUnitToCtrf(step.Step):
         if rt.dry_run or not paths:
             return 0
 
+        cache = junit.ConversionCache(
+            rt.root / "build" / ".proj-flow" / "junit-ctrf.json", source_dir
+        )
+        outdated: list[tuple[Path, Path, str | None]] = []
+        for filename in paths:
+            output = ctrf_dir / f"{filename.stem}.json"
+            key = cache.key(filename.stem, filename)
+            if not cache.is_current(output, key):
+                outdated.append((filename, output, key))
+
         ctrf_dir.mkdir(parents=True, exist_ok=True)
-        for filename in sorted(paths):
-            results = ctrf.Results()
-            read_junit_testsuites(results, filename.stem, filename, source_dir)
+        if len(outdated) == 1:
+            filename, output, _ = outdated[0]
+            junit.convert_junit_file(filename.stem, filename, source_dir, output)
+        elif outdated:
+            jobs = min(len(outdated), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(
+                        junit.convert_junit_file,
+                        filename.stem,
+                        filename,
+                        source_dir,
+                        output,
+                    )
+                    for filename, output, _ in outdated
+                ]
+                for future in futures:
+                    future.result()
 
-            results.tool.name = "gtest-to-ctrf"
-            results.store_root_element(ctrf_dir / f"{filename.stem}.json")
+        for _, output, key in outdated:
+            cache.update(output, key)
+        cache.store()
 
         return 0
 
@@ -104,57 +134,64 @@ class MergeCtrfFiles(step.Step):
         if rt.dry_run or not paths:
             return 0
 
-        results = ctrf.Results()
-        for path in sorted(paths):
-            data = json.loads(path.read_bytes())
-            results_data = cast(dict[str, dict], data.get("results", {}))
-            tests_data = cast(list[dict[str, Any]], results_data.get("tests", []))
-            for test_data in tests_data:
-                test = ctrf.Test.from_dict(**test_data)
-                results.update(test)
-            environment_data = cast(dict[str, Any], results_data.get("environment", {}))
-            new_env = ctrf.Environment.from_dict(**environment_data)
-            results.environment.update(new_env)
-
-        results.tool.name = "proj_flow-ctrf-merge"
-        results.fold_output()
-        results.store_root_element(output)
+        tool = ctrf.Tool(name="proj_flow-ctrf-merge")
+        compact = cast(bool, test_cg.get("ctrf-compact", False))
+        recording = history.Recording(rt.root, tool.name)
+        with stream.ReportWriter(output, tool, compact=compact) as writer:
+            for path in sorted(paths):
+                reader = stream.ReportReader(path)
+                for test in reader.tests():
+                    test.fold_output()
+                    writer.add(test)
+                    recording.add(test)
+                writer.environment.update(reader.environment)
+            writer.close()
         print(str(output))
 
-        duration = 0
-        summary = results.summary
-
-        if summary.start is not None and summary.stop is not None:
-            duration = summary.stop - summary.start
-
-        duration_str = f"{duration} ms"
-        if duration >= 1000:
-            duration_str = f"{duration / 1000} s"
-
-        log: list[tuple[str, str, str]] = [
-            ("Total", str(summary.tests), ""),
-            ("Passed", str(summary.passed), "\033[0;32m"),
-            ("Failed", str(summary.failed), "\033[0;31m"),
-            ("Pending", str(summary.pending), ""),
-            ("Skipped", str(summary.skipped), "\033[0;33m"),
-            ("Other", str(summary.other), ""),
-            ("Duration", duration_str, ""),
-        ]
-
-        width = 0
-        offset = 0
-        for label, value, _ in log:
-            if value == "0":
-                continue
-            width = max(width, len(label) + 1)
-            offset = max(offset, len(value))
-
-        for label, value, color in log:
-            if value == "0":
-                continue
-            lab = f"{label}:"
-            rt.message(
-                f"  {color}{lab:<{width}} {value:>{offset}}\033[m", level=env.Msg.STATUS
-            )
+        error = recording.finish(writer.summary, writer.environment)
+        if error is not None:
+            rt.message("Cannot record the test history:", error, level=env.Msg.STATUS)
 
+        print_summary(writer.summary, rt)
         return 0
+
+
+def print_summary(summary: ctrf.Summary, rt: env.Runtime):
+    """
+    Prints the counts of the tests in each status and the duration of the run.
+    """
+
+    duration = 0
+
+    if summary.start is not None and summary.stop is not None:
+        duration = summary.stop - summary.start
+
+    duration_str = f"{duration} ms"
+    if duration >= 1000:
+        duration_str = f"{duration / 1000} s"
+
+    log: list[tuple[str, str, str]] = [
+        ("Total", str(summary.tests), ""),
+        ("Passed", str(summary.passed), "\033[0;32m"),
+        ("Failed", str(summary.failed), "\033[0;31m"),
+        ("Pending", str(summary.pending), ""),
+        ("Skipped", str(summary.skipped), "\033[0;33m"),
+        ("Other", str(summary.other), ""),
+        ("Duration", duration_str, ""),
+    ]
+
+    width = 0
+    offset = 0
+    for label, value, _ in log:
+        if value == "0":
+            continue
+        width = max(width, len(label) + 1)
+        offset = max(offset, len(value))
+
+    for label, value, color in log:
+        if value == "0":
+            continue
+        lab = f"{label}:"
+        rt.message(
+            f"  {color}{lab:<{width}} {value:>{offset}}\033[m", level=env.Msg.STATUS
+        )
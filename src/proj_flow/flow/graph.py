@@ -0,0 +1,242 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.flow.graph** builds the dependency graph of the run steps from
+their ``runs_after`` and ``runs_before`` declarations and executes the steps
+of a single config, running independent steps concurrently.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from proj_flow.api import step
+
+
+class StepCycleError(Exception):
+    def __init__(self, cycle: List[str]):
+        super().__init__()
+        self.cycle = cycle
+        path = " -> ".join(f"`{name}`" for name in [*cycle, cycle[0]])
+        self.message = f"run steps depend on each other: {path}"
+
+
+def predecessors_of(steps: List[step.Step]) -> Dict[str, Set[str]]:
+    """
+    Translates ``runs_after`` and ``runs_before`` of the steps into a map from
+    step name to names of the steps it needs to run after. Names of unknown
+    steps are dropped.
+    """
+
+    known_names = {plugin.name for plugin in steps}
+    result: Dict[str, Set[str]] = {plugin.name: set() for plugin in steps}
+
+    for plugin in steps:
+        for name in plugin.runs_after:
+            if name in known_names and name != plugin.name:
+                result[plugin.name].add(name)
+        for name in plugin.runs_before:
+            if name in known_names and name != plugin.name:
+                result[name].add(plugin.name)
+
+    return result
+
+
+def find_cycle(predecessors: Dict[str, Set[str]]) -> Optional[List[str]]:
+    visiting: List[str] = []
+    done: Set[str] = set()
+
+    def visit(name: str) -> Optional[List[str]]:
+        if name in done:
+            return None
+        if name in visiting:
+            return visiting[visiting.index(name) :]
+        visiting.append(name)
+        for prev in sorted(predecessors.get(name, set())):
+            cycle = visit(prev)
+            if cycle is not None:
+                return cycle
+        visiting.pop()
+        done.add(name)
+        return None
+
+    for name in predecessors:
+        cycle = visit(name)
+        if cycle is not None:
+            return list(reversed(cycle))
+    return None
+
+
+def sort_steps(steps: List[step.Step]) -> List[step.Step]:
+    """
+    Orders the steps, so that each step comes after all of its predecessors.
+    Steps without mutual constraints keep their registration order.
+
+    :raises StepCycleError: if the steps cannot be ordered
+    """
+
+    predecessors = predecessors_of(steps)
+    remaining = [plugin for plugin in steps]
+    placed: Set[str] = set()
+    result: List[step.Step] = []
+
+    while len(remaining) > 0:
+        layer = [
+            plugin for plugin in remaining if predecessors[plugin.name].issubset(placed)
+        ]
+        if len(layer) == 0:
+            names = {plugin.name for plugin in remaining}
+            cycle = find_cycle(
+                {name: predecessors[name] & names for name in sorted(names)}
+            )
+            raise StepCycleError(cycle or sorted(names))
+        remaining = [plugin for plugin in remaining if plugin not in layer]
+        placed.update(plugin.name for plugin in layer)
+        result.extend(layer)
+
+    return result
+
+
+class StepGraph:
+    """
+    Dependency graph of all known steps. Edges between steps selected for
+    a run are calculated transitively, so that a step still waits for another
+    step, even if the steps connecting them are not part of the run.
+    """
+
+    predecessors: Dict[str, Set[str]]
+
+    def __init__(self, steps: List[step.Step]):
+        self.predecessors = predecessors_of(steps)
+        self._ancestors: Dict[str, Set[str]] = {}
+
+    def ancestors(self, name: str) -> Set[str]:
+        try:
+            return self._ancestors[name]
+        except KeyError:
+            pass
+
+        result: Set[str] = set()
+        stack = [*self.predecessors.get(name, set())]
+        while stack:
+            prev = stack.pop()
+            if prev in result:
+                continue
+            result.add(prev)
+            stack.extend(self.predecessors.get(prev, set()))
+
+        self._ancestors[name] = result
+        return result
+
+    def subgraph(self, steps: List[step.Step]) -> Dict[str, Set[str]]:
+        names = {plugin.name for plugin in steps}
+        return {plugin.name: self.ancestors(plugin.name) & names for plugin in steps}
+
+
+@dataclass
+class StepTiming:
+    name: str
+    start: float
+    stop: float
+    result: int
+
+    @property
+    def duration(self):
+        return self.stop - self.start
+
+
+def run_graph(
+    steps: List[step.Step],
+    predecessors: Dict[str, Set[str]],
+    run_step: Callable[[step.Step], int],
+    jobs: int,
+):
+    """
+    Runs the steps on up to ``jobs`` threads, starting each step as soon as
+    all its predecessors finished with success. After first failure, no new
+    steps are started.
+
+    :param steps: Steps to run, in topological order.
+    :param predecessors: Map from step name to names of steps it waits for.
+    :param run_step: Callable running a single step and returning its exit
+        code.
+    :param jobs: Maximal number of steps running at the same time.
+    :returns: Tuple of the exit code and list of :class:`StepTiming` objects,
+        in order of completion.
+    """
+
+    timings: List[StepTiming] = []
+    finished: Set[str] = set()
+    pending = [plugin for plugin in steps]
+    running: Dict[Future, step.Step] = {}
+    starts: Dict[str, float] = {}
+    result = 0
+
+    def timed(plugin: step.Step):
+        starts[plugin.name] = time.monotonic()
+        return run_step(plugin)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            if result == 0:
+                ready = [
+                    plugin
+                    for plugin in pending
+                    if predecessors.get(plugin.name, set()).issubset(finished)
+                ]
+                for plugin in ready[: max(0, jobs - len(running))]:
+                    pending.remove(plugin)
+                    running[executor.submit(timed, plugin)] = plugin
+            else:
+                pending = []
+
+            if not running:
+                break
+
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                plugin = running.pop(future)
+                ret = future.result()
+                timings.append(
+                    StepTiming(plugin.name, starts[plugin.name], time.monotonic(), ret)
+                )
+                if ret:
+                    result = ret
+                else:
+                    finished.add(plugin.name)
+
+    return result, timings
+
+
+def critical_path(
+    timings: List[StepTiming], predecessors: Dict[str, Set[str]]
+) -> List[StepTiming]:
+    """
+    Finds the chain of dependent steps with the longest total duration, which
+    bounds the wall time of the config, no matter how many jobs are used.
+    """
+
+    by_name = {timing.name: timing for timing in timings}
+    longest: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+
+    for timing in sorted(timings, key=lambda timing: timing.start):
+        best: Optional[str] = None
+        for name in predecessors.get(timing.name, set()):
+            if name in longest and (best is None or longest[name] > longest[best]):
+                best = name
+        longest[timing.name] = timing.duration + (longest[best] if best else 0)
+        previous[timing.name] = best
+
+    if not longest:
+        return []
+
+    name: Optional[str] = max(longest, key=lambda key: longest[key])
+    path: List[StepTiming] = []
+    while name is not None:
+        path.append(by_name[name])
+        name = previous[name]
+
+    return list(reversed(path))
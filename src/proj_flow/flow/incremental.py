@@ -0,0 +1,270 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.flow.incremental** supports ``run --incremental``. It keeps
+fingerprints of the inputs of the last successful run of each step, for each
+config, and replaces the steps, whose inputs did not change, with stand-ins,
+which neither run nor remove any directories.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, cast
+
+from proj_flow.api import env, step
+from proj_flow.flow import graph
+
+
+def fingerprint(inputs: step.StepInputs) -> str:
+    """
+    Calculates a digest of the step inputs: contents of the files, values and
+    paths, sizes and modification times of the tools.
+    """
+
+    files: Dict[str, Optional[str]] = {}
+    for filename in inputs.files:
+        try:
+            files[filename.as_posix()] = hashlib.sha256(
+                filename.read_bytes()
+            ).hexdigest()
+        except OSError:
+            files[filename.as_posix()] = None
+
+    tools: Dict[str, Optional[list]] = {}
+    for name in inputs.tools:
+        path = shutil.which(name)
+        if path is None:
+            tools[name] = None
+            continue
+        try:
+            stat = os.stat(path)
+            tools[name] = [path, stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            tools[name] = [path]
+
+    data = json.dumps(
+        {"files": files, "values": inputs.values, "tools": tools},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode("UTF-8")).hexdigest()
+
+
+class UpToDateStep(step.Step):
+    """Stands in for a step, which does not need to run again."""
+
+    def __init__(self, original: step.Step):
+        super().__init__()
+        self.original = original
+
+    @property
+    def name(self):
+        return self.original.name
+
+    @property
+    def runs_after(self):
+        return self.original.runs_after
+
+    @property
+    def runs_before(self):
+        return self.original.runs_before
+
+    def run(self, config: env.Config, rt: env.Runtime) -> int:
+        rt.message("up to date, skipping", level=env.Msg.STATUS)
+        return 0
+
+
+class TrackedStep(step.Step):
+    """
+    Runs the original step and records its fingerprint, when it succeeds.
+    """
+
+    def __init__(self, original: step.Step, state: "RunState", key: str, digest: str):
+        super().__init__()
+        self.original = original
+        self.state = state
+        self.key = key
+        self.digest = digest
+
+    @property
+    def name(self):
+        return self.original.name
+
+    @property
+    def runs_after(self):
+        return self.original.runs_after
+
+    @property
+    def runs_before(self):
+        return self.original.runs_before
+
+    def platform_dependencies(self) -> List[str]:
+        return self.original.platform_dependencies()
+
+    def directories_to_remove(self, config: env.Config) -> List[Path]:
+        return self.original.directories_to_remove(config)
+
+    def run(self, config: env.Config, rt: env.Runtime) -> int:
+        self.state.forget(self.key, self.name)
+        result = self.original.run(config, rt)
+        if not result and not rt.dry_run:
+            self.state.record(self.key, self.name, self.digest)
+        return result
+
+
+class _Plan:
+    def __init__(
+        self,
+        state: "RunState",
+        key: str,
+        entries: List[Tuple[step.Step, Optional[step.StepInputs], str]],
+    ):
+        self.state = state
+        self.key = key
+        self.entries = entries
+        self.removed: Set[Path] = set()
+        self.steps = self._resolve()
+
+    def _removed(self, output: Path):
+        output = Path(os.path.abspath(output))
+        return any(output.is_relative_to(dirname) for dirname in self.removed)
+
+    def _resolve(self):
+        known = self.state.fingerprints.get(self.key, {})
+        stale: Set[str] = set()
+        result: List[step.Step] = []
+        for plugin, inputs, digest in self.entries:
+            if inputs is None:
+                result.append(plugin)
+                continue
+
+            up_to_date = (
+                known.get(plugin.name) == digest
+                and all(
+                    output.exists() and not self._removed(output)
+                    for output in inputs.outputs
+                )
+                and len(self.state.step_graph.ancestors(plugin.name) & stale) == 0
+            )
+            if up_to_date:
+                result.append(UpToDateStep(plugin))
+            else:
+                stale.add(plugin.name)
+                result.append(TrackedStep(plugin, self.state, self.key, digest))
+
+        return result
+
+    def remove_directories(self, directories: Set[Path]):
+        self.removed = {Path(os.path.abspath(dirname)) for dirname in directories}
+        steps = self._resolve()
+        changed = [type(plugin) for plugin in steps] != [
+            type(plugin) for plugin in self.steps
+        ]
+        if changed:
+            self.steps = steps
+        return changed
+
+
+class RunState:
+    """
+    Fingerprints of the last successful runs, stored in
+    ``build/.proj-flow/run-state.json``.
+    """
+
+    path: Path
+    fingerprints: Dict[str, Dict[str, str]]
+
+    def __init__(self, path: Path, steps: List[step.Step]):
+        self.path = path
+        self.fingerprints = {}
+        self.step_graph = graph.StepGraph(steps)
+        self._plans: Dict[str, _Plan] = {}
+        self._lock = threading.Lock()
+
+        try:
+            with open(path, encoding="UTF-8") as state_file:
+                data = json.load(state_file)
+            if isinstance(data, dict):
+                self.fingerprints = {
+                    key: value for key, value in data.items() if isinstance(value, dict)
+                }
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def for_project(rt: env.Runtime):
+        return RunState(
+            rt.root / "build" / ".proj-flow" / "run-state.json",
+            cast(List[step.Step], rt.steps),
+        )
+
+    def record(self, key: str, name: str, digest: str):
+        with self._lock:
+            self.fingerprints.setdefault(key, {})[name] = digest
+            self._save()
+
+    def forget(self, key: str, name: str):
+        with self._lock:
+            if self.fingerprints.get(key, {}).pop(name, None) is not None:
+                self._save()
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with open(temp, "w", encoding="UTF-8") as state_file:
+                json.dump(self.fingerprints, state_file, indent=2, sort_keys=True)
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+    def plan(
+        self,
+        config: env.Config,
+        steps: List[step.Step],
+        rt: env.Runtime,
+    ) -> List[step.Step]:
+        """
+        Replaces the steps with valid fingerprint with :class:`UpToDateStep`
+        and the steps with inputs, which need to run, with
+        :class:`TrackedStep`. A step needs to run, if its inputs changed, any
+        of its outputs is missing, or any step it runs after needs to run.
+        Steps without inputs always run and are left untouched.
+
+        The plan is calculated once per config.
+        """
+
+        key = config.build_name or json.dumps(config.items, sort_keys=True)
+        try:
+            return self._plans[key].steps
+        except KeyError:
+            pass
+
+        entries: List[Tuple[step.Step, Optional[step.StepInputs], str]] = []
+        for plugin in steps:
+            inputs = plugin.inputs(config, rt)
+            digest = fingerprint(inputs) if inputs is not None else ""
+            entries.append((plugin, inputs, digest))
+
+        plan = _Plan(self, key, entries)
+        self._plans[key] = plan
+        return plan.steps
+
+    def remove_directories(self, directories: Set[Path]):
+        """
+        Makes the steps, which have any output in the directories about to be
+        removed, run again, even if their inputs did not change.
+
+        :returns: ``True``, if any of the plans changed.
+        """
+
+        changed = False
+        for plan in self._plans.values():
+            if plan.remove_directories(directories):
+                changed = True
+        return changed
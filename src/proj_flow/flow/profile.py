@@ -0,0 +1,307 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.flow.profile** measures, where the time of ``run`` goes. It
+records the phases of *Project Flow* itself (loading extensions, expanding
+the matrix, checking dependencies) and, once enabled, wall time, CPU time and
+peak memory of the tools run by each step of each config. The measurements
+are reported as a table and can be stored in the Chrome trace format, ready
+for ``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+from proj_flow import __version__
+from proj_flow.api import env, step
+
+PROJ_FLOW = "proj-flow"
+CONFIG = "config"
+STEP = "step"
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    stop: float
+    thread: int
+    #: CPU time in seconds; of *Project Flow* for its own phases, and of the
+    #: tools run for the steps.
+    cpu: float = 0.0
+    #: Peak resident set size of the tools run by a step, in bytes.
+    max_rss: int = 0
+    config: str = ""
+
+    @property
+    def duration(self):
+        return self.stop - self.start
+
+
+_spans: List[Span] = []
+_threads: Dict[int, int] = {}
+_lock = threading.Lock()
+_enabled = False
+
+
+def enable():
+    """
+    Turns on measuring of the steps. The phases of *Project Flow* are
+    recorded always, since they are cheap to record.
+    """
+    global _enabled
+    _enabled = True
+
+
+def enabled():
+    return _enabled
+
+
+def spans():
+    with _lock:
+        return list(_spans)
+
+
+def _thread_index():
+    ident = threading.get_ident()
+    with _lock:
+        return _threads.setdefault(ident, len(_threads))
+
+
+def record(span: Span):
+    with _lock:
+        _spans.append(span)
+
+
+def record_phase(name: str, start: float, cpu_start: float):
+    """
+    Records a phase of *Project Flow*, which started at given
+    :py:func:`time.monotonic` and :py:func:`time.process_time` and is just
+    finished.
+    """
+    record(
+        Span(
+            name,
+            PROJ_FLOW,
+            start,
+            time.monotonic(),
+            _thread_index(),
+            cpu=time.process_time() - cpu_start,
+        )
+    )
+
+
+@contextmanager
+def phase(name: str):
+    start = time.monotonic()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        record_phase(name, start, cpu_start)
+
+
+def record_config(config: env.Config, start: float):
+    """
+    Records a config, which started at given :py:func:`time.monotonic` and
+    is just finished, if profiling is enabled.
+    """
+    if not _enabled:
+        return
+
+    name = config.build_name or CONFIG
+    record(Span(name, CONFIG, start, time.monotonic(), _thread_index(), config=name))
+
+
+@contextmanager
+def config_span(config: env.Config):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        record_config(config, start)
+
+
+def run_step(plugin: step.Step, config: env.Config, rt: env.Runtime) -> int:
+    """
+    Runs the step; if profiling is enabled, measures the resources used by
+    the tools it runs.
+    """
+
+    if not _enabled:
+        return plugin.run(config, rt)
+
+    step_rt = env.Runtime(rt, rt)
+    step_rt.usage = env.ChildUsage()
+    start = time.monotonic()
+    try:
+        return plugin.run(config, step_rt)
+    finally:
+        record(
+            Span(
+                plugin.name,
+                STEP,
+                start,
+                time.monotonic(),
+                _thread_index(),
+                cpu=step_rt.usage.cpu,
+                max_rss=step_rt.usage.max_rss,
+                config=config.build_name or CONFIG,
+            )
+        )
+
+
+def _own_max_rss() -> int:
+    if sys.platform == "win32":
+        return 0
+
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _size(value: int):
+    if value == 0:
+        return ""
+    for unit in ["B", "KiB", "MiB"]:
+        if value < 1024:
+            return f"{value} {unit}"
+        value //= 1024
+    return f"{value} GiB"
+
+
+def print_table(file: TextIO = sys.stderr):
+    """
+    Prints wall time, CPU time and peak memory of each step and config, and
+    the time spent in *Project Flow* itself.
+    """
+
+    recorded = spans()
+    own = [span for span in recorded if span.category == PROJ_FLOW]
+    configs = [span for span in recorded if span.category == CONFIG]
+    steps = [span for span in recorded if span.category == STEP]
+
+    rows: List[List[str]] = [["", "wall", "cpu", "peak RSS"]]
+    rows.append(
+        [
+            PROJ_FLOW,
+            f"{sum(span.duration for span in own):.2f} s",
+            f"{sum(span.cpu for span in own):.2f} s",
+            _size(_own_max_rss()),
+        ]
+    )
+    for span in own:
+        rows.append(
+            [f"  {span.name}", f"{span.duration:.2f} s", f"{span.cpu:.2f} s", ""]
+        )
+
+    for config in configs:
+        children = [span for span in steps if span.config == config.name]
+        rows.append(
+            [
+                config.name,
+                f"{config.duration:.2f} s",
+                f"{sum(span.cpu for span in children):.2f} s",
+                _size(max((span.max_rss for span in children), default=0)),
+            ]
+        )
+        for span in children:
+            rows.append(
+                [
+                    f"  {span.name}",
+                    f"{span.duration:.2f} s",
+                    f"{span.cpu:.2f} s",
+                    _size(span.max_rss),
+                ]
+            )
+
+    widths = [max(len(row[index]) for row in rows) for index in range(4)]
+    print(file=file)
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))
+        print("  ".join(cells).rstrip(), file=file)
+
+
+def write_trace(path: Path):
+    """
+    Writes all the spans as complete events of the Chrome trace format.
+    """
+
+    recorded = spans()
+    origin = min((span.start for span in recorded), default=0.0)
+    events: List[dict] = [
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": PROJ_FLOW}}
+    ]
+    for thread in sorted({span.thread for span in recorded}):
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": thread,
+                "args": {"name": "main" if thread == 0 else f"worker {thread}"},
+            }
+        )
+
+    for span in recorded:
+        args: Dict[str, object] = {"cpu_s": round(span.cpu, 6)}
+        if span.max_rss:
+            args["max_rss"] = span.max_rss
+        if span.config:
+            args["config"] = span.config
+        events.append(
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - origin) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": 1,
+                "tid": span.thread,
+                "args": args,
+            }
+        )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="UTF-8") as trace:
+        json.dump(
+            {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"version": f"{PROJ_FLOW} {__version__}"},
+            },
+            trace,
+            indent=1,
+        )
+
+
+@contextmanager
+def session(rt: env.Runtime, table: bool, trace: Optional[str]):
+    """
+    Enables profiling, if either the table or the trace was requested, and
+    reports the measurements, when the session ends.
+    """
+
+    if not table and trace is None:
+        yield
+        return
+
+    enable()
+    try:
+        yield
+    finally:
+        if not rt.silent:
+            print_table()
+        if trace is not None:
+            write_trace(Path(trace))
+            rt.message(f"profile written to {trace}", level=env.Msg.STATUS)
@@ -6,64 +6,14 @@ The **proj_flow.flow.steps** allows loading both predefined and project-specific
 steps.
 """
 
-from dataclasses import dataclass
 from typing import List, cast
 
 from proj_flow.api import env, step
-
-
-@dataclass
-class Sorted:
-    plugin: step.Step
-    name: str
-    runs_after: List[str]
-    runs_before: List[str]
-
-    @staticmethod
-    def from_step(plugin: step.Step):
-        name = plugin.name
-        runs_after = [*plugin.runs_after]
-        runs_before = [*plugin.runs_before]
-        return Sorted(plugin, name, runs_after, runs_before)
+from proj_flow.flow import graph
 
 
 def _sort_steps():
-    steps = step.__steps
-    unsorted = [Sorted.from_step(step) for step in steps]
-    known_names = [step.name for step in unsorted]
-
-    for plugin in unsorted:
-        for name in plugin.runs_before:
-            for successor in unsorted:
-                if successor.name != name:
-                    continue
-                successor.runs_after.append(plugin.name)
-                break
-
-    for plugin in unsorted:
-        runs_after: List[str] = []
-        for name in plugin.runs_after:
-            if name in known_names:
-                runs_after.append(name)
-        plugin.runs_after = runs_after
-
-    result: List[step.Step] = []
-
-    while len(unsorted) > 0:
-        layer = [plugin for plugin in unsorted if len(plugin.runs_after) == 0]
-        unsorted = [plugin for plugin in unsorted if len(plugin.runs_after) > 0]
-        for plugin in layer:
-            for remaining in unsorted:
-                try:
-                    remaining.runs_after.remove(plugin.name)
-                except ValueError:
-                    pass
-        result.extend(plugin.plugin for plugin in layer)
-        if len(layer) == 0:
-            result.extend(plugin.plugin for plugin in unsorted)
-            break
-
-    return result
+    return graph.sort_steps(step.__steps)
 
 
 def clean_aliases(cfg: env.FlowConfig):
@@ -6,15 +6,20 @@ The **proj_flow.log.commit** allows analysing the git commits for
 changelog generation.
 """
 
+import json
+import os
 import re
 import secrets
 import string
 import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import NamedTuple, Optional
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, NamedTuple, Optional, cast
 
+from proj_flow import __version__
 from proj_flow.api import env
 from proj_flow.base import registry
 
@@ -164,6 +169,28 @@ def _get_commit(hash: str, short_hash: str, message: str) -> Optional[Commit]:
     )
 
 
+class _LogEntry(NamedTuple):
+    short_hash: str
+    hash: str
+    parents: list[str]
+    message: str
+
+
+def _read_log(git_log_output: str, separator: str):
+    entries: list[_LogEntry] = []
+    amassed: list[str] = []
+    for line in git_log_output.split("\n"):
+        if line != separator:
+            amassed.append(line)
+            continue
+        if len(amassed):
+            short_hash, hash, *parents = amassed[0].split()
+            message = "\n".join(amassed[1:]).strip()
+            entries.append(_LogEntry(short_hash, hash, parents, message))
+            amassed = []
+    return entries
+
+
 def _level_from_commit(commit: Commit) -> tuple[Level, str]:
     if commit.link.is_breaking:
         return (Level.BREAKING, commit.link.scope)
@@ -199,6 +226,51 @@ class ReleaseInfo:
     tag: Optional[str] = None
 
 
+class ArtifactSource:
+    """
+    Gives access to the package artifacts in a directory, for uploading them
+    to a release. Subclasses can read them from other places, e.g. straight
+    from an archive.
+    """
+
+    #: Directory with the artifacts.
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def close(self):
+        """Releases the resources held by the source."""
+        pass
+
+    def open(self, name: str) -> BinaryIO:
+        """Opens the artifact for reading."""
+        return open(os.path.join(self.directory, name), "rb")
+
+    def size(self, name: str) -> int:
+        """Number of bytes in the artifact."""
+        return os.path.getsize(os.path.join(self.directory, name))
+
+    def state(self, name: str) -> tuple[str, list, int]:
+        """
+        Describes the artifact for :class:`proj_flow.base.digest.DigestCache`.
+
+        :returns: Key of the artifact, values changing with its contents and
+            its modification time.
+        """
+        path = os.path.join(self.directory, name)
+        stat = os.stat(path)
+        return os.path.abspath(path), [stat.st_size, stat.st_mtime_ns], stat.st_mtime_ns
+
+    @contextmanager
+    def local_file(self, name: str) -> Iterator[str]:
+        """
+        Provides a path to the artifact on the disk, valid until the context
+        ends.
+        """
+        yield os.path.join(self.directory, name)
+
+
 class Hosting(ABC):
     """
     Generates links to the hosting service.
@@ -262,9 +334,16 @@ class Hosting(ABC):
         release: ReleaseInfo,
         directory: str,
         names: list[str],
-    ):
+        digest: Optional[Callable[[str], str]] = None,
+        source: Optional[ArtifactSource] = None,
+    ) -> Optional[list[str]]:
         """
-        Upload package artifacts to the release.
+        Upload package artifacts to the release. The ``digest`` returns the
+        SHA-256 of an artifact, by its name, allowing to skip the artifacts
+        already uploaded. The artifacts are read from the ``source``, if
+        present, instead of the ``directory``.
+
+        :returns: Names of the artifacts, which could not be uploaded.
         """
         ...
 
@@ -310,7 +389,9 @@ class NoHosting(Hosting):
         release: ReleaseInfo,
         directory: str,
         names: list[str],
-    ):
+        digest: Optional[Callable[[str], str]] = None,
+        source: Optional[ArtifactSource] = None,
+    ) -> Optional[list[str]]:
         return None
 
     def publish(self, release: ReleaseInfo):
@@ -377,6 +458,82 @@ class LogSetup:
         return self.hosting.reference_link(ref)
 
 
+class CommitCache:
+    """
+    Parsed commit messages, by the commit hash, stored in
+    ``build/.proj-flow/commits.json``. The hash of a commit covers its
+    message, so an entry never gets outdated; the whole cache is dropped
+    with a new version of proj-flow, which could parse the messages
+    differently.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.commits: dict[str, Optional[list[Any]]] = {}
+        self.modified = False
+
+        try:
+            with open(path, encoding="UTF-8") as cache_file:
+                data = json.load(cache_file)
+            if isinstance(data, dict) and data.get("proj-flow") == __version__:
+                self.commits = cast(dict, data.get("commits", {}))
+        except (OSError, ValueError):
+            pass
+
+    def get_commit(self, hash: str, short_hash: str, message: str):
+        try:
+            entry = self.commits[hash]
+            if entry is None:
+                return None
+            type, scope, summary, is_breaking, breaking_message, references = entry
+            return Commit(
+                type,
+                Link(
+                    scope,
+                    summary,
+                    hash,
+                    short_hash,
+                    is_breaking,
+                    breaking_message,
+                    references,
+                ),
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        commit = _get_commit(hash, short_hash, message)
+        self.commits[hash] = (
+            None
+            if commit is None
+            else [
+                commit.type,
+                commit.link.scope,
+                commit.link.summary,
+                commit.link.is_breaking,
+                commit.link.breaking_message,
+                commit.link.references,
+            ]
+        )
+        self.modified = True
+        return commit
+
+    def store(self):
+        if not self.modified:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with open(temp, "w", encoding="UTF-8") as cache_file:
+                json.dump(
+                    {"proj-flow": __version__, "commits": self.commits}, cache_file
+                )
+            os.replace(temp, self.path)
+            self.modified = False
+        except OSError:
+            pass
+
+
 class Remote(NamedTuple):
     name: str
     usage: str
@@ -388,15 +545,18 @@ class Git:
 
     def __init__(self, rt: env.Runtime):
         self.rt = rt
+        self._cache: Optional[CommitCache] = None
 
-    def get_log(self, setup: LogSetup, silent=False) -> tuple[ChangeLog, Level]:
-        omit = set[str]()
-        args = ["git", "log", f"--format=%H"]
-        for ref in setup.omit:
-            stdout = set(
-                self.rt.capture(*args, ref, silent=silent).stdout.strip().split("\n")
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = CommitCache(
+                self.rt.root / "build" / ".proj-flow" / "commits.json"
             )
-            omit = omit.union(stdout)
+        return self._cache
+
+    def get_log(self, setup: LogSetup, silent=False) -> tuple[ChangeLog, Level]:
+        omit = self._omitted(setup.omit, silent)
 
         args = ["git", "log", f"--format=%h %H%n%B%n{COMMIT_SEP}"]
 
@@ -407,30 +567,121 @@ class Git:
         proc = self.rt.capture(*args, silent=silent)
         return self.parse_log(proc.stdout, COMMIT_SEP, setup, omit)
 
+    def get_logs(
+        self, setups: list[LogSetup], silent=False
+    ) -> list[tuple[ChangeLog, Level]]:
+        """
+        Gets the logs of many commit ranges, e.g. of all the releases, with a
+        single ``git log`` over all of them. Each commit is attributed to
+        the ranges, which would list it on their own: it is reachable from
+        the end of the range, but not from its start.
+        """
+
+        refs: dict[str, int] = {}
+        for setup in setups:
+            for ref in [setup.prev_tag, setup.curr_tag or "HEAD"]:
+                if ref is not None and ref not in refs:
+                    refs[ref] = len(refs)
+        if not refs:
+            return []
+
+        proc = self.rt.capture(
+            "git", "rev-parse", *(f"{ref}^{{commit}}" for ref in refs), silent=silent
+        )
+        tips = proc.stdout.split()
+        if proc.returncode != 0 or len(tips) != len(refs):
+            return [self.get_log(setup, silent=silent) for setup in setups]
+
+        proc = self.rt.capture(
+            "git",
+            "log",
+            f"--format=%h %H %P%n%B%n{COMMIT_SEP}",
+            *refs,
+            silent=silent,
+        )
+        entries = _read_log(proc.stdout, COMMIT_SEP)
+
+        # each commit gets a bit for every ref it is reachable from, passed
+        # from the children to the parents
+        reachable = {entry.hash: 0 for entry in entries}
+        for tip, index in zip(tips, refs.values()):
+            if tip in reachable:
+                reachable[tip] |= 1 << index
+        children = {entry.hash: 0 for entry in entries}
+        for entry in entries:
+            for parent in entry.parents:
+                if parent in children:
+                    children[parent] += 1
+        ready = [entry.hash for entry in entries if children[entry.hash] == 0]
+        parents = {entry.hash: entry.parents for entry in entries}
+        while ready:
+            hash = ready.pop()
+            bits = reachable[hash]
+            for parent in parents[hash]:
+                if parent not in children:
+                    continue
+                reachable[parent] |= bits
+                children[parent] -= 1
+                if children[parent] == 0:
+                    ready.append(parent)
+
+        omitted: dict[tuple[str, ...], set[str]] = {}
+        result: list[tuple[ChangeLog, Level]] = []
+        for setup in setups:
+            key = tuple(setup.omit)
+            omit = omitted.get(key)
+            if omit is None:
+                omit = omitted[key] = self._omitted(setup.omit, silent)
+
+            curr = 1 << refs[setup.curr_tag or "HEAD"]
+            prev = 0 if setup.prev_tag is None else 1 << refs[setup.prev_tag]
+            commit_log: list[Commit] = []
+            for entry in entries:
+                bits = reachable[entry.hash]
+                if not bits & curr or bits & prev or entry.hash in omit:
+                    continue
+                commit = self.cache.get_commit(
+                    entry.hash, entry.short_hash, entry.message
+                )
+                if commit is not None:
+                    commit_log.append(commit)
+
+            result.append(self._changelog(commit_log, setup))
+
+        self.cache.store()
+        return result
+
+    def _omitted(self, refs: list[str], silent: bool):
+        # refs without ranges can share a single git log, each range needs
+        # its own
+        omit = set[str]()
+        args = ["git", "log", f"--format=%H"]
+        plain = [ref for ref in refs if ".." not in ref]
+        groups = [[ref] for ref in refs if ".." in ref]
+        if plain:
+            groups.append(plain)
+        for group in groups:
+            stdout = self.rt.capture(*args, *group, silent=silent).stdout
+            omit.update(stdout.strip().split("\n"))
+        return omit
+
     def parse_log(
         self, git_log_output: str, separator: str, setup: LogSetup, omit: set[str]
     ):
         commitLog: list[Commit] = []
-        amassed: list[str] = []
-        for line in git_log_output.split("\n"):
-            if line == separator:
-                if len(amassed):
-                    short_hash, hash = amassed[0].split(" ")
-                    if hash in omit:
-                        amassed = []
-                        continue
-                    commit = _get_commit(
-                        hash, short_hash, "\n".join(amassed[1:]).strip()
-                    )
-                    amassed = []
-
-                    if commit is None:
-                        continue
-
-                    commitLog.append(commit)
+        for entry in _read_log(git_log_output, separator):
+            if entry.hash in omit:
                 continue
-            amassed.append(line)
+            commit = self.cache.get_commit(entry.hash, entry.short_hash, entry.message)
+            if commit is None:
+                continue
+
+            commitLog.append(commit)
 
+        self.cache.store()
+        return self._changelog(commitLog, setup)
+
+    def _changelog(self, commitLog: list[Commit], setup: LogSetup):
         changes: ChangeLog = {}
         level = Level.BENIGN
 
@@ -517,6 +768,33 @@ class Git:
         versions.sort()
         return list(map(lambda pair: pair[1], versions))
 
+    def tag_dates(self, silent=False):
+        """
+        Get the dates of the commits of all the tags, the same way
+        :func:`read_tag_date` gets the date of a single tag.
+        """
+        proc = self.rt.capture(
+            "git",
+            "for-each-ref",
+            "--format=%(refname:strip=2)%09%(authordate:iso-strict)"
+            "%09%(*authordate:iso-strict)",
+            "refs/tags",
+            silent=silent,
+        )
+        dates: dict[str, str] = {}
+        if proc.returncode != 0:
+            return dates
+        for line in proc.stdout.split("\n"):
+            split = line.split("\t")
+            if len(split) != 3:
+                continue
+            tag, date, peeled_date = split
+            # annotated tags have the date of the commit in the peeled value
+            date = peeled_date or date
+            if date:
+                dates[tag] = date.split("T", 1)[0]
+        return dates
+
     def current_branch(self):
         """Get currently checked-out branch"""
         return self.rt.capture("git", "branch", "--show-current").stdout.strip()
@@ -6,6 +6,6 @@ The **proj_flow.log.hosting** contains links information for various
 hosting services. Currently, only GitHub is supported.
 """
 
-from . import github
+from . import github, github_api
 
-__all__ = ["github"]
+__all__ = ["github", "github_api"]
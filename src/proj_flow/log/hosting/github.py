@@ -6,12 +6,18 @@ The **proj_flow.log.hosting.github** builds a log message for GiHub Releases.
 """
 
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pformat
-from typing import Any, List, NamedTuple, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, cast
+
+import requests
 
 from proj_flow.api import env
 from proj_flow.base import cmd
 from proj_flow.log import commit, msg
+from proj_flow.log.hosting import github_api
 
 
 class _GitHub(NamedTuple):
@@ -22,9 +28,19 @@ class _GitHub(NamedTuple):
 
 _NO_GITHUB = _GitHub("", "", "")
 
+#: Number of artifacts uploaded at the same time.
+UPLOAD_JOBS = 4
+#: Number of tries for each artifact.
+UPLOAD_ATTEMPTS = 4
+#: Seconds before the first retry; each next retry waits twice as long.
+UPLOAD_BACKOFF = 2
+#: Number of releases or assets asked for at once.
+PAGE_SIZE = 100
+
 
 class ReleaseInfo(commit.ReleaseInfo):
     id: int
+    upload_url: Optional[str]
 
     def __init__(
         self,
@@ -33,23 +49,33 @@ class ReleaseInfo(commit.ReleaseInfo):
         id: int,
         ref: Optional[str] = None,
         tag: Optional[str] = None,
+        upload_url: Optional[str] = None,
     ):
         super().__init__(url, is_draft, ref, tag)
         self.id = id
+        self.upload_url = upload_url
 
 
 class GitHub(commit.Hosting):
     """
-    Generates links to GitHub.
+    Generates links to GitHub. The API is called through the client, if
+    given, or with the GitHub CLI otherwise.
     """
 
     _info: _GitHub
     rt: env.Runtime
+    client: Optional[github_api.ApiClient]
 
-    def __init__(self, info: _GitHub, rt: env.Runtime):
+    def __init__(
+        self,
+        info: _GitHub,
+        rt: env.Runtime,
+        client: Optional[github_api.ApiClient] = None,
+    ):
         super().__init__(f"https://github.com/{info.owner}/{info.repo}")
         self._info = info
         self.rt = rt
+        self.client = client
 
     @property
     def is_active(self):
@@ -132,6 +158,10 @@ class GitHub(commit.Hosting):
         default: Any = {},
         ro_call: bool = False,
     ):
+        fields = _fields_from_flags(args)
+        if self.client is not None and fields is not None:
+            return self._json_from_api(res, args, fields, method, default, ro_call)
+
         proc = self.gh(res, *args, method=method, server=server, ro_call=ro_call)
         if proc is None:
             return default
@@ -151,14 +181,51 @@ class GitHub(commit.Hosting):
 
         return json.loads(proc.stdout)
 
+    def _json_from_api(
+        self,
+        res: str,
+        args: Tuple[str, ...],
+        fields: Dict[str, Any],
+        method: Optional[str],
+        default: Any,
+        ro_call: bool,
+    ):
+        client = cast(github_api.ApiClient, self.client)
+        # same as gh api: with fields, the default method is POST
+        method = (method or ("POST" if fields else "GET")).upper()
+        url = client.url(f"{self.root}{res}")
+        if not ro_call and self.rt.dry_run:
+            self.rt.print(method, url, *args)
+            return default
+
+        try:
+            response = client.request(method, url, fields or None)
+        except requests.RequestException as ex:
+            self.rt.message(f"{method} {url}: {ex}", level=env.Msg.ALWAYS)
+            return default
+
+        if self.rt.verbose:
+            self.rt.message(f"[DEBUG] {method} {url} -> {response.status}")
+            self.rt.message(pformat(response.data))
+
+        return default if response.data is None else response.data
+
     def _release_from_json(self, data: dict, draft: bool = False):
         html_url = cast(Optional[str], data.get("html_url"))
         draft = cast(bool, data.get("draft", draft))
         id = cast(int, data.get("id", 0))
         name = cast(str, data.get("name"))
         tag_name = cast(str, data.get("tag_name"))
-
-        return ReleaseInfo(url=html_url, is_draft=draft, id=id, ref=name, tag=tag_name)
+        upload_url = cast(Optional[str], data.get("upload_url"))
+
+        return ReleaseInfo(
+            url=html_url,
+            is_draft=draft,
+            id=id,
+            ref=name,
+            tag=tag_name,
+            upload_url=upload_url,
+        )
 
     def add_release(
         self,
@@ -194,28 +261,142 @@ class GitHub(commit.Hosting):
         return self._release_from_json(data, draft)
 
     def locate_release(self, release_name: str) -> Optional[commit.ReleaseInfo]:
-        releases = self.json_from("/releases", default=[], ro_call=True)
-        for release in releases:
+        # the releases come newest first, so the page with the release is
+        # usually the first one
+        for release in self._pages("/releases"):
             if release.get("name") == release_name:
                 return self._release_from_json(release)
 
         return None
 
+    def _pages(self, res: str):
+        # the next page is asked for only when the previous one is used up
+        page = 1
+        try:
+            while True:
+                items = self.json_from(
+                    f"{res}?per_page={PAGE_SIZE}&page={page}", default=[], ro_call=True
+                )
+                if not isinstance(items, list):
+                    return
+                for item in items:
+                    if isinstance(item, dict):
+                        yield item
+                if len(items) < PAGE_SIZE:
+                    return
+                page += 1
+        finally:
+            if self.client is not None:
+                self.client.store()
+
     def upload_to_release(
         self,
         release: commit.ReleaseInfo,
         directory: str,
         names: list[str],
+        digest: Optional[Callable[[str], str]] = None,
+        source: Optional[commit.ArtifactSource] = None,
+    ) -> Optional[list[str]]:
+        tag = release.tag or release.ref or ""
+        artifacts = source or commit.ArtifactSource(directory)
+        uploaded = self._assets(release)
+        api_upload = self.client is not None and isinstance(release, ReleaseInfo)
+
+        def upload(name: str):
+            # hashing here, and not before the uploads, lets the digests
+            # of some artifacts be calculated, while others are uploaded
+            sha = digest(name) if digest is not None and not self.rt.dry_run else None
+            asset = uploaded.get(name, {})
+            if sha is not None and asset.get("digest") == f"sha256:{sha}":
+                self.rt.message("Already uploaded", name)
+                return True
+
+            if self.rt.dry_run:
+                path = os.path.join(directory, name)
+                self._run("gh", "release", "upload", tag, path, "--clobber")
+                return True
+
+            if api_upload:
+                release_info = cast(ReleaseInfo, release)
+                return self._retry(
+                    name,
+                    lambda attempt: self._api_upload(
+                        release_info, name, artifacts, asset if not attempt else None
+                    ),
+                )
+
+            with artifacts.local_file(name) as path:
+                return self._retry(name, lambda _: self._gh_upload(tag, path))
+
+        if not names:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_JOBS, len(names))) as executor:
+            results = list(executor.map(upload, names))
+        return [name for name, success in zip(names, results) if not success]
+
+    def _retry(self, name: str, upload: Callable[[int], bool]):
+        for attempt in range(UPLOAD_ATTEMPTS):
+            if attempt:
+                delay = UPLOAD_BACKOFF * 2 ** (attempt - 1)
+                self.rt.message(f"Retrying {name} in {delay} s")
+                time.sleep(delay)
+            if upload(attempt):
+                return True
+        return False
+
+    def _gh_upload(self, tag: str, path: str):
+        proc = self._run("gh", "release", "upload", tag, path, "--clobber")
+        return proc is None or proc.returncode == 0
+
+    def _api_upload(
+        self,
+        release: ReleaseInfo,
+        name: str,
+        artifacts: commit.ArtifactSource,
+        asset: Optional[dict],
     ):
-        with cmd.cd(directory):
-            return self._run(
-                "gh",
-                "release",
-                "upload",
-                release.tag or release.ref or "",
-                *names,
-                "--clobber",
-            )
+        client = cast(github_api.ApiClient, self.client)
+        upload_url = release.upload_url or (
+            f"{client.uploads_url}{self.root}/releases/{release.id}/assets"
+        )
+        self.rt.print("POST", upload_url.split("{", 1)[0], f"name={name}")
+
+        try:
+            # a failed upload could leave a broken asset behind; the same
+            # as gh release upload --clobber, the old asset is replaced
+            if asset is None:
+                asset = self._assets(release).get(name)
+            if asset and asset.get("id"):
+                response = client.request(
+                    "DELETE", f"{self.root}/releases/assets/{asset['id']}"
+                )
+                if not response.ok and response.status != 404:
+                    self.rt.message(
+                        f"{name}: {_error_message(response)}", level=env.Msg.ALWAYS
+                    )
+                    return False
+
+            with artifacts.open(name) as data:
+                response = client.upload(upload_url, name, data, artifacts.size(name))
+        except (OSError, requests.RequestException) as ex:
+            self.rt.message(f"{name}: {ex}", level=env.Msg.ALWAYS)
+            return False
+
+        if not response.ok:
+            self.rt.message(f"{name}: {_error_message(response)}", level=env.Msg.ALWAYS)
+        return response.ok
+
+    def _assets(self, release: commit.ReleaseInfo):
+        assets: Dict[str, dict] = {}
+        if not isinstance(release, ReleaseInfo) or not release.id:
+            return assets
+
+        for asset in self._pages(f"/releases/{release.id}/assets"):
+            name = asset.get("name")
+            if isinstance(name, str):
+                assets[name] = asset
+        return assets
 
     def publish(self, release: commit.ReleaseInfo) -> commit.ReleaseInfo:
         if not isinstance(release, ReleaseInfo):
@@ -237,7 +418,34 @@ class GitHub(commit.Hosting):
         info = _find_github(git, remote)
         if info == _NO_GITHUB:
             return None
-        return GitHub(info, git.rt)
+        return GitHub(info, git.rt, github_api.from_environment(git.rt))
+
+
+def _fields_from_flags(args: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    # reads the -f/-F fields of gh api, the same way gh reads them; other
+    # flags are only understood by gh itself
+    fields: Dict[str, Any] = {}
+    if len(args) % 2:
+        return None
+    for flag, field in zip(args[::2], args[1::2]):
+        if flag not in ["-f", "-F", "--raw-field", "--field"] or "=" not in field:
+            return None
+        name, value = field.split("=", 1)
+        if flag in ["-F", "--field"]:
+            if value.startswith("@"):
+                return None
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        fields[name] = value
+    return fields
+
+
+def _error_message(response: github_api.ApiResponse):
+    if isinstance(response.data, dict) and response.data.get("message"):
+        return f"{response.status} {response.data['message']}"
+    return f"HTTP {response.status}"
 
 
 SSH_PREFIX = "git@github.com:"
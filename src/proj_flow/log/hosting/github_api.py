@@ -0,0 +1,268 @@
+# Copyright (c) 2026 Marcin Zdun
+# This code is licensed under MIT license (see LICENSE for details)
+
+"""
+The **proj_flow.log.hosting.github_api** talks to the GitHub REST API
+directly, over connections kept alive between the calls, instead of starting
+a ``gh api`` process for each call. Answers to the read-only calls are
+remembered with their ETags, so asking again for unchanged data is cheap and
+does not count against the rate limit.
+"""
+
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Dict, Iterator, NamedTuple, Optional
+
+import requests
+
+from proj_flow.api import env
+from proj_flow.base import cmd
+
+API_URL = "https://api.github.com"
+UPLOADS_URL = "https://uploads.github.com"
+API_VERSION = "2022-11-28"
+ACCEPT = "application/vnd.github+json"
+CACHE_VERSION = 1
+#: Seconds to wait for the server to connect, or to send the next bytes.
+TIMEOUT = 60
+#: Size of a single read of an uploaded artifact.
+UPLOAD_BUFFER = 1 << 20
+
+
+class ApiResponse(NamedTuple):
+    status: int
+    data: Any
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+
+class _Upload:
+    # Gives requests the length of the artifact up front, so it does not
+    # seek through the stream, e.g. decompressing a zip member twice, only
+    # to learn its size.
+    def __init__(self, data: BinaryIO, size: int):
+        self.data = data
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def read(self, size: int = -1):
+        return self.data.read(size)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.data.read(UPLOAD_BUFFER)
+            if not chunk:
+                return
+            yield chunk
+
+
+class ApiClient:
+    """
+    Sends the calls to the GitHub REST API through a single session, so the
+    connections to the server are reused. The API can be served from
+    another place, e.g. from a local stand-in server in tests, by setting
+    ``PROJ_FLOW_GITHUB_API``.
+
+    The answers to the GET calls are stored in the cache file as they came,
+    in plain text, including the data of draft releases.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_url: str = API_URL,
+        uploads_url: Optional[str] = None,
+        cache_path: Optional[str] = None,
+    ):
+        self.api_url = api_url.rstrip("/")
+        if uploads_url is None:
+            uploads_url = UPLOADS_URL if self.api_url == API_URL else self.api_url
+        self.uploads_url = uploads_url.rstrip("/")
+        self.cache_path = cache_path
+        self.entries: Dict[str, dict] = {}
+        self.modified = False
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {token}",
+                "X-GitHub-Api-Version": API_VERSION,
+            }
+        )
+
+        if cache_path is None:
+            return
+
+        try:
+            with open(cache_path, encoding="UTF-8") as cache_file:
+                data = json.load(cache_file)
+            if isinstance(data, dict) and data.get("cache") == CACHE_VERSION:
+                entries = data.get("entries", {})
+                if isinstance(entries, dict):
+                    self.entries = entries
+        except (OSError, ValueError):
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.store()
+        self.session.close()
+
+    def url(self, res: str):
+        return res if "://" in res else f"{self.api_url}{res}"
+
+    def request(
+        self,
+        method: str,
+        res: str,
+        fields: Optional[Dict[str, Any]] = None,
+        accept: str = ACCEPT,
+    ) -> ApiResponse:
+        """
+        Calls the API. A GET call is sent with the ETag of the last answer
+        to it, if known, and an unchanged answer is taken from the cache.
+
+        :param method: HTTP method of the call.
+        :param res: Path of the resource, e.g. ``/repos/owner/repo/releases``,
+            or a full URL.
+        :param fields: Body of the call, sent as a JSON object.
+        :returns: Status of the answer and its JSON contents, which for
+            errors describe the error.
+        :raises requests.RequestException: The server could not be reached.
+        """
+
+        url = self.url(res)
+        method = method.upper()
+        headers = {"Accept": accept}
+        cached: Optional[dict] = None
+        if method == "GET":
+            with self._lock:
+                cached = self.entries.get(url)
+            if not isinstance(cached, dict) or "etag" not in cached:
+                cached = None
+            else:
+                headers["If-None-Match"] = cached["etag"]
+
+        response = self.session.request(
+            method, url, json=fields, headers=headers, timeout=TIMEOUT
+        )
+        if response.status_code == 304 and cached is not None:
+            return ApiResponse(200, cached.get("data"))
+
+        data = _json(response)
+        etag = response.headers.get("ETag")
+        if method == "GET" and response.status_code == 200 and etag:
+            with self._lock:
+                self.entries[url] = {"etag": etag, "data": data}
+                self.modified = True
+        return ApiResponse(response.status_code, data)
+
+    def upload(
+        self,
+        url: str,
+        name: str,
+        data: BinaryIO,
+        size: int,
+        content_type: str = "application/octet-stream",
+    ) -> ApiResponse:
+        """
+        Uploads an asset to a release, streaming it from the open file.
+
+        :param url: Upload URL of the release, with or without the
+            ``{?name,label}`` template part.
+        :param name: Name of the new asset.
+        :param size: Number of bytes, which will be read from the file.
+        """
+
+        response = self.session.post(
+            url.split("{", 1)[0],
+            params={"name": name},
+            data=_Upload(data, size),
+            headers={
+                "Accept": ACCEPT,
+                "Content-Type": content_type,
+                "Content-Length": str(size),
+            },
+            timeout=TIMEOUT,
+        )
+        return ApiResponse(response.status_code, _json(response))
+
+    def store(self):
+        with self._lock:
+            if not self.modified or self.cache_path is None:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                temp = f"{self.cache_path}.{os.getpid()}"
+                with open(temp, "w", encoding="UTF-8") as cache_file:
+                    json.dump(
+                        {"cache": CACHE_VERSION, "entries": self.entries}, cache_file
+                    )
+                os.replace(temp, self.cache_path)
+                self.modified = False
+            except OSError:
+                pass
+
+
+def _json(response: requests.Response):
+    if not response.content:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def find_token(rt: env.Runtime) -> Optional[str]:
+    """
+    Looks for the token in ``GH_TOKEN`` and ``GITHUB_TOKEN``, the same way
+    the GitHub CLI does, and then asks the GitHub CLI itself.
+    """
+
+    environ = rt.environ if rt.environ is not None else os.environ
+    for name in ["GH_TOKEN", "GITHUB_TOKEN"]:
+        token = environ.get(name)
+        if token:
+            return token
+
+    if cmd.which("gh") is None:
+        return None
+    proc = rt.capture("gh", "auth", "token", silent=True)
+    token = proc.stdout.strip() if proc.returncode == 0 else ""
+    return token or None
+
+
+def from_environment(rt: env.Runtime) -> Optional[ApiClient]:
+    """
+    Creates the client for the API, unless no token can be found, or
+    ``PROJ_FLOW_GITHUB_CLIENT`` is set to ``gh``. Without the client, the
+    calls are made with the GitHub CLI.
+    """
+
+    environ = rt.environ if rt.environ is not None else os.environ
+    if environ.get("PROJ_FLOW_GITHUB_CLIENT") == "gh":
+        return None
+
+    token = find_token(rt)
+    if token is None:
+        return None
+
+    return ApiClient(
+        token,
+        api_url=environ.get("PROJ_FLOW_GITHUB_API")
+        or environ.get("GITHUB_API_URL")
+        or API_URL,
+        uploads_url=environ.get("PROJ_FLOW_GITHUB_UPLOADS"),
+        cache_path=str(rt.root / "build" / ".proj-flow" / "github-api.json"),
+    )
@@ -9,12 +9,15 @@ manipulation.
 import abc
 import os
 import re
-from typing import Dict, List, Type
+import shutil
+from typing import Dict, List, Optional, Type, cast
 
 from proj_flow import base
 from proj_flow.api import env
 from proj_flow.log import commit, msg
 
+_CHUNK_SIZE = 64 * 1024
+
 
 class FileUpdate(msg.ReleaseMessage):
     commit_date: str
@@ -61,11 +64,15 @@ class ChangelogGenerator(abc.ABC):
         return "\n".join(lines)
 
     def format_changelog(
-        self, log: commit.ChangeLog, setup: commit.LogSetup, rt: env.Runtime
+        self,
+        log: commit.ChangeLog,
+        setup: commit.LogSetup,
+        rt: env.Runtime,
+        commit_date: Optional[str] = None,
     ):
-        formatter = self.formatter(
-            setup, commit.read_tag_date(setup.curr_tag or "HEAD", rt)
-        )
+        if commit_date is None:
+            commit_date = commit.read_tag_date(setup.curr_tag or "HEAD", rt)
+        formatter = self.formatter(setup, commit_date)
         return formatter.format_changelog(log)
 
     def create_changelog(
@@ -77,16 +84,27 @@ class ChangelogGenerator(abc.ABC):
         scope_fix: Dict[str, str] = {},
         take_all: bool = False,
     ):
+        setups: List[commit.LogSetup] = []
         prev_tag = None
-        entire_log: List[str] = []
         for curr_tag in tags:
-            setup = commit.LogSetup(
-                links, prev_tag, curr_tag, scope_fix=scope_fix, take_all=take_all
+            setups.append(
+                commit.LogSetup(
+                    links,
+                    prev_tag,
+                    curr_tag,
+                    omit=[],
+                    scope_fix=scope_fix,
+                    take_all=take_all,
+                )
             )
-            log, _ = git.get_log(setup)
-            text = self.format_changelog(log, setup, rt)
             prev_tag = curr_tag
 
+        dates = git.tag_dates()
+        entire_log: List[str] = []
+        for setup, (log, _) in zip(setups, git.get_logs(setups)):
+            text = self.format_changelog(
+                log, setup, rt, dates.get(cast(str, setup.curr_tag))
+            )
             entire_log.append(text + "\n")
 
         entire_log.append(self.intro())
@@ -107,25 +125,33 @@ class ChangelogGenerator(abc.ABC):
         )
         text = formatter.format_changelog(log)
         path = rt.root / self.filename
+        temp = path.with_name(f"{path.name}.{os.getpid()}")
 
         try:
-            with open(path, encoding="UTF-8") as f:
-                changelog = f.read()
+            changelog = open(path, encoding="UTF-8")
         except FileNotFoundError:
-            changelog = self.intro()
-
-        split = re.split(
-            pattern=f"({self.split_re})",
-            flags=re.MULTILINE,
-            string=changelog,
-            maxsplit=1,
-        )
-        new_text = split[0] + "\n" + text
-        if len(split) > 1:
-            new_text += "".join(split[1:])
-
-        with open(path, "wb") as f:
-            f.write(new_text.encode("UTF-8"))
+            with open(path, "wb") as f:
+                f.write(f"{self.intro()}\n{text}".encode("UTF-8"))
+            return
+
+        # only the part before the first release is searched; the releases
+        # are copied as they are
+        with changelog, open(temp, "w", encoding="UTF-8", newline="") as f:
+            split_re = re.compile(self.split_re, flags=re.MULTILINE)
+            head = ""
+            while True:
+                chunk = changelog.read(_CHUNK_SIZE)
+                head += chunk
+                m = split_re.search(head)
+                if m is not None or not chunk:
+                    break
+
+            if m is None:
+                f.write(f"{head}\n{text}")
+            else:
+                f.write(f"{head[: m.start()]}\n{text}{head[m.start() :]}")
+                shutil.copyfileobj(changelog, f)
+        os.replace(temp, path)
 
 
 changelog_generators = base.registry.Registry[ChangelogGenerator]("ChangelogGenerator")
@@ -10,9 +10,9 @@ import re
 import sys
 from typing import Annotated, Dict, Iterable, List, Set, cast
 
-from proj_flow import cli
 from proj_flow.api import arg, env, step
 from proj_flow.base import matrix
+from proj_flow.cli import argument
 
 if sys.platform == "win32":
     import ctypes
@@ -21,7 +21,7 @@ else:
     import termios
 
 
-@arg.command("list")
+@arg.command("list", metadata_only=True)
 def main(
     builtin: Annotated[bool, arg.FlagArgument(help="Show all builtin commands")],
     alias: Annotated[bool, arg.FlagArgument(help="Show all alias commands")],
@@ -32,7 +32,7 @@ def main(
     ],
     pipe: Annotated[bool, arg.FlagArgument(help="Do not show additional information")],
     rt: env.Runtime,
-    menu: cli.argument.Command,
+    menu: argument.Command,
 ):
     """List all the commands and/or steps for proj-flow"""
 
@@ -169,7 +169,7 @@ def main(
         print(f"Use {bold}--help{reset} to see, which listings are available")
 
 
-def _iterate_levels(menu: cli.argument.Command, prefix: str):
+def _iterate_levels(menu: argument.Command, prefix: str):
     yield [(f"{prefix}{cmd.name}", cmd.doc) for cmd in menu.children]
     for cmd in menu.children:
         child_prefix = f"{prefix}{cmd.name} "
@@ -177,7 +177,7 @@ def _iterate_levels(menu: cli.argument.Command, prefix: str):
             yield layer
 
 
-def _walk_menu(menu: cli.argument.Command):
+def _walk_menu(menu: argument.Command):
     root = menu
     while root.parent is not None:
         root = root.parent
@@ -5,15 +5,26 @@
 The **proj_flow.minimal.run** implements ``./flow run`` command.
 """
 
+import io
 import os
+import re
 import shutil
 import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Annotated, List, Optional, Set, cast
+from typing import Annotated, Dict, List, Optional, Set, TextIO, cast
 
 from proj_flow import api, dependency
 from proj_flow.base import matrix
+from proj_flow.flow import graph
+from proj_flow.flow import incremental as incremental_state
+from proj_flow.flow import profile
 from proj_flow.flow.configs import Configs
 
 
@@ -33,10 +44,66 @@ def main(
             completer=api.completers.step_completer,
         ),
     ],
+    jobs: Annotated[
+        Optional[str],
+        api.arg.Argument(
+            help="Run up to N configs at the same time; 0 means one config per "
+            "CPU; configs sharing a build directory still run one after another",
+            names=["-j", "--jobs"],
+            meta="N",
+            opt=True,
+        ),
+    ],
+    step_jobs: Annotated[
+        Optional[str],
+        api.arg.Argument(
+            help="Run up to N independent steps of a config at the same time; "
+            "0 means one step per CPU",
+            names=["--step-jobs"],
+            meta="N",
+            opt=True,
+        ),
+    ],
+    incremental: Annotated[
+        bool,
+        api.arg.FlagArgument(
+            help="Skip steps, whose inputs did not change since their last "
+            "successful run, and keep their directories"
+        ),
+    ],
+    timings: Annotated[
+        bool,
+        api.arg.FlagArgument(
+            help="Report wall time, CPU time and peak memory of each step and "
+            "config, and the time spent in proj-flow itself"
+        ),
+    ],
+    profile_file: Annotated[
+        Optional[str],
+        api.arg.Argument(
+            help="Store the --timings measurements in Chrome trace format",
+            names=["--profile"],
+            meta="file",
+            opt=True,
+        ),
+    ],
 ):
     """Run automation steps for current project"""
 
-    with prep_environment(rt, "run-env"):
+    job_count = _job_count(jobs)
+    step_job_count = _job_count(step_jobs)
+    for name, value, count in [
+        ("--jobs", jobs, job_count),
+        ("--step-jobs", step_jobs, step_job_count),
+    ]:
+        if count is None:
+            print(
+                f"proj-flow: error: {name}: expected a non-negative number, got `{value}`",
+                file=sys.stderr,
+            )
+            return 1
+
+    with profile.session(rt, timings, profile_file), prep_environment(rt, "run-env"):
         rt_steps = cast(List[api.step.Step], rt.steps)
         if not cli_steps:
             steps = [step.name for step in rt_steps]
@@ -47,15 +114,54 @@ def main(
         step_names = set(steps)
         program = [step for step in rt_steps if step.name.lower() in step_names]
 
-        errors = gather_dependencies_for_all_configs(configs, rt, program)
+        with profile.phase("check dependencies"):
+            errors = gather_dependencies_for_all_configs(configs, rt, program)
         if len(errors) > 0:
             if not rt.silent:
                 for error in errors:
                     print(f"proj-flow: {error}", file=sys.stderr)
             return 1
 
-        printed = refresh_directories(configs, rt, program)
-        return run_steps(configs, rt, program, printed)
+        with profile.phase("refresh directories"):
+            state = incremental_state.RunState.for_project(rt) if incremental else None
+            printed = refresh_directories(configs, rt, program, state)
+        step_graph = (
+            graph.StepGraph(rt_steps) if cast(int, step_job_count) > 1 else None
+        )
+        if cast(int, job_count) > 1:
+            return run_steps_parallel(
+                configs,
+                rt,
+                program,
+                cast(int, job_count),
+                printed,
+                step_graph,
+                cast(int, step_job_count),
+                state,
+            )
+        return run_steps(
+            configs,
+            rt,
+            program,
+            printed,
+            step_graph,
+            cast(int, step_job_count),
+            state,
+        )
+
+
+def _job_count(jobs: Optional[str]) -> Optional[int]:
+    if jobs is None:
+        return 1
+    try:
+        count = int(jobs)
+    except ValueError:
+        return None
+    if count < 0:
+        return None
+    if count == 0:
+        return os.cpu_count() or 1
+    return count
 
 
 def gather_dependencies_for_all_configs(
@@ -65,18 +171,37 @@ def gather_dependencies_for_all_configs(
     for config in configs.usable:
         active_steps = [step for step in steps if step.is_active(config, rt)]
         deps.extend(dependency.gather(active_steps))
-    return dependency.verify(deps)
+    return dependency.verify(
+        deps, rt.root / "build" / ".proj-flow" / "tool-versions.json"
+    )
+
+
+def active_steps(
+    program: List[api.step.Step],
+    config: api.env.Config,
+    rt: api.env.Runtime,
+    state: Optional[incremental_state.RunState] = None,
+):
+    steps = [step for step in program if step.is_active(config, rt)]
+    if state is None:
+        return steps
+    return state.plan(config, steps, rt)
 
 
 def refresh_directories(
-    configs: Configs, rt: api.env.Runtime, steps: List[api.step.Step]
+    configs: Configs,
+    rt: api.env.Runtime,
+    steps: List[api.step.Step],
+    state: Optional[incremental_state.RunState] = None,
 ):
     directories_to_refresh: Set[Path] = set()
-    for config in configs.usable:
-        for step in steps:
-            if step.is_active(config, rt):
+    while True:
+        for config in configs.usable:
+            for step in active_steps(steps, config, rt, state):
                 dirs = step.directories_to_remove(config)
                 directories_to_refresh.update(dirs)
+        if state is None or not state.remove_directories(directories_to_refresh):
+            break
 
     printed = False
     for dirname in directories_to_refresh:
@@ -115,13 +240,19 @@ def compilers_env_setup(compiler: List[str], rt: api.env.Runtime):
 
 
 def run_steps(
-    configs: Configs, rt: api.env.Runtime, program: List[api.step.Step], printed: bool
+    configs: Configs,
+    rt: api.env.Runtime,
+    program: List[api.step.Step],
+    printed: bool,
+    step_graph: Optional[graph.StepGraph] = None,
+    step_jobs: int = 1,
+    state: Optional[incremental_state.RunState] = None,
 ) -> int:
     config_count = len(configs.usable)
     steps_ran = 0
     for config_index in range(config_count):
         config = configs.usable[config_index]
-        steps = [step for step in program if step.is_active(config, rt)]
+        steps = active_steps(program, config, rt, state)
         step_count = len(steps)
         if step_count == 0:
             continue
@@ -142,13 +273,22 @@ def run_steps(
                 )
 
         compilers: List[str] = getattr(config, "compiler", [])
-        with compilers_env_setup(compilers, rt):
+        with profile.config_span(config), compilers_env_setup(compilers, rt):
+            if step_graph is not None:
+                steps_ran += step_count
+                ret = run_step_graph(
+                    config, steps, rt, dict(os.environ), step_graph, step_jobs
+                )
+                if ret:
+                    return 1
+                continue
+
             for index in range(step_count):
                 step = steps[index]
                 print(f"-- step {index + 1}/{step_count}: {step.name}", file=sys.stderr)
                 steps_ran += 1
                 with prep_environment(rt, f"run-env.{step.name}"):
-                    ret = step.run(config, rt)
+                    ret = profile.run_step(step, config, rt)
                     if ret:
                         return 1
 
@@ -158,6 +298,325 @@ def run_steps(
     return 0
 
 
+@dataclass
+class ConfigRun:
+    index: int
+    config: api.env.Config
+    steps: List[api.step.Step]
+    log_path: Path
+    result: Optional[int] = None
+    duration: float = 0.0
+    steps_ran: int = 0
+    output: str = ""
+    directories: Set[Path] = field(default_factory=set)
+
+    @property
+    def build_name(self) -> str:
+        return self.config.build_name or f"config #{self.index + 1}"
+
+
+def run_steps_parallel(
+    configs: Configs,
+    rt: api.env.Runtime,
+    program: List[api.step.Step],
+    job_count: int,
+    printed: bool,
+    step_graph: Optional[graph.StepGraph] = None,
+    step_jobs: int = 1,
+    state: Optional[incremental_state.RunState] = None,
+) -> int:
+    runs: List[ConfigRun] = []
+    for config_index, config in enumerate(configs.usable):
+        steps = active_steps(program, config, rt, state)
+        if len(steps) == 0:
+            continue
+        run = ConfigRun(
+            config_index, config, steps, _log_path(config_index, config.build_name)
+        )
+        run.directories = _owned_directories(run)
+        runs.append(run)
+
+    if len(runs) == 0:
+        print("Nothing to do.")
+        return 0
+
+    groups = _independent_groups(runs)
+    config_count = len(configs.usable)
+    cancelled = threading.Event()
+    output_lock = threading.Lock()
+
+    def run_group(group: List[ConfigRun]):
+        for run in group:
+            if cancelled.is_set():
+                continue
+            _run_config(run, rt, step_graph, step_jobs)
+            if run.result:
+                cancelled.set()
+            with output_lock:
+                _replay_config(run, config_count)
+
+    if printed:
+        print(file=sys.stderr)
+    print(
+        f"- running {len(runs)} configs in {len(groups)} independent groups, "
+        f"up to {job_count} at a time",
+        file=sys.stderr,
+    )
+
+    with ThreadPoolExecutor(max_workers=min(job_count, len(groups))) as executor:
+        futures = [executor.submit(run_group, group) for group in groups]
+        for future in futures:
+            future.result()
+
+    _print_summary(runs, config_count)
+
+    steps_ran = sum(run.steps_ran for run in runs)
+    if steps_ran == 0:
+        print("Nothing to do.")
+
+    return 1 if any(run.result for run in runs) else 0
+
+
+def _log_path(config_index: int, build_name: str):
+    slug = re.sub(r"[^a-z0-9]+", "-", build_name.lower()).strip("-") or "config"
+    return Path("build") / "logs" / f"run-{config_index + 1:02}-{slug}.log"
+
+
+def _owned_directories(run: ConfigRun):
+    directories = {Path(os.path.abspath(run.config.build_dir))}
+    for step in run.steps:
+        directories.update(
+            Path(os.path.abspath(dirname))
+            for dirname in step.directories_to_remove(run.config)
+        )
+    return directories
+
+
+def _overlapping(lhs: Set[Path], rhs: Set[Path]):
+    for left in lhs:
+        for right in rhs:
+            if left.is_relative_to(right) or right.is_relative_to(left):
+                return True
+    return False
+
+
+def _independent_groups(runs: List[ConfigRun]):
+    """
+    Splits the runs into groups, which can be executed concurrently. Configs
+    sharing any directory (e.g. the same preset, or the common Conan output)
+    end up in the same group and are run one after another.
+    """
+
+    groups: List[List[ConfigRun]] = []
+    for run in runs:
+        merged = [run]
+        directories = set(run.directories)
+        remaining: List[List[ConfigRun]] = []
+        for group in groups:
+            group_dirs = set().union(*(member.directories for member in group))
+            if _overlapping(directories, group_dirs):
+                merged.extend(group)
+                directories.update(group_dirs)
+            else:
+                remaining.append(group)
+        remaining.append(sorted(merged, key=lambda member: member.index))
+        groups = remaining
+
+    return sorted(groups, key=lambda group: group[0].index)
+
+
+def _run_config(
+    run: ConfigRun,
+    rt: api.env.Runtime,
+    step_graph: Optional[graph.StepGraph],
+    step_jobs: int,
+):
+    config_rt = api.env.Runtime(rt, rt)
+    start = time.monotonic()
+
+    log: TextIO
+    if rt.dry_run:
+        log = io.StringIO()
+    else:
+        run.log_path.parent.mkdir(parents=True, exist_ok=True)
+        log = run.log_path.open("w", encoding="UTF-8")
+
+    config_rt.log = log
+    run.result = 0
+    try:
+        compilers: List[str] = getattr(run.config, "compiler", [])
+        config_environ = compilers_environ(compilers, config_rt)
+        if step_graph is not None:
+            run.steps_ran = len(run.steps)
+            run.result = run_step_graph(
+                run.config,
+                run.steps,
+                config_rt,
+                config_environ,
+                step_graph,
+                step_jobs,
+            )
+            return
+
+        step_count = len(run.steps)
+        for index, step in enumerate(run.steps):
+            print(f"-- step {index + 1}/{step_count}: {step.name}", file=log)
+            config_rt.environ = overlay_environment(
+                config_environ, config_rt, f"run-env.{step.name}"
+            )
+            run.steps_ran += 1
+            if profile.run_step(step, run.config, config_rt):
+                run.result = 1
+                break
+    except SystemExit as ex:
+        run.result = ex.code if isinstance(ex.code, int) and ex.code else 1
+    except Exception:
+        traceback.print_exc(file=log)
+        run.result = 1
+    finally:
+        if isinstance(log, io.StringIO):
+            run.output = log.getvalue()
+        log.close()
+        run.duration = time.monotonic() - start
+        profile.record_config(run.config, start)
+
+
+def run_step_graph(
+    config: api.env.Config,
+    steps: List[api.step.Step],
+    rt: api.env.Runtime,
+    config_environ: Dict[str, str],
+    step_graph: graph.StepGraph,
+    step_jobs: int,
+) -> int:
+    """
+    Runs steps of a single config, starting each of them as soon as the steps
+    it runs after are finished. Output of each step is captured and printed
+    as a whole, once the step is finished.
+    """
+
+    predecessors = step_graph.subgraph(steps)
+    output_lock = threading.Lock()
+    step_count = len(steps)
+    completed = 0
+
+    def run_step(step: api.step.Step):
+        nonlocal completed
+
+        step_rt = api.env.Runtime(rt, rt)
+        log: TextIO
+        if rt.dry_run:
+            log = io.StringIO()
+        else:
+            log = tempfile.TemporaryFile("w+", encoding="UTF-8", errors="replace")
+        step_rt.log = log
+        start = time.monotonic()
+        ret = 1
+        try:
+            step_rt.environ = overlay_environment(
+                config_environ, step_rt, f"run-env.{step.name}"
+            )
+            ret = profile.run_step(step, config, step_rt)
+        except SystemExit as ex:
+            ret = ex.code if isinstance(ex.code, int) and ex.code else 1
+        finally:
+            duration = time.monotonic() - start
+            with output_lock:
+                completed += 1
+                print(
+                    f"-- step {completed}/{step_count}: {step.name} ({duration:.1f} s)",
+                    file=rt.stderr,
+                )
+                log.seek(0)
+                shutil.copyfileobj(log, rt.stderr)
+                rt.stderr.flush()
+            log.close()
+        return ret
+
+    result, timings = graph.run_graph(steps, predecessors, run_step, step_jobs)
+
+    path = graph.critical_path(timings, predecessors)
+    if path:
+        names = ", ".join(timing.name for timing in path)
+        path_time = sum(timing.duration for timing in path)
+        wall_time = max(timing.stop for timing in timings) - min(
+            timing.start for timing in timings
+        )
+        rt.message(
+            f"critical path: {names} ({path_time:.1f} s of {wall_time:.1f} s)",
+            level=api.env.Msg.STATUS,
+        )
+
+    return 1 if result else 0
+
+
+def _replay_config(run: ConfigRun, config_count: int):
+    print(
+        f"\n- {run.index + 1}/{config_count}: {run.build_name}",
+        file=sys.stderr,
+    )
+    sys.stderr.flush()
+    if run.output or not run.log_path.is_file():
+        sys.stderr.write(run.output)
+    else:
+        with run.log_path.open(encoding="UTF-8", errors="replace") as log:
+            shutil.copyfileobj(log, sys.stderr)
+    sys.stderr.flush()
+
+
+def _print_summary(runs: List[ConfigRun], config_count: int):
+    labels = {None: "SKIP", 0: "OK"}
+    colors = {None: "\033[0;33m", 0: "\033[0;32m"}
+    print("\n- summary:", file=sys.stderr)
+    for run in runs:
+        label = labels.get(run.result, "FAIL")
+        color = colors.get(run.result, "\033[0;31m")
+        duration = ""
+        log = ""
+        if run.result is not None:
+            duration = f" ({run.duration:.1f} s)"
+            if not run.output and run.log_path.is_file():
+                log = f" {run.log_path.as_posix()}"
+        print(
+            f"  {color}{label:<4}\033[m {run.index + 1}/{config_count}: "
+            f"{run.build_name}{duration}{log}",
+            file=sys.stderr,
+        )
+
+
+def compilers_environ(compiler: List[str], rt: api.env.Runtime) -> Dict[str, str]:
+    """
+    Non-mutating counterpart of :func:`compilers_env_setup`; returns a copy of
+    the process environment with compilers for the given config.
+    """
+
+    environ = dict(os.environ)
+    if sys.platform != "win32":
+        for var, value in zip(COMPILER_ENV, compiler):
+            environ[var] = value
+            rt.message(f"set {var}={value}")
+    return environ
+
+
+def overlay_environment(
+    environ: Dict[str, str], rt: api.env.Runtime, key: str
+) -> Dict[str, str]:
+    """
+    Non-mutating counterpart of :func:`prep_environment`; returns a copy of
+    ``environ`` with variables from ``key`` flow config applied.
+    """
+
+    result = dict(environ)
+    for name, value in cast(dict, rt.items.get(key, {})).items():
+        if value is None:
+            if result.pop(name, None) is not None:
+                rt.print("export", f"{name.upper()}=")
+        else:
+            result[name] = str(value)
+            rt.print("export", f"{name.upper()}={value}")
+    return result
+
+
 @contextmanager
 def prep_environment(rt: api.env.Runtime, key: str):
     original_env = dict[str, str | None]()
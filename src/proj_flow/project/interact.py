@@ -8,17 +8,14 @@ user prompts.
 
 import os
 from dataclasses import dataclass
-from typing import Any, Callable, List, Optional, Union, cast
-
-from prompt_toolkit import prompt as tk_prompt
-from prompt_toolkit.completion import WordCompleter
-from prompt_toolkit.formatted_text.base import AnyFormattedText
-from prompt_toolkit.shortcuts import CompleteStyle
-from prompt_toolkit.validation import Validator
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Union, cast
 
 from proj_flow.api import ctx, env
 from proj_flow.base import plugins
 
+if TYPE_CHECKING:
+    from prompt_toolkit.formatted_text.base import AnyFormattedText
+
 
 @dataclass
 class _Question:
@@ -52,7 +49,7 @@ class _Question:
     def ps(self):
         return self.prompt or f'"{self.key}"'
 
-    def _ps(self, default: ctx.Values, counter: int, size: int) -> AnyFormattedText:
+    def _ps(self, default: ctx.Values, counter: int, size: int) -> "AnyFormattedText":
         if isinstance(default, str):
             if default == "":
                 return f"[{counter}/{size}] {self.ps}: "
@@ -80,6 +77,10 @@ class _Question:
         ]
 
     def _get_str(self, default: str, counter: int, size: int):
+        # prompt_toolkit is only needed by ``init``; do not load it for every
+        # other command
+        from prompt_toolkit import prompt as tk_prompt
+
         value = tk_prompt(self._ps(default, counter, size))
         if not value:
             value = default
@@ -107,6 +108,11 @@ class _Question:
         counter: int,
         size: int,
     ):
+        from prompt_toolkit import prompt as tk_prompt
+        from prompt_toolkit.completion import WordCompleter
+        from prompt_toolkit.shortcuts import CompleteStyle
+        from prompt_toolkit.validation import Validator
+
         def valid(word: str):
             return word == "" or word in words
 